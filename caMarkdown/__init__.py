@@ -1,5 +1,6 @@
 from .parser import getTags, getParseTree
 from .project import Project
+from .workspace import Workspace
 from .tests.helpers import *
 #from .dirHanders import makeProjectDir
 
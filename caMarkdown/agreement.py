@@ -0,0 +1,129 @@
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+from .plaintext import stripMarkup, tokenize
+from .caExceptions import MissingDependency
+
+agreementUnits = ['char', 'token']
+
+#The columns of the confusion counts, for each file and code: the units coded by both coders, only the first, only the second and neither
+bothCol, firstCol, secondCol, neitherCol = range(4)
+
+def unionMask(starts, ends, length):
+    """A boolean array of length that is True within any of the intervals, made from the running sum of +1 at each start and -1 at each end"""
+    delta = numpy.zeros(length + 1, dtype = numpy.int32)
+    numpy.add.at(delta, starts, 1)
+    numpy.add.at(delta, ends, -1)
+    return numpy.cumsum(delta[:-1]) > 0
+
+def toTokens(mask, tokenStarts, tokenEnds):
+    """Reduces a character mask to a token mask, a token is coded if any of its characters are"""
+    coded = numpy.concatenate(([0], numpy.cumsum(mask, dtype = numpy.int64)))
+    return (coded[tokenEnds] - coded[tokenStarts]) > 0
+
+def cohensKappa(counts):
+    """Cohen's kappa for each row of counts, an array of confusion counts, nan where it is undefined"""
+    counts = numpy.asarray(counts, dtype = numpy.float64)
+    total = counts.sum(axis = -1)
+    firstCoded = counts[..., bothCol] + counts[..., firstCol]
+    secondCoded = counts[..., bothCol] + counts[..., secondCol]
+    with numpy.errstate(divide = 'ignore', invalid = 'ignore'):
+        observed = (counts[..., bothCol] + counts[..., neitherCol]) / total
+        expected = (firstCoded * secondCoded + (total - firstCoded) * (total - secondCoded)) / total ** 2
+        return (observed - expected) / (1 - expected)
+
+def krippendorffsAlpha(counts):
+    """Krippendorff's alpha, for two coders and binary nominal data, for each row of counts, nan where it is undefined"""
+    counts = numpy.asarray(counts, dtype = numpy.float64)
+    pairable = 2 * counts.sum(axis = -1)
+    ones = 2 * counts[..., bothCol] + counts[..., firstCol] + counts[..., secondCol]
+    zeros = pairable - ones
+    disagreements = counts[..., firstCol] + counts[..., secondCol]
+    with numpy.errstate(divide = 'ignore', invalid = 'ignore'):
+        return 1 - (pairable - 1) * disagreements / (ones * zeros)
+
+class Agreement(object):
+    """The agreement of two coders over some documents. counts is an array of shape (files, tags, 4) of the confusion counts, see `bothCol`, for every file and code, in units of characters or tokens. The clean text, without the markup, of the documents must be the same for both coders, skipped is the files where it was not or that are missing from one of the coders' versions.
+    """
+    def __init__(self, unit = 'char'):
+        if numpy is None:
+            raise MissingDependency("numpy is needed to compute agreement, it can be installed with `pip install numpy`.")
+        if unit not in agreementUnits:
+            raise ValueError("'{}' is not a unit of agreement, the units are: {}".format(unit, ', '.join(agreementUnits)))
+        self.unit = unit
+        self.files = []
+        self.tags = []
+        self.skipped = []
+        self._fileCounts = []
+        self._fileUnits = []
+
+    def __repr__(self):
+        return "< Agreement [{} files, {} codes] >".format(len(self.files), len(self.tags))
+
+    def addDocument(self, fname, firstSource, secondSource, tags = None):
+        """Compares two versions of a document, strs, coded by the two coders. If tags is given only they are compared, otherwise all the codes used in either version are."""
+        first = stripMarkup(firstSource)
+        second = stripMarkup(secondSource)
+        cleanText = first.text
+        if cleanText != second.text:
+            self.skipped.append(fname)
+            return
+        if tags is None:
+            tags = sorted(set(sec.tag for sec in first.sections) | set(sec.tag for sec in second.sections))
+        for tag in tags:
+            if tag not in self.tags:
+                self.tags.append(tag)
+        if self.unit == 'token':
+            terms, tokenStarts, tokenEnds = tokenize(cleanText)
+            tokenStarts = numpy.array(tokenStarts, dtype = numpy.int64)
+            tokenEnds = numpy.array(tokenEnds, dtype = numpy.int64)
+            units = len(tokenStarts)
+        else:
+            units = len(cleanText)
+        tagIndices = {tag : i for i, tag in enumerate(tags)}
+        intervals = []
+        for plain in (first, second):
+            tagIds = numpy.array([tagIndices.get(sec.tag, -1) for sec in plain.sections], dtype = numpy.int64)
+            starts = numpy.array([sec.start for sec in plain.sections], dtype = numpy.int64)
+            ends = numpy.array([sec.end for sec in plain.sections], dtype = numpy.int64)
+            intervals.append((tagIds, starts, ends))
+        counts = {}
+        for tag, tagIndex in tagIndices.items():
+            masks = []
+            for tagIds, starts, ends in intervals:
+                selected = tagIds == tagIndex
+                mask = unionMask(starts[selected], ends[selected], len(cleanText))
+                if self.unit == 'token':
+                    mask = toTokens(mask, tokenStarts, tokenEnds)
+                masks.append(mask)
+            both = numpy.count_nonzero(masks[0] & masks[1])
+            first = numpy.count_nonzero(masks[0]) - both
+            second = numpy.count_nonzero(masks[1]) - both
+            counts[tag] = (both, first, second, units - both - first - second)
+        self.files.append(fname)
+        self._fileCounts.append(counts)
+        self._fileUnits.append(units)
+
+    @property
+    def counts(self):
+        ret = numpy.zeros((len(self.files), len(self.tags), 4), dtype = numpy.int64)
+        for i, fileCounts in enumerate(self._fileCounts):
+            for j, tag in enumerate(self.tags):
+                try:
+                    ret[i, j] = fileCounts[tag]
+                except KeyError:
+                    #Neither coder used the code in this file
+                    ret[i, j, neitherCol] = self._fileUnits[i]
+        return ret
+
+    def byCode(self):
+        """Returns the confusion counts, kappas and alphas of each code, pooled over the files"""
+        counts = self.counts.sum(axis = 0)
+        return counts, cohensKappa(counts), krippendorffsAlpha(counts)
+
+    def byFile(self):
+        """Returns the confusion counts, kappas and alphas of each file, pooled over the codes"""
+        counts = self.counts.sum(axis = 1)
+        return counts, cohensKappa(counts), krippendorffsAlpha(counts)
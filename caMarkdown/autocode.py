@@ -0,0 +1,202 @@
+import re
+import bisect
+import pathlib
+import collections
+import concurrent.futures
+
+import yaml
+
+try:
+    import re._parser as sreParse
+except ImportError:
+    import sre_parse as sreParse
+
+from .codes import codeTypes
+from .query import normalize
+from .plaintext import stripMarkup
+from .documents import documentEncoding, writeAtomically
+from .caExceptions import AutocodeException
+
+Rule = collections.namedtuple('Rule', ['codes', 'patterns', 'isRegex', 'ignoreCase', 'wholeWord'])
+Rule.__doc__ = """One auto-coding rule, the text matched by any of patterns is wrapped in a section with codes. patterns are literal strings unless isRegex."""
+
+RuleCount = collections.namedtuple('RuleCount', ['coded', 'skipped'])
+RuleCount.__doc__ = """The matches of one rule, coded is the number wrapped, skipped those left alone as they already have the rule's codes, cross existing markup or contain markup characters"""
+
+ruleKeys = {'code', 'literal', 'regex', 'ignoreCase', 'wholeWord'}
+
+#Text with any of these can not be wrapped in a section, the markup would not parse back
+markupCharacters = frozenset('[]()')
+
+def hasBackreference(pattern):
+    """Checks if pattern, a valid regex, refers back to one of its groups, with \\1, (?P=name) or (?(1)...)"""
+    stack = [sreParse.parse(pattern)]
+    while len(stack) > 0:
+        item = stack.pop()
+        if isinstance(item, sreParse.SubPattern):
+            item = item.data
+        for op, value in item:
+            if op in (sreParse.GROUPREF, sreParse.GROUPREF_EXISTS):
+                return True
+            for part in (value if isinstance(value, (tuple, list)) else [value]):
+                if isinstance(part, sreParse.SubPattern):
+                    stack.append(part)
+                elif isinstance(part, list):
+                    #The alternatives of a branch
+                    stack.extend(p for p in part if isinstance(p, sreParse.SubPattern))
+    return False
+
+def makeRule(entry, number):
+    """Checks entry, one rule as read from a rules file, and makes its `Rule`"""
+    if not isinstance(entry, dict):
+        raise AutocodeException("Rule {} is not a mapping, each rule needs a code and a literal or regex".format(number))
+    unknown = set(entry) - ruleKeys
+    if len(unknown) > 0:
+        raise AutocodeException("Rule {} has unknown keys: {}, the known keys are: {}".format(number, ', '.join(sorted(unknown)), ', '.join(sorted(ruleKeys))))
+    codes = str(entry.get('code', '')).split()
+    if len(codes) < 1:
+        raise AutocodeException("Rule {} has no code".format(number))
+    for code in codes:
+        if len(code) < 2 or code[0] not in codeTypes:
+            raise AutocodeException("Rule {} has '{}' as a code, codes must start with one of: {}".format(number, code, ' '.join(codeTypes.keys())))
+    if ('literal' in entry) == ('regex' in entry):
+        raise AutocodeException("Rule {} must have one of literal or regex".format(number))
+    isRegex = 'regex' in entry
+    patterns = entry['regex'] if isRegex else entry['literal']
+    if not isinstance(patterns, list):
+        patterns = [patterns]
+    patterns = [str(p) for p in patterns if p is not None and str(p) != '']
+    if len(patterns) < 1:
+        raise AutocodeException("Rule {} has nothing to match".format(number))
+    if isRegex:
+        for pattern in patterns:
+            try:
+                re.compile(pattern)
+            except re.error as e:
+                raise AutocodeException("Rule {} has a bad regex '{}': {}".format(number, pattern, e))
+            #The rules are combined into one regex, where a group's number depends on the rules before it
+            if hasBackreference(pattern):
+                raise AutocodeException("Rule {} has a backreference in '{}', rules can not refer back to their groups".format(number, pattern))
+    return Rule(tuple(codes), tuple(patterns), isRegex, bool(entry.get('ignoreCase', False)), bool(entry.get('wholeWord', False)))
+
+def readRules(target):
+    """Reads the rules file at target, YAML of a list of rules or a mapping with the list under 'rules'. Each rule is a mapping of 'code', one or more space separated codes, and 'literal' or 'regex', a pattern or list of them. 'ignoreCase' and 'wholeWord' are optional and false by default."""
+    try:
+        with open(str(target), encoding = documentEncoding) as f:
+            data = yaml.safe_load(f)
+    except OSError as e:
+        raise AutocodeException("The rules file '{}' could not be read: {}".format(target, e))
+    except yaml.YAMLError as e:
+        raise AutocodeException("The rules file '{}' is not valid YAML: {}".format(target, e))
+    if isinstance(data, dict):
+        data = data.get('rules')
+    if not isinstance(data, list) or len(data) < 1:
+        raise AutocodeException("The rules file '{}' has no rules".format(target))
+    return [makeRule(entry, i + 1) for i, entry in enumerate(data)]
+
+class RuleSet(object):
+    """Rules compiled into a single regex, an alternation with a named group per rule, so each document is scanned once whatever the number of rules. Where rules match at the same place the first one listed wins, and a rule's literals are tried longest first."""
+    def __init__(self, rules):
+        self.rules = list(rules)
+        if len(self.rules) < 1:
+            raise AutocodeException("There are no rules to compile")
+        alternatives = []
+        for i, rule in enumerate(self.rules):
+            if rule.isRegex:
+                body = '|'.join('(?:{})'.format(p) for p in rule.patterns)
+            else:
+                body = '|'.join(re.escape(p) for p in sorted(rule.patterns, key = len, reverse = True))
+            if rule.ignoreCase:
+                body = '(?i:{})'.format(body)
+            if rule.wholeWord:
+                body = r'(?<!\w)(?:{})(?!\w)'.format(body)
+            alternatives.append('(?P<{}>{})'.format(self.groupName(i), body))
+        try:
+            self.regex = re.compile('|'.join(alternatives))
+        except re.error as e:
+            raise AutocodeException("The rules could not be combined: {}".format(e))
+        self.groupIndices = {self.groupName(i) : i for i in range(len(self.rules))}
+
+    def __len__(self):
+        return len(self.rules)
+
+    def __repr__(self):
+        return "< RuleSet [{} rules] >".format(len(self))
+
+    @staticmethod
+    def groupName(i):
+        return '_rule{}'.format(i)
+
+    def finditer(self, text):
+        """Yields (rule index, start, end) of the non-overlapping matches in text"""
+        for match in self.regex.finditer(text):
+            if match.end() > match.start():
+                yield self.groupIndices[match.lastgroup], match.start(), match.end()
+
+def isCovered(intervals, start, end):
+    """Checks if [start, end) is within one of intervals, from `normalize()`"""
+    i = bisect.bisect_right(intervals, (start, float('inf'))) - 1
+    return i >= 0 and intervals[i][1] >= end
+
+def autocodeText(source, ruleSet, filePath = None):
+    """Wraps the matches of ruleSet in the text of source, without markup, in sections of their rules' codes. Returns the new source and a list with the `RuleCount` of each rule.
+
+    A match is only wrapped with the codes of its rule that do not already cover it, so running the rules again changes nothing. Matches that cross existing markup are skipped, as wrapping them could break the nesting of the sections, and so are matches with any of `markupCharacters` in them.
+    """
+    plain = stripMarkup(source, filePath)
+    coded = [0] * len(ruleSet)
+    skipped = [0] * len(ruleSet)
+    tagIntervals = {}
+    for sec in plain.sections:
+        tagIntervals.setdefault(sec.tag, []).append((sec.start, sec.end, 0, 0))
+    tagIntervals = {tag : normalize(intervals) for tag, intervals in tagIntervals.items()}
+    pieces = []
+    pos = 0
+    for ruleIndex, start, end in ruleSet.finditer(plain.text):
+        rawStart = plain.offsets.toRaw(start)
+        rawEnd = plain.offsets.toRaw(end - 1) + 1
+        codes = [code for code in ruleSet.rules[ruleIndex].codes if not isCovered(tagIntervals.get(code, []), start, end)]
+        if len(codes) < 1 or rawEnd - rawStart != end - start or not markupCharacters.isdisjoint(source[rawStart:rawEnd]):
+            skipped[ruleIndex] += 1
+            continue
+        pieces.append(source[pos:rawStart])
+        pieces.append('[{}]({})'.format(source[rawStart:rawEnd], ' '.join(codes)))
+        pos = rawEnd
+        coded[ruleIndex] += 1
+    if pos == 0:
+        return source, [RuleCount(*c) for c in zip(coded, skipped)]
+    pieces.append(source[pos:])
+    return ''.join(pieces), [RuleCount(*c) for c in zip(coded, skipped)]
+
+def autocodeDocument(sourcePath, relativePath, ruleSet, dryRun = False):
+    """Runs `autocodeText()` on the document at sourcePath and, unless dryRun, replaces it atomically if anything was coded. Returns relativePath and the `RuleCount`s."""
+    #newline = '' keeps the document's line endings as they are
+    with open(str(sourcePath), encoding = documentEncoding, newline = '') as f:
+        source = f.read()
+    newSource, counts = autocodeText(source, ruleSet, relativePath)
+    if not dryRun and newSource != source:
+        writeAtomically(sourcePath, newSource)
+    return relativePath, counts
+
+def autocodeProject(project, ruleSet, dryRun = False, workers = None, files = None):
+    """Runs `autocodeDocument()` on each document of project, in parallel worker processes. Yields (file, `RuleCount`s) for each document in order."""
+    if files is None:
+        files = project.getFiles()
+    jobs = [(str(pathlib.Path(project.path, fname)), pathlib.Path(project.path, fname).relative_to(project.path).as_posix(), ruleSet, dryRun) for fname in files]
+    if workers == 1 or len(jobs) < 2:
+        for job in jobs:
+            yield autocodeDocument(*job)
+    else:
+        with concurrent.futures.ProcessPoolExecutor(max_workers = workers) as executor:
+            for future in [executor.submit(autocodeDocument, *job) for job in jobs]:
+                yield future.result()
+
+def totalCounts(results, ruleCount):
+    """Adds up the `RuleCount`s of results, from `autocodeProject()`, for each of the ruleCount rules"""
+    coded = [0] * ruleCount
+    skipped = [0] * ruleCount
+    for fname, counts in results:
+        for i, count in enumerate(counts):
+            coded[i] += count.coded
+            skipped[i] += count.skipped
+    return [RuleCount(*c) for c in zip(coded, skipped)]
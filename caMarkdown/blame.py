@@ -0,0 +1,92 @@
+import json
+import hashlib
+import pathlib
+import collections
+import concurrent.futures
+
+from .documents import documentEncoding
+from .revisions import BlobCache, documentBlobs
+from .gitWrapper import openRepo, commitId, blameLines, BlameLine
+
+blameCacheDirName = 'blame'
+
+SectionAuthor = collections.namedtuple('SectionAuthor', ['file', 'tag', 'line', 'endLine', 'commit', 'author', 'time'])
+SectionAuthor.__doc__ = """Who coded a section, the author of the commit that last changed the line with the section's code, the ')' that closes its markup. The commit fields are None if the line could not be found in the blame."""
+
+class BlameCache(object):
+    """The blame of documents, kept in the cache directory of a Project keyed by the document's path and blob id. A document's blame only changes when it does, so with nothing new committed no blame is recomputed."""
+    def __init__(self, P):
+        self.cacheDir = P.cachePath(blameCacheDirName, makeDir = True)
+        self.cacheDir.mkdir(exist_ok = True)
+
+    def cachePath(self, fname, blobId):
+        return pathlib.Path(self.cacheDir, hashlib.sha1((pathlib.PurePath(fname).as_posix() + '\0' + blobId).encode(documentEncoding)).hexdigest() + '.json')
+
+    def read(self, fname, blobId):
+        """The cached list of `BlameLine`s of fname as it is in blobId, or None if it has not been cached"""
+        try:
+            with open(str(self.cachePath(fname, blobId)), encoding = documentEncoding) as f:
+                cached = json.load(f)
+            commits = [BlameLine(*c) for c in cached['commits']]
+            return [commits[i] for i in cached['lines']]
+        except (OSError, ValueError, KeyError, TypeError, IndexError):
+            return None
+
+    def write(self, fname, blobId, lines):
+        #Each commit is stored once, the lines are indices into them
+        commitIndices = {}
+        for line in lines:
+            commitIndices.setdefault(line, len(commitIndices))
+        with open(str(self.cachePath(fname, blobId)), 'w', encoding = documentEncoding) as f:
+            json.dump({'commits' : [list(c) for c in commitIndices], 'lines' : [commitIndices[line] for line in lines]}, f)
+
+def blameDocument(repoPath, ref, fname):
+    """Returns fname and its `BlameLine`s in the commit ref of the repo at repoPath, opened afresh so this can run in a worker process"""
+    return fname, blameLines(openRepo(repoPath), ref, fname)
+
+def attributeSections(P, ref = 'HEAD', tags = None, workers = None):
+    """Finds the `SectionAuthor` of every section of the documents of P in the commit ref, those of tags if given. The documents' blame is read from a `BlameCache`, the ones that are not cached are blamed in parallel worker processes and then cached. Returns the list of `SectionAuthor`s in order of file and line."""
+    refId = commitId(P.Repo, ref)
+    blobs = documentBlobs(P.Repo, refId)
+    parsedBlobs = BlobCache(P)
+    blameCache = BlameCache(P)
+    if tags is not None:
+        tags = set(tags)
+    sections = {}
+    for fname, blobId in blobs.items():
+        fileSections = [sec for sec in parsedBlobs.parse(blobId).sections if tags is None or sec.tag in tags]
+        if len(fileSections) > 0:
+            sections[fname] = fileSections
+    blames = {}
+    missing = []
+    for fname in sections:
+        blame = blameCache.read(fname, blobs[fname])
+        if blame is None:
+            missing.append(fname)
+        else:
+            blames[fname] = blame
+    if workers == 1 or len(missing) < 2:
+        results = [blameDocument(str(P.path), refId, fname) for fname in missing]
+    else:
+        with concurrent.futures.ProcessPoolExecutor(max_workers = workers) as executor:
+            results = list(executor.map(blameDocument, [str(P.path)] * len(missing), [refId] * len(missing), missing))
+    for fname, blame in results:
+        blameCache.write(fname, blobs[fname], blame)
+        blames[fname] = blame
+    ret = []
+    for fname in sorted(sections):
+        blame = blames[fname]
+        for sec in sorted(sections[fname], key = lambda s: (s.line, s.start)):
+            if 0 < sec.endLine <= len(blame):
+                commit, author, time = blame[sec.endLine - 1]
+            else:
+                commit = author = time = None
+            ret.append(SectionAuthor(fname, sec.tag, sec.line, sec.endLine, commit, author, time))
+    return ret
+
+def authorCounts(attributions):
+    """Counts the sections each author coded, as a dict of author to a `collections.Counter` of codes"""
+    counts = {}
+    for attribution in attributions:
+        counts.setdefault(attribution.author, collections.Counter())[attribution.tag] += 1
+    return counts
@@ -46,3 +46,30 @@ class GitException(caMarkdownException):
 
 class GitRepositoryMissing(GitException):
     pass
+
+class GitRefMissing(GitException):
+    pass
+
+class QueryException(caMarkdownException):
+    pass
+
+class ExportException(caMarkdownException):
+    pass
+
+class MissingDependency(caMarkdownException):
+    pass
+
+class SummaryException(caMarkdownException):
+    pass
+
+class WorkspaceException(caMarkdownException):
+    pass
+
+class TermStatsException(caMarkdownException):
+    pass
+
+class AutocodeException(caMarkdownException):
+    pass
+
+class RecodeException(caMarkdownException):
+    pass
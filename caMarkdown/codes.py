@@ -1,4 +1,7 @@
 import copy
+import collections
+import re
+import bisect
 
 from .caExceptions import CodeParserException
 
@@ -6,11 +9,11 @@ contextChar = '@'
 contentChar = '$'
 metaChar = '^'
 
+defaultChunkSize = 2 ** 16
+
 def lineAndIndexCounter(targtString):
-    sIter = enumerate(targtString.__iter__())
     lineCount = 1
-    while True:
-        i, char = next(sIter)
+    for i, char in enumerate(targtString):
         if char == '\n':
             lineCount += 1
         yield lineCount, i, char
@@ -24,12 +27,6 @@ class parseTree(object):
         sIter = lineAndIndexCounter(targetString)
         self.topNode = Node(sIter, 0, -1, '', targetPath)
         self.tagSegments = self.topNode.tagSections
-        tmpTagDict = {}
-        for seg in self.tagSegments:
-            try:
-                tmpTagDict[seg.tag].append(seg)
-            except KeyError:
-                tmpTagDict[seg.tag] = [seg]
         self._tags = None
 
     def getTags(self):
@@ -65,6 +62,51 @@ class parseTree(object):
         self.files += other.files
         return self
 
+class Corpus(object):
+    """The parse trees of many documents. Adding `parseTree`s together rebuilds the tags on every addition, a Corpus instead keeps the trees separate and builds the tags once, in a single pass over all the sections, when they are first asked for."""
+    def __init__(self, trees = None):
+        self.trees = []
+        self.files = []
+        self._tags = None
+        if trees is not None:
+            for tree in trees:
+                self.add(tree)
+
+    def add(self, tree):
+        self.trees.append(tree)
+        self.files += tree.files
+        self._tags = None
+
+    def __iadd__(self, tree):
+        self.add(tree)
+        return self
+
+    def __len__(self):
+        return len(self.trees)
+
+    def __repr__(self):
+        return "< Corpus [{}] >".format(len(self.files))
+
+    @property
+    def tagSegments(self):
+        segs = []
+        for tree in self.trees:
+            segs += tree.tagSegments
+        return segs
+
+    @property
+    def tags(self):
+        if self._tags is None:
+            tmpTagDict = {}
+            for tree in self.trees:
+                for seg in tree.tagSegments:
+                    try:
+                        tmpTagDict[seg.tag].append(seg)
+                    except KeyError:
+                        tmpTagDict[seg.tag] = [seg]
+            self._tags = {tag : makeCode(tag, sections = segs) for tag, segs in tmpTagDict.items()}
+        return self._tags
+
 class Node(object):
     def __init__(self, sIter, startLine, startIndex, startCode, filePath):
         if startCode == '[':
@@ -197,7 +239,7 @@ class Node(object):
     @property
     def containedSections(self):
         if self._containedSections is None:
-            self._containedSections = self.codes
+            self._containedSections = list(self.codes)
             for child in self.children:
                 self._containedSections += child.codes
         return self._containedSections
@@ -205,21 +247,13 @@ class Node(object):
     @property
     def tagSections(self):
         if self._tagSections is None:
-            self._tagSections = self.codes
+            self._tagSections = list(self.codes)
             for c in self.children:
                 self._tagSections += c.tagSections
         return self._tagSections
 
     @property
     def codes(self):
-        def readCodes(codeStr):
-            codes = codeStr.split(' ')
-            retCodes = []
-            for code in codes:
-                if len(code) > 1 and code[0] in codeSectionTypes:
-                    retCodes.append((code[0], code))
-            return retCodes
-
         if self._codes is None:
             self._codes = []
             if self.code:
@@ -261,14 +295,15 @@ class CodeSection(object):
 
     def __contains__(self, tag):
         for c in self.children:
-            if c.tag == tag:
-                return True
+            for sec in c.tagSections:
+                if sec.tag == tag:
+                    return True
         return False
 
     def __getitem__(self, tag):
         retTags = []
         for c in self.children:
-            for sec in c.codes:
+            for sec in c.tagSections:
                 if sec.tag == tag:
                     retTags.append(sec)
         return retTags
@@ -323,7 +358,7 @@ class Tag(object):
     def __add__(self, other):
         if self.tag != other.tag:
             raise CodeParserException("Tags can only be added togehter if they have the same tag string, {} cannot be added to {}".format(self.tag, other.tag))
-        return Tag(self.tag, self.sections + other.sections)
+        return type(self)(self.sections + other.sections, self.tag)
 
     def __len__(self):
         return len(self.sections)
@@ -347,16 +382,18 @@ class Tag(object):
         if self._containedSections is None:
             self._containedSections = []
             for sec in self.sections:
-                for seg in [node.containedSections for node in sec.children]:
-                    self._containedSections += seg
+                for node in sec.children:
+                    self._containedSections += node.tagSections
         return self._containedSections
 
     @property
     def containedTags(self):
         if self._containedTags is None:
             self._containedTags = []
+            seen = set()
             for sec in self.containedSections:
-                if sec.tag not in self._containedTags:
+                if sec.tag not in seen:
+                    seen.add(sec.tag)
                     self._containedTags.append(sec.tag)
         return self._containedTags
 
@@ -411,3 +448,189 @@ def makeCode(tagString, sections = None, dataDict = None):
     if dataDict is not None:
         tag.addDocs(dataDict)
     return tag
+
+def readCodes(codeStr):
+    """Splits the string inside the braces of a code into (codeChar, code) pairs, anything that is not a code is dropped"""
+    codes = codeStr.split(' ')
+    retCodes = []
+    for code in codes:
+        if len(code) > 1 and code[0] in codeSectionTypes:
+            retCodes.append((code[0], code))
+    return retCodes
+
+Section = collections.namedtuple('Section', ['tag', 'file', 'line', 'endLine', 'start', 'textEnd', 'end', 'length'])
+Section.__doc__ = """A lightweight record of one coded section. start is the offset of the opening '[', textEnd that of the closing ']' and end is just past the ')'. length is the length of the text without any markup."""
+
+_textState = 0
+_bracketState = 1
+_tokenState = 2
+
+_MarkupSyntax = collections.namedtuple('_MarkupSyntax', ['brackets', 'openBracket', 'openParen', 'closeParen', 'newline', 'empty'])
+
+_strSyntax = _MarkupSyntax(re.compile(r'[\[\]]'), '[', '(', ')', '\n', '')
+_bytesSyntax = _MarkupSyntax(re.compile(br'[\[\]]'), b'[', b'(', b')', b'\n', b'')
+
+class SectionScanner(object):
+    """An incremental version of the `Node` parser. It is fed a document in chunks, str or bytes, and returns the `Section`s that each chunk closes. Markup that spans chunks is carried over so only the open sections are kept in memory.
+
+    Offsets are in the units of the chunks, characters for str and bytes for bytes.
+    """
+    def __init__(self, filePath = None, keepMarkup = False):
+        self.file = filePath
+        self.keepMarkup = keepMarkup
+        self.markup = []
+        self.offset = 0
+        self.line = 1
+        self.state = _textState
+        self.stack = [] #[start, line, markup length nested inside]
+        self.tokens = []
+        self.textEnd = None
+        self.syntax = None
+
+    def feed(self, chunk):
+        if self.syntax is None:
+            if isinstance(chunk, (bytes, bytearray)):
+                self.syntax = _bytesSyntax
+            else:
+                self.syntax = _strSyntax
+        syntax = self.syntax
+        found = []
+        pos = 0
+        size = len(chunk)
+        while pos < size:
+            if self.state == _bracketState:
+                char = chunk[pos:pos + 1]
+                if char == syntax.openParen:
+                    self.state = _tokenState
+                    self.tokens = []
+                    pos += 1
+                elif char == syntax.openBracket:
+                    #The '[' starts a new section so is left for the text state
+                    self._fail()
+                else:
+                    #Like Node the character after a bad ']' is always text
+                    self._fail()
+                    if char == syntax.newline:
+                        self.line += 1
+                    pos += 1
+            elif self.state == _tokenState:
+                i = chunk.find(syntax.closeParen, pos)
+                if i < 0:
+                    self.tokens.append(chunk[pos:])
+                    self.line += chunk.count(syntax.newline, pos)
+                    pos = size
+                else:
+                    self.tokens.append(chunk[pos:i])
+                    self.line += chunk.count(syntax.newline, pos, i)
+                    found += self._close(self.offset + i + 1)
+                    pos = i + 1
+            else:
+                match = syntax.brackets.search(chunk, pos)
+                if match is None:
+                    self.line += chunk.count(syntax.newline, pos)
+                    pos = size
+                else:
+                    i = match.start()
+                    self.line += chunk.count(syntax.newline, pos, i)
+                    if chunk[i:i + 1] == syntax.openBracket:
+                        self.stack.append([self.offset + i, self.line, 0])
+                    elif len(self.stack) > 0:
+                        self.textEnd = self.offset + i
+                        self.state = _bracketState
+                    pos = i + 1
+        self.offset += size
+        return found
+
+    def close(self):
+        """Ends the document, any sections still open are not codes"""
+        self.stack = []
+        self.tokens = []
+        self.state = _textState
+
+    def markupSpans(self):
+        """If keepMarkup was set, the sorted (start, end) spans of all the markup closed so far: the '[' and the '](...)' of every bracket pair that closed, links included as `Node` treats them the same way"""
+        return sorted(self.markup)
+
+    def _fail(self):
+        start, line, nested = self.stack.pop()
+        if len(self.stack) > 0:
+            self.stack[-1][2] += nested
+        self.state = _textState
+
+    def _close(self, end):
+        start, line, nested = self.stack.pop()
+        tokens = self.syntax.empty.join(self.tokens)
+        if isinstance(tokens, bytes):
+            tokens = tokens.decode('utf-8', errors = 'replace')
+        self.tokens = []
+        self.state = _textState
+        markup = 1 + end - self.textEnd
+        if self.keepMarkup:
+            self.markup.append((start, start + 1))
+            self.markup.append((self.textEnd, end))
+        if len(self.stack) > 0:
+            self.stack[-1][2] += markup + nested
+        length = self.textEnd - start - 1 - nested
+        return [Section(code, self.file, line, self.line, start, self.textEnd, end, length) for codeChar, code in readCodes(tokens)]
+
+def iterSections(fileobj, filePath = None, chunkSize = defaultChunkSize):
+    """Yields the `Section`s of the document in fileobj as they are closed, reading chunkSize at a time. Nested sections are closed, and so yielded, before the ones around them."""
+    scanner = SectionScanner(filePath)
+    while True:
+        chunk = fileobj.read(chunkSize)
+        if not chunk:
+            break
+        for sec in scanner.feed(chunk):
+            yield sec
+    scanner.close()
+
+def iterNesting(sections):
+    """Yields (section, parents) for each of sections, which must all be from one document. parents are the sections whose markup encloses the section, outermost first. Sections that share their markup, several codes on the same text, are not parents of each other.
+
+    This is a single sweep over the sections sorted by start, the open sections are kept on a stack.
+    """
+    stack = [] #[start, end, sections]
+    for sec in sorted(sections, key = lambda s: (s.start, -s.end)):
+        while len(stack) > 0 and stack[-1][1] <= sec.start:
+            stack.pop()
+        if len(stack) < 1 or stack[-1][0] != sec.start or stack[-1][1] != sec.end:
+            stack.append([sec.start, sec.end, []])
+        stack[-1][2].append(sec)
+        parents = []
+        for start, end, secs in stack[:-1]:
+            parents += secs
+        yield sec, parents
+
+def containmentCounts(sections, graph = None):
+    """Counts, for the sections of one document, how many sections of each code are nested within sections of each other code. The counts are added to graph, a dict of the form {outerTag : {innerTag : count}}, which is returned"""
+    if graph is None:
+        graph = {}
+    for sec, parents in iterNesting(sections):
+        for outerTag in set(p.tag for p in parents):
+            innerCounts = graph.setdefault(outerTag, {})
+            innerCounts[sec.tag] = innerCounts.get(sec.tag, 0) + 1
+    return graph
+
+def scanMarkup(source, filePath = None):
+    """Scans all of source, a str or bytes, and returns its `Section`s along with the spans of its markup, see `SectionScanner.markupSpans()`"""
+    scanner = SectionScanner(filePath, keepMarkup = True)
+    sections = scanner.feed(source)
+    scanner.close()
+    return sections, scanner.markupSpans()
+
+def stripSpans(source, start, end, spans):
+    """Returns source[start:end] with the parts covered by spans, from `SectionScanner.markupSpans()`, removed. Works on str and bytes."""
+    pieces = []
+    i = bisect.bisect_right(spans, (start, start))
+    if i > 0 and spans[i - 1][1] > start:
+        i -= 1
+    pos = start
+    while i < len(spans) and spans[i][0] < end:
+        spanStart, spanEnd = spans[i]
+        if spanStart > pos:
+            pieces.append(source[pos:spanStart])
+        pos = max(pos, spanEnd)
+        i += 1
+    if pos < end:
+        pieces.append(source[pos:end])
+    return source[0:0].join(pieces)
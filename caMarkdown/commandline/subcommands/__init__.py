@@ -5,6 +5,22 @@ from .table import startTable
 from .sync import startSync
 from .tag import startTag
 from .organize import startOrganize
+from .nesting import startNesting
+from .query import startQuery
+from .export import startExport
+from .batch import startBatch
+from .workspace import startWorkspace
+from .summarize import startSummarize
+from .merge import startMerge
+from .agreement import startAgreement
+from .coverage import startCoverage
+from .terms import startTerms
+from .grep import startGrep
+from .autocode import startAutocode
+from .rename import startRename, startMergeCodes
+from .diff import startDiff
+from .history import startHistory
+from .blame import startBlame
 
 subCommands = {
     "init" : startInit,
@@ -14,4 +30,21 @@ subCommands = {
     "sync" : startSync,
     "tag" : startTag,
     "organize" : startOrganize,
+    "nesting" : startNesting,
+    "query" : startQuery,
+    "export" : startExport,
+    "batch" : startBatch,
+    "workspace" : startWorkspace,
+    "summarize" : startSummarize,
+    "merge" : startMerge,
+    "agreement" : startAgreement,
+    "coverage" : startCoverage,
+    "terms" : startTerms,
+    "grep" : startGrep,
+    "autocode" : startAutocode,
+    "rename" : startRename,
+    "mergecodes" : startMergeCodes,
+    "diff" : startDiff,
+    "history" : startHistory,
+    "blame" : startBlame,
 }
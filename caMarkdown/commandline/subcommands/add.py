@@ -1,36 +1,35 @@
 import sys
 import pathlib
 
-from .subCommandBase import baseArgparse, CommandOutputHandler, generalExceptionHandler
+from .subCommandBase import baseArgparse, openOutput, generalExceptionHandler, openProject
 
-from ...project import Project
 from ...dirHanders import findTopDir
 from ...caExceptions import UninitializedDirectory, ProjectFileError
 
-def startArgParse():
+def startArgParse(argv = None):
     parser = baseArgparse("caMarkdown's codebook adding client")
     parser.add_argument("paths", nargs = "+", type = str,
     help = "The paths of files or directories to be added")
     parser.add_argument("--nonRecursive", "-nr",
     default = False, action = 'store_true',
     help = "Makes adding directories non-recursive")
-    return parser.parse_args(sys.argv[2:])
+    return parser.parse_args(sys.argv[2:] if argv is None else argv)
 
-def startAdd():
-    args = startArgParse()
+def startAdd(argv = None):
+    args = startArgParse(argv)
     try:
-        with CommandOutputHandler(args.output) as writer:
+        with openOutput(args) as writer:
             try:
                 caDir = findTopDir('.')
             except UninitializedDirectory:
-                print("This is not caMarkdown repository or inside one.\nRun `camd init` to make it one")
+                writer.error("This is not caMarkdown repository or inside one.\nRun `camd init` to make it one")
             else:
-                Proj = Project(caDir)
+                Proj = openProject(caDir)
                 for pStr in args.paths:
                     try:
                         path = pathlib.Path(pStr).resolve()
                     except FileNotFoundError:
-                        writer("{} doe not exist, skipping\n".format(pStr))
+                        writer.error("{} does not exist, skipping".format(pStr))
                     else:
                         if path.is_file():
                             if path not in Proj.getFiles():
@@ -38,19 +37,17 @@ def startAdd():
                                 try:
                                     Proj.addFile(path)
                                 except ProjectFileError as e:
-                                    print("An error occured:", end = ' ')
-                                    print(e)
+                                    writer.error("An error occured: {}".format(e))
                             else:
                                 writer("{} already in the code book skipping\n".format(path))
                         elif path.is_dir():
                             writer("Adding directory {}\n".format(path))
                             try:
                                 Proj.addDir(path, recursive = not args.nonRecursive)
-                            except ProjectFileError:
-                                print("An error occured:", end = ' ')
-                                print(e)
+                            except ProjectFileError as e:
+                                writer.error("An error occured: {}".format(e))
                         else:
-                            print("{} is not a file or a directory and as such it cannot be tracked by caMarkdown".format(path))
+                            writer.error("{} is not a file or a directory and as such it cannot be tracked by caMarkdown".format(path))
     except Exception as e:
         #Prettify things if they go bad
         generalExceptionHandler(e, args.debug)
@@ -0,0 +1,59 @@
+import sys
+import math
+
+from .subCommandBase import baseArgparse, openOutput, generalExceptionHandler, openProject
+
+from ...dirHanders import findTopDir
+from ...caExceptions import UninitializedDirectory, GitRefMissing, MissingDependency
+
+def agreementArgParse(argv = None):
+    parser = baseArgparse("caMarkdown's inter-coder agreement calculator, compares the coding in two branches")
+    parser.add_argument("first", type = str, help = "The first coder's branch, or any tag or commit")
+    parser.add_argument("second", type = str, help = "The second coder's branch, or any tag or commit")
+    parser.add_argument("tags", nargs = '*', type = str, help = "The tags to be compared, by default all those used in either")
+    parser.add_argument("--tokens", action = 'store_true', default = False, help = "compare words rather than characters")
+    return parser.parse_args(sys.argv[2:] if argv is None else argv)
+
+def agreementRecord(counts, kappa, alpha):
+    record = {
+        'kappa' : None if math.isnan(kappa) else float(kappa),
+        'alpha' : None if math.isnan(alpha) else float(alpha),
+        'both' : int(counts[0]),
+        'firstOnly' : int(counts[1]),
+        'secondOnly' : int(counts[2]),
+        'neither' : int(counts[3]),
+    }
+    s = "{:.3f}\t{:.3f}\t{}\t{}\t{}\n".format(kappa, alpha, record['both'], record['firstOnly'], record['secondOnly'])
+    return record, s
+
+def startAgreement(argv = None):
+    args = agreementArgParse(argv)
+    try:
+        with openOutput(args) as writer:
+            try:
+                caDir = findTopDir('.')
+            except UninitializedDirectory:
+                writer.error("This is not caMarkdown repository or inside one.\nRun `camd init` to make it one")
+            else:
+                Proj = openProject(caDir)
+                try:
+                    agreement = Proj.agreement(args.first, args.second, tags = args.tags if len(args.tags) > 0 else None, unit = 'token' if args.tokens else 'char')
+                except (GitRefMissing, MissingDependency) as e:
+                    writer.error(e)
+                else:
+                    if len(agreement.skipped) > 0:
+                        writer.error("{} document(s) were skipped as they are missing from a branch or their text, without the codes, differs:\n\t{}".format(len(agreement.skipped), '\n\t'.join(str(f) for f in agreement.skipped)))
+                    unitName = 'tokens' if args.tokens else 'characters'
+                    writer.record(None, "Code\tKappa\tAlpha\tBoth\tFirst only\tSecond only ({})\n".format(unitName))
+                    for tag, counts, kappa, alpha in zip(agreement.tags, *agreement.byCode()):
+                        record, s = agreementRecord(counts, kappa, alpha)
+                        record['tag'] = tag
+                        writer.record(record, "{}\t{}".format(tag, s))
+                    writer.record(None, "File\tKappa\tAlpha\tBoth\tFirst only\tSecond only ({})\n".format(unitName))
+                    for fname, counts, kappa, alpha in zip(agreement.files, *agreement.byFile()):
+                        record, s = agreementRecord(counts, kappa, alpha)
+                        record['file'] = str(fname)
+                        writer.record(record, "{}\t{}".format(fname, s))
+    except Exception as e:
+        #Prettify things if they go bad
+        generalExceptionHandler(e, args.debug)
@@ -0,0 +1,43 @@
+import sys
+
+from .subCommandBase import baseArgparse, openOutput, generalExceptionHandler, openProject, positiveInt
+
+from ...dirHanders import findTopDir
+from ...autocode import RuleSet, readRules, totalCounts
+from ...caExceptions import UninitializedDirectory, AutocodeException
+
+def autocodeArgParse(argv = None):
+    parser = baseArgparse("caMarkdown's auto-coder, codes the text matching a file of rules")
+    parser.add_argument("rules", type = str, help = "The YAML file of rules, a list of mappings each with a 'code' and a 'literal' or 'regex', which can be lists. 'ignoreCase' and 'wholeWord' can also be set")
+    parser.add_argument("--dryRun", '-n', action = 'store_true', default = False, help = "only count the matches of each rule, the documents are not changed")
+    parser.add_argument("--workers", '-w', type = positiveInt, default = None, metavar = 'N', help = "the number of documents done at once, by default one per CPU")
+    return parser.parse_args(sys.argv[2:] if argv is None else argv)
+
+def startAutocode(argv = None):
+    args = autocodeArgParse(argv)
+    try:
+        with openOutput(args) as writer:
+            try:
+                caDir = findTopDir('.')
+            except UninitializedDirectory:
+                writer.error("This is not caMarkdown repository or inside one.\nRun `camd init` to make it one")
+            else:
+                Proj = openProject(caDir)
+                try:
+                    ruleSet = RuleSet(readRules(args.rules))
+                except AutocodeException as e:
+                    writer.error(e)
+                else:
+                    results = Proj.autocode(ruleSet, dryRun = args.dryRun, workers = args.workers)
+                    writer.record(None, "Rule\tCodes\tCoded\tSkipped\tPatterns\n")
+                    for i, (rule, count) in enumerate(zip(ruleSet.rules, totalCounts(results, len(ruleSet)))):
+                        patterns = ', '.join(rule.patterns)
+                        writer.record({'rule' : i + 1, 'codes' : list(rule.codes), 'patterns' : list(rule.patterns), 'coded' : count.coded, 'skipped' : count.skipped}, "{}\t{}\t{}\t{}\t{}\n".format(i + 1, ' '.join(rule.codes), count.coded, count.skipped, patterns if len(patterns) < 60 else patterns[:57] + '...'))
+                    changed = [fname for fname, counts in results if sum(c.coded for c in counts) > 0]
+                    if args.verbose:
+                        for fname in changed:
+                            writer.record(None, "\t{}\n".format(fname))
+                    writer.record(None, "{} of {} documents {}\n".format(len(changed), len(results), 'would be changed' if args.dryRun else 'changed'))
+    except Exception as e:
+        #Prettify things if they go bad
+        generalExceptionHandler(e, args.debug)
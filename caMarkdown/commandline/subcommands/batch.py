@@ -0,0 +1,89 @@
+import sys
+import shlex
+
+from . import subCommandBase
+from .subCommandBase import baseArgparse, CommandOutputHandler, generalExceptionHandler
+
+from ...project import Project
+from ...caExceptions import UninitializedDirectory
+from ...dirHanders import findTopDir
+
+#The commands that change the codebook or documents, the shared Project's caches are dropped after them
+writingCommands = {'init', 'add', 'sync', 'organize', 'autocode', 'rename', 'mergecodes'}
+
+def batchArgParse(argv = None):
+    parser = baseArgparse("caMarkdown's batch runner, runs many commands in one process sharing the parsed documents and codebook. The commands all write to the batch's output in its format, their own --output, --format and --flush are ignored", readsDocuments = True)
+    parser.add_argument("script", nargs = '?', type = str, default = '-', help = "The file of commands, one per line written as they would be after `camd`, # starts a comment. Read from stdin if - or not given")
+    parser.add_argument("--keepGoing", '-k', action = 'store_true', default = False, help = "keep running the commands after one fails")
+    return parser.parse_args(sys.argv[2:] if argv is None else argv)
+
+def readScript(f):
+    """Yields (lineNumber, argv) for each command in f"""
+    for lineNumber, line in enumerate(f, start = 1):
+        argv = shlex.split(line, comments = True)
+        if len(argv) > 0 and argv[0] == 'camd':
+            argv = argv[1:]
+        if len(argv) > 0:
+            yield lineNumber, argv
+
+def shareProject(readWorkers):
+    try:
+        caDir = findTopDir('.')
+    except UninitializedDirectory:
+        subCommandBase.sharedProject = None
+    else:
+        subCommandBase.sharedProject = Project(caDir, readWorkers = readWorkers)
+
+def runCommand(argv):
+    from . import subCommands
+    if argv[0] == 'batch':
+        raise ValueError("batch cannot be run from inside a batch")
+    try:
+        startFunc = subCommands[argv[0]]
+    except KeyError:
+        raise ValueError("'{}' is not a command, the commands are: {}".format(argv[0], ', '.join(subCommands.keys())))
+    startFunc(argv[1:])
+
+def startBatch(argv = None):
+    args = batchArgParse(argv)
+    failed = []
+    try:
+        with CommandOutputHandler(args.output, outputFormat = args.outputFormat, flushPolicy = args.flush) as writer:
+            if args.script == '-':
+                commands = list(readScript(sys.stdin))
+            else:
+                with open(args.script) as f:
+                    commands = list(readScript(f))
+            shareProject(args.jobs)
+            writer.shared = True
+            subCommandBase.sharedWriter = writer
+            try:
+                for lineNumber, commandArgv in commands:
+                    if args.verbose:
+                        print("camd {}".format(' '.join(commandArgv)), file = sys.stderr)
+                    try:
+                        runCommand(commandArgv)
+                    except (Exception, SystemExit) as e:
+                        #argparse exits on bad arguments
+                        if isinstance(e, SystemExit) and not e.code:
+                            continue
+                        failed.append(lineNumber)
+                        print("The command on line {} (camd {}) failed: {}".format(lineNumber, ' '.join(commandArgv), e), file = sys.stderr)
+                        if not args.keepGoing:
+                            break
+                    if commandArgv[0] in writingCommands:
+                        if subCommandBase.sharedProject is None:
+                            shareProject(args.jobs)
+                        else:
+                            subCommandBase.sharedProject.clearCache()
+            finally:
+                subCommandBase.sharedProject = None
+                subCommandBase.sharedWriter = None
+                writer.shared = False
+            if len(failed) > 0:
+                writer.record({'commands' : len(commands), 'failed' : failed}, "{} of {} commands failed, on line(s): {}\n".format(len(failed), len(commands), ', '.join(str(l) for l in failed)))
+    except Exception as e:
+        #Prettify things if they go bad
+        generalExceptionHandler(e, args.debug)
+    if len(failed) > 0:
+        sys.exit(1)
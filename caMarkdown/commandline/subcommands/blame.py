@@ -0,0 +1,45 @@
+import sys
+import datetime
+
+from .subCommandBase import baseArgparse, openOutput, generalExceptionHandler, openProject, positiveInt
+
+from ...dirHanders import findTopDir
+from ...blame import authorCounts
+from ...caExceptions import UninitializedDirectory, GitRefMissing
+
+def blameArgParse(argv = None):
+    parser = baseArgparse("caMarkdown's code blamer, shows who coded the sections, from the commits that last changed the lines of their codes")
+    parser.add_argument("tags", nargs = '*', type = str, help = "The tags to be attributed, by default all of them")
+    parser.add_argument("--ref", '-r', type = str, default = 'HEAD', help = "the branch, tag or commit whose documents are used, HEAD by default")
+    parser.add_argument("--list", '-l', action = 'store_true', default = False, help = "list every section with its author and commit")
+    parser.add_argument("--workers", '-w', type = positiveInt, default = None, metavar = 'N', help = "the number of documents blamed at once, by default one per CPU")
+    return parser.parse_args(sys.argv[2:] if argv is None else argv)
+
+def startBlame(argv = None):
+    args = blameArgParse(argv)
+    try:
+        with openOutput(args) as writer:
+            try:
+                caDir = findTopDir('.')
+            except UninitializedDirectory:
+                writer.error("This is not caMarkdown repository or inside one.\nRun `camd init` to make it one")
+            else:
+                Proj = openProject(caDir)
+                try:
+                    attributions = Proj.blame(ref = args.ref, tags = args.tags if len(args.tags) > 0 else None, workers = args.workers)
+                except GitRefMissing as e:
+                    writer.error(e)
+                else:
+                    if args.list:
+                        for attribution in attributions:
+                            date = datetime.datetime.fromtimestamp(attribution.time, datetime.timezone.utc).date().isoformat() if attribution.time is not None else '?'
+                            commit = attribution.commit[:10] if attribution.commit is not None else '?'
+                            writer.record(attribution._asdict(), "{}:{}:\t{}\t{}\t{}\t{}\n".format(attribution.file, attribution.line, attribution.tag, commit, date, attribution.author))
+                    else:
+                        writer.record(None, "Author\tSections\tCodes\tMost used\n")
+                        for author, counts in sorted(authorCounts(attributions).items(), key = lambda x: (-sum(x[1].values()), str(x[0]))):
+                            mostUsed = ', '.join("{} ({})".format(tag, count) for tag, count in counts.most_common(3))
+                            writer.record({'author' : author, 'sections' : sum(counts.values()), 'codes' : dict(counts)}, "{}\t{}\t{}\t{}\n".format(author, sum(counts.values()), len(counts), mostUsed))
+    except Exception as e:
+        #Prettify things if they go bad
+        generalExceptionHandler(e, args.debug)
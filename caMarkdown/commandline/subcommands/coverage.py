@@ -0,0 +1,52 @@
+import sys
+
+from .subCommandBase import baseArgparse, openOutput, generalExceptionHandler, openProject
+
+from ...dirHanders import findTopDir
+from ...coverage import allCodes, coverageFraction
+from ...codes import codeTypes
+from ...caExceptions import UninitializedDirectory
+
+def coverageArgParse(argv = None):
+    parser = baseArgparse("caMarkdown's coverage reporter, shows how much of each document is coded", readsDocuments = True)
+    parser.add_argument("--depths", action = 'store_true', default = False, help = "also show how many characters are within 0, 1, 2... sections")
+    parser.add_argument("--gaps", action = 'store_true', default = False, help = "also list the uncoded spans of each document")
+    return parser.parse_args(sys.argv[2:] if argv is None else argv)
+
+def coverageRecord(coverage):
+    return {
+        'length' : coverage.length,
+        'covered' : coverage.covered,
+        'fraction' : coverageFraction(coverage),
+        'gaps' : [list(gap) for gap in coverage.gaps],
+        'depths' : coverage.depths,
+    }
+
+def startCoverage(argv = None):
+    args = coverageArgParse(argv)
+    try:
+        with openOutput(args) as writer:
+            try:
+                caDir = findTopDir('.')
+            except UninitializedDirectory:
+                writer.error("This is not caMarkdown repository or inside one.\nRun `camd init` to make it one")
+            else:
+                Proj = openProject(caDir, readWorkers = args.jobs)
+                typeChars = list(codeTypes.keys())
+                #Least coded first, they are the ones that need work
+                coverages = sorted(Proj.coverage(), key = lambda c: (coverageFraction(c[allCodes]), str(c[allCodes].file)))
+                writer.record(None, "File\tLength\tCoded\t{}\tGaps\tLongest gap\n".format('\t'.join(typeChars)))
+                for coverage in coverages:
+                    total = coverage[allCodes]
+                    longestGap = max([end - start for start, end in total.gaps], default = 0)
+                    s = "{}\t{}\t{:.1%}\t{}\t{}\t{}\n".format(total.file, total.length, coverageFraction(total), '\t'.join("{:.1%}".format(coverageFraction(coverage[c])) for c in typeChars), len(total.gaps), longestGap)
+                    if args.depths:
+                        s += "\tDepths: {}\n".format(', '.join("{}: {}".format(depth, count) for depth, count in sorted(total.depths.items())))
+                    if args.gaps:
+                        s += ''.join("\tUncoded {}-{}\n".format(start, end) for start, end in total.gaps)
+                    record = {'file' : str(total.file)}
+                    record.update({codeType : coverageRecord(c) for codeType, c in coverage.items()})
+                    writer.record(record, s)
+    except Exception as e:
+        #Prettify things if they go bad
+        generalExceptionHandler(e, args.debug)
@@ -0,0 +1,56 @@
+import sys
+
+from .subCommandBase import baseArgparse, openOutput, generalExceptionHandler, openProject
+
+from ...dirHanders import findTopDir
+from ...revisions import changeCounts
+from ...caExceptions import UninitializedDirectory, GitRefMissing
+
+def diffArgParse(argv = None):
+    parser = baseArgparse("caMarkdown's revision differ, shows the sections added, removed, recoded or resized between two commits")
+    parser.add_argument("first", type = str, help = "The older revision, a branch, tag or commit")
+    parser.add_argument("second", nargs = '?', type = str, default = 'HEAD', help = "The newer revision, HEAD by default")
+    parser.add_argument("--tags", '-t', nargs = '+', type = str, default = None, help = "only give the changes to these tags")
+    parser.add_argument("--list", '-l', action = 'store_true', default = False, help = "list every change, not just the counts for each code")
+    return parser.parse_args(sys.argv[2:] if argv is None else argv)
+
+def changeText(change):
+    if change.kind == 'added':
+        return "{}:{}:\tadded {} [{}-{}]\n".format(change.file, change.line, change.newTag, change.newStart, change.newEnd)
+    elif change.kind == 'removed':
+        return "{}:{}:\tremoved {} [{}-{}]\n".format(change.file, change.line, change.oldTag, change.oldStart, change.oldEnd)
+    elif change.kind == 'recoded':
+        return "{}:{}:\trecoded {} -> {} [{}-{}]\n".format(change.file, change.line, change.oldTag, change.newTag, change.newStart, change.newEnd)
+    else:
+        return "{}:{}:\tresized {} [{}-{}] -> [{}-{}]\n".format(change.file, change.line, change.oldTag, change.oldStart, change.oldEnd, change.newStart, change.newEnd)
+
+def startDiff(argv = None):
+    args = diffArgParse(argv)
+    try:
+        with openOutput(args) as writer:
+            try:
+                caDir = findTopDir('.')
+            except UninitializedDirectory:
+                writer.error("This is not caMarkdown repository or inside one.\nRun `camd init` to make it one")
+            else:
+                Proj = openProject(caDir)
+                try:
+                    changes = Proj.diff(args.first, args.second, tags = args.tags)
+                except GitRefMissing as e:
+                    writer.error(e)
+                else:
+                    if args.list:
+                        for change in changes:
+                            writer.record(change._asdict(), changeText(change))
+                    else:
+                        writer.record(None, "Code\tAdded\tRemoved\tRecoded from\tRecoded to\tResized\n")
+                        for tag, counts in sorted(changeCounts(changes).items()):
+                            if args.tags is not None and tag not in args.tags:
+                                continue
+                            record = {'tag' : tag}
+                            record.update(counts)
+                            writer.record(record, "{}\t{added}\t{removed}\t{recodedFrom}\t{recodedTo}\t{resized}\n".format(tag, **counts))
+                    writer.record(None, "{} change(s) in {} document(s)\n".format(len(changes), len(set(c.file for c in changes))))
+    except Exception as e:
+        #Prettify things if they go bad
+        generalExceptionHandler(e, args.debug)
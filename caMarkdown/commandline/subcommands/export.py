@@ -0,0 +1,54 @@
+import sys
+
+from .subCommandBase import baseArgparse, openOutput, generalExceptionHandler, openProject, positiveInt
+
+from ...caExceptions import UninitializedDirectory, ExportException
+from ...dirHanders import findTopDir
+from ...export import defaultBatchSize
+
+def exportArgParse(argv = None):
+    parser = baseArgparse("caMarkdown's section exporter")
+    parser.add_argument("target", type = str, help = "The file the sections are written to, its extension (.csv, .parquet or .arrow) gives the format. With --plain the directory the documents are written to")
+    parser.add_argument("--fileFormat", '-f', default = None, choices = ['csv', 'parquet', 'arrow'],
+    help = "the format to write, parquet and arrow need pyarrow")
+    parser.add_argument("--tags", nargs = '+', type = str, default = None,
+    help = "only export these tags")
+    parser.add_argument("--text", '-t',
+    default = False, action = 'store_true',
+    help = "include the text of each section")
+    parser.add_argument("--codebook", '-c', default = None, metavar = 'FILE',
+    help = "also write the codebook as a table to FILE")
+    parser.add_argument("--batch", type = positiveInt, default = defaultBatchSize, metavar = 'N',
+    help = "the number of rows written at a time")
+    parser.add_argument("--plain", '-p',
+    default = False, action = 'store_true',
+    help = "instead write each document's text without markup, as .txt, and its offset map and sections, as .json")
+    parser.add_argument("--workers", '-w', type = positiveInt, default = None, metavar = 'N',
+    help = "the number of documents done at once with --plain, by default one per CPU")
+    return parser.parse_args(sys.argv[2:] if argv is None else argv)
+
+def startExport(argv = None):
+    args = exportArgParse(argv)
+    try:
+        with openOutput(args) as writer:
+            try:
+                caDir = findTopDir('.')
+            except UninitializedDirectory:
+                writer.error("This is not caMarkdown repository or inside one.\nRun `camd init` to make it one")
+            else:
+                Proj = openProject(caDir)
+                if args.plain:
+                    count = Proj.exportPlain(args.target, workers = args.workers)
+                    writer.record({'target' : args.target, 'documents' : count}, "{} document(s) written to {}\n".format(count, args.target))
+                else:
+                    try:
+                        count = Proj.exportSections(args.target, fileFormat = args.fileFormat, tags = args.tags, text = args.text, batchSize = args.batch)
+                        writer.record({'target' : args.target, 'rows' : count}, "{} section(s) written to {}\n".format(count, args.target))
+                        if args.codebook is not None:
+                            count = Proj.exportCodebook(args.codebook, fileFormat = args.fileFormat)
+                            writer.record({'target' : args.codebook, 'rows' : count}, "{} code(s) written to {}\n".format(count, args.codebook))
+                    except ExportException as e:
+                        writer.error(e)
+    except Exception as e:
+        #Prettify things if they go bad
+        generalExceptionHandler(e, args.debug)
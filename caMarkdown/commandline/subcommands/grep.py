@@ -0,0 +1,35 @@
+import sys
+import re
+
+from .subCommandBase import baseArgparse, openOutput, generalExceptionHandler, openProject
+
+from ...dirHanders import findTopDir
+from ...caExceptions import UninitializedDirectory, QueryException
+
+def grepArgParse(argv = None):
+    parser = baseArgparse("caMarkdown's text searcher, searches the text of the documents without their markup")
+    parser.add_argument("pattern", type = str, help = "The regular expression searched for")
+    parser.add_argument("--in", dest = 'within', type = str, default = None, metavar = 'QUERY', help = "only give the matches inside the text of a tag, or any query `camd query` takes")
+    parser.add_argument("--ignoreCase", '-i', action = 'store_true', default = False, help = "ignore case when matching")
+    return parser.parse_args(sys.argv[2:] if argv is None else argv)
+
+def startGrep(argv = None):
+    args = grepArgParse(argv)
+    try:
+        with openOutput(args) as writer:
+            try:
+                caDir = findTopDir('.')
+            except UninitializedDirectory:
+                writer.error("This is not caMarkdown repository or inside one.\nRun `camd init` to make it one")
+            else:
+                Proj = openProject(caDir)
+                try:
+                    for match in Proj.grep(args.pattern, within = args.within, ignoreCase = args.ignoreCase):
+                        writer.record(match._asdict(), "{}:{}:\t{}\n".format(match.file, match.line, match.text.replace('\n', ' ')))
+                except QueryException as e:
+                    writer.error("The query could not be understood: {}".format(e))
+                except re.error as e:
+                    writer.error("The pattern could not be understood: {}".format(e))
+    except Exception as e:
+        #Prettify things if they go bad
+        generalExceptionHandler(e, args.debug)
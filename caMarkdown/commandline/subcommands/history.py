@@ -0,0 +1,55 @@
+import sys
+import io
+import csv
+import datetime
+
+from .subCommandBase import baseArgparse, openOutput, generalExceptionHandler, openProject
+
+from ...dirHanders import findTopDir
+from ...caExceptions import UninitializedDirectory, GitRefMissing
+
+def historyArgParse(argv = None):
+    parser = baseArgparse("caMarkdown's code historian, gives the number of sections of each code at every commit as CSV, or JSON with --format")
+    parser.add_argument("tags", nargs = '*', type = str, help = "The tags to be counted, by default all those ever used")
+    parser.add_argument("--ref", '-r', type = str, default = 'HEAD', help = "the branch, tag or commit whose history is given, following its first parents, HEAD by default")
+    return parser.parse_args(sys.argv[2:] if argv is None else argv)
+
+def csvLine(row):
+    s = io.StringIO()
+    csv.writer(s, lineterminator = '\n').writerow(row)
+    return s.getvalue()
+
+def startHistory(argv = None):
+    args = historyArgParse(argv)
+    try:
+        with openOutput(args) as writer:
+            try:
+                caDir = findTopDir('.')
+            except UninitializedDirectory:
+                writer.error("This is not caMarkdown repository or inside one.\nRun `camd init` to make it one")
+            else:
+                Proj = openProject(caDir)
+                try:
+                    points = list(Proj.history(ref = args.ref, tags = args.tags if len(args.tags) > 0 else None))
+                except GitRefMissing as e:
+                    writer.error(e)
+                else:
+                    if len(args.tags) > 0:
+                        tags = args.tags
+                    else:
+                        tags = sorted(set(tag for point in points for tag in point.counts))
+                    writer.record(None, csvLine(['commit', 'date', 'author', 'documents', 'sections'] + tags))
+                    for point in points:
+                        date = datetime.datetime.fromtimestamp(point.time, datetime.timezone.utc).isoformat()
+                        record = {
+                            'commit' : point.commit.id,
+                            'date' : date,
+                            'author' : point.author,
+                            'documents' : point.documents,
+                            'sections' : sum(point.counts.values()),
+                            'counts' : point.counts,
+                        }
+                        writer.record(record, csvLine([point.commit.id[:10], date, point.author, point.documents, record['sections']] + [point.counts.get(tag, 0) for tag in tags]))
+    except Exception as e:
+        #Prettify things if they go bad
+        generalExceptionHandler(e, args.debug)
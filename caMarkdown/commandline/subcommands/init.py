@@ -1,18 +1,18 @@
 import sys
 
-from .subCommandBase import baseArgparse, CommandOutputHandler, generalExceptionHandler
+from .subCommandBase import baseArgparse, openOutput, generalExceptionHandler
 
 from ...project import Project
 
-def initArgParse():
+def initArgParse(argv = None):
     parser = baseArgparse("caMarkdown's directory intilizer")
     parser.add_argument("dir", nargs = "?", type = str, help = "The directory for caMarkdown to intilize in", default = '.')
-    return parser.parse_args(sys.argv[2:])
+    return parser.parse_args(sys.argv[2:] if argv is None else argv)
 
-def startInit():
-    args = initArgParse()
+def startInit(argv = None):
+    args = initArgParse(argv)
     try:
-        with CommandOutputHandler(args.output) as writer:
+        with openOutput(args) as writer:
             P = Project(args.dir)
             if P.bad:
                 P.initializeDir()
@@ -0,0 +1,33 @@
+import sys
+import json
+
+from .subCommandBase import baseArgparse, openOutput, generalExceptionHandler
+from .summarize import writeSummary
+
+from ...summaries import Partial, mergePartials
+from ...caExceptions import SummaryException
+
+def mergeArgParse(argv = None):
+    parser = baseArgparse("caMarkdown's partial summary merger, combines the results of `camd summarize`. To merge codes use `camd mergecodes`")
+    parser.add_argument("partials", nargs = '+', type = str, help = "The partial results to be merged")
+    parser.add_argument("--target", '-t', type = str, default = None, metavar = 'FILE', help = "write the merged summary to FILE as JSON")
+    return parser.parse_args(sys.argv[2:] if argv is None else argv)
+
+def startMerge(argv = None):
+    args = mergeArgParse(argv)
+    try:
+        with openOutput(args) as writer:
+            try:
+                summary, missing = mergePartials(Partial.read(p) for p in args.partials)
+            except (SummaryException, OSError) as e:
+                writer.error(e)
+            else:
+                if len(missing) > 0:
+                    writer.error("Shard(s) {} are missing, the result only covers some of the documents.".format(', '.join(str(i) for i in missing)))
+                if args.target is not None:
+                    with open(args.target, 'w') as f:
+                        json.dump(summary.toDict(), f)
+                writeSummary(summary, writer)
+    except Exception as e:
+        #Prettify things if they go bad
+        generalExceptionHandler(e, args.debug)
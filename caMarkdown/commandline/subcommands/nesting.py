@@ -0,0 +1,36 @@
+import sys
+
+from .subCommandBase import baseArgparse, openOutput, generalExceptionHandler, openProject
+
+from ...caExceptions import UninitializedDirectory
+from ...dirHanders import findTopDir
+
+def nestingArgParse(argv = None):
+    parser = baseArgparse("caMarkdown's code nesting report")
+    parser.add_argument("tags", nargs = '*', type = str, help = "The tags to be reported on, by default all of them")
+    return parser.parse_args(sys.argv[2:] if argv is None else argv)
+
+def startNesting(argv = None):
+    args = nestingArgParse(argv)
+    try:
+        with openOutput(args) as writer:
+            try:
+                caDir = findTopDir('.')
+            except UninitializedDirectory:
+                writer.error("This is not caMarkdown repository or inside one.\nRun `camd init` to make it one")
+            else:
+                Proj = openProject(caDir)
+                if len(args.tags) > 0:
+                    graph = Proj.containmentGraph(tags = args.tags)
+                else:
+                    graph = Proj.containmentGraph()
+                if len(graph) > 0:
+                    writer.record(None, "Outer code\tInner code\tSections\n")
+                    for outerTag in sorted(graph.keys()):
+                        for innerTag, count in sorted(graph[outerTag].items(), key = lambda x: (-x[1], x[0])):
+                            writer.record({'outer' : outerTag, 'inner' : innerTag, 'sections' : count}, "{}\t{}\t{}\n".format(outerTag, innerTag, count))
+                else:
+                    writer.record(None, "No codes are nested within each other.\n")
+    except Exception as e:
+        #Prettify things if they go bad
+        generalExceptionHandler(e, args.debug)
@@ -1,25 +1,24 @@
 import sys
 
-from .subCommandBase import baseArgparse, CommandOutputHandler, generalExceptionHandler
+from .subCommandBase import baseArgparse, openOutput, generalExceptionHandler, openProject
 
-from ...project import Project
 from ...caExceptions import UninitializedDirectory
 from ...dirHanders import findTopDir
 
-def organizeArgParse():
+def organizeArgParse(argv = None):
     parser = baseArgparse("caMarkdown's automated codebook organizer ")
-    return parser.parse_args(sys.argv[2:])
+    return parser.parse_args(sys.argv[2:] if argv is None else argv)
 
-def startOrganize():
-    args = organizeArgParse()
+def startOrganize(argv = None):
+    args = organizeArgParse(argv)
     try:
-        with CommandOutputHandler(args.output) as writer:
+        with openOutput(args) as writer:
             try:
                 caDir = findTopDir('.')
             except UninitializedDirectory:
-                print("This is not caMarkdown repository or inside one.\nRun `camd init` to make it one")
+                writer.error("This is not caMarkdown repository or inside one.\nRun `camd init` to make it one")
             else:
-                Proj = Project(caDir)
+                Proj = openProject(caDir)
                 writer("organizing codebook\n")
                 Proj.organizeCodebook()
     except Exception as e:
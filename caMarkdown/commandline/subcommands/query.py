@@ -0,0 +1,48 @@
+import sys
+import pathlib
+
+from .subCommandBase import baseArgparse, openOutput, generalExceptionHandler, openProject
+
+from ...caExceptions import UninitializedDirectory, QueryException
+from ...dirHanders import findTopDir
+from ...documents import readText
+
+def queryArgParse(argv = None):
+    parser = baseArgparse("caMarkdown's section query client")
+    parser.add_argument("query", nargs = '+', type = str, help = "The query, codes combined with and, or, not, inside and near N, e.g. '$stress inside @workplace but not ^interviewer'")
+    parser.add_argument("--text", '-t',
+    default = False, action = 'store_true',
+    help = "print the text of each match")
+    return parser.parse_args(sys.argv[2:] if argv is None else argv)
+
+def startQuery(argv = None):
+    args = queryArgParse(argv)
+    try:
+        with openOutput(args) as writer:
+            try:
+                caDir = findTopDir('.')
+            except UninitializedDirectory:
+                writer.error("This is not caMarkdown repository or inside one.\nRun `camd init` to make it one")
+            else:
+                Proj = openProject(caDir)
+                try:
+                    matches = Proj.query(' '.join(args.query))
+                except QueryException as e:
+                    writer.error("The query could not be understood: {}".format(e))
+                else:
+                    writer.record(None, "{} match(es) found\n".format(len(matches)))
+                    docText = None
+                    docFile = None
+                    for match in matches:
+                        matchDict = match._asdict()
+                        matchText = "From {}\tLines {}-{}\tLength {}\n".format(match.file, match.line, match.endLine, match.end - match.start)
+                        if args.text:
+                            if match.file != docFile:
+                                docText = readText(pathlib.Path(Proj.path, match.file))
+                                docFile = match.file
+                            matchDict['text'] = docText[match.start:match.end]
+                            matchText += matchDict['text'] + '\n'
+                        writer.record(matchDict, matchText)
+    except Exception as e:
+        #Prettify things if they go bad
+        generalExceptionHandler(e, args.debug)
@@ -0,0 +1,62 @@
+import sys
+
+from .subCommandBase import baseArgparse, openOutput, generalExceptionHandler, openProject, positiveInt
+
+from ...dirHanders import findTopDir
+from ...caExceptions import UninitializedDirectory, RecodeException
+
+def recodeOptions(parser):
+    parser.add_argument("--dryRun", '-n', action = 'store_true', default = False, help = "only list the changes, the documents and codebook are not changed")
+    parser.add_argument("--workers", '-w', type = positiveInt, default = None, metavar = 'N', help = "the number of documents done at once, by default one per CPU")
+    return parser
+
+def renameArgParse(argv = None):
+    parser = baseArgparse("caMarkdown's code renamer, renames a code in all the documents and the codebook")
+    parser.add_argument("old", type = str, help = "The code to be renamed")
+    parser.add_argument("new", type = str, help = "Its new name")
+    recodeOptions(parser)
+    return parser.parse_args(sys.argv[2:] if argv is None else argv)
+
+def mergeCodesArgParse(argv = None):
+    parser = baseArgparse("caMarkdown's code merger, replaces codes with one code in all the documents and the codebook")
+    parser.add_argument("codes", nargs = '+', type = str, help = "The codes to be merged")
+    parser.add_argument("--into", required = True, type = str, metavar = 'CODE', help = "The code they become, it can be one of them")
+    recodeOptions(parser)
+    return parser.parse_args(sys.argv[2:] if argv is None else argv)
+
+def writeEdits(edits, writer, dryRun, verbose):
+    """Lists edits, all of them with dryRun or verbose, then gives the totals"""
+    for edit in edits:
+        writer.record(edit._asdict(), "{}:{}:\t({}) -> ({})\n".format(edit.file, edit.line, edit.old, edit.new) if dryRun or verbose else None)
+    writer.record(None, "{} section(s) in {} document(s) {}\n".format(len(edits), len(set(edit.file for edit in edits)), 'would be changed' if dryRun else 'changed'))
+
+def runRecode(args, recoder):
+    with openOutput(args) as writer:
+        try:
+            caDir = findTopDir('.')
+        except UninitializedDirectory:
+            writer.error("This is not caMarkdown repository or inside one.\nRun `camd init` to make it one")
+        else:
+            Proj = openProject(caDir)
+            try:
+                edits = recoder(Proj)
+            except RecodeException as e:
+                writer.error(e)
+            else:
+                writeEdits(edits, writer, args.dryRun, args.verbose)
+
+def startRename(argv = None):
+    args = renameArgParse(argv)
+    try:
+        runRecode(args, lambda Proj: Proj.renameCode(args.old, args.new, dryRun = args.dryRun, workers = args.workers))
+    except Exception as e:
+        #Prettify things if they go bad
+        generalExceptionHandler(e, args.debug)
+
+def startMergeCodes(argv = None):
+    args = mergeCodesArgParse(argv)
+    try:
+        runRecode(args, lambda Proj: Proj.mergeCodes(args.codes, args.into, dryRun = args.dryRun, workers = args.workers))
+    except Exception as e:
+        #Prettify things if they go bad
+        generalExceptionHandler(e, args.debug)
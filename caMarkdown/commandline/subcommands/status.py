@@ -1,60 +1,70 @@
 import sys
 
-from .subCommandBase import baseArgparse, CommandOutputHandler, generalExceptionHandler
+from .subCommandBase import baseArgparse, openOutput, generalExceptionHandler, openProject
 
-from ...project import Project
 from ...dirHanders import findTopDir
 from ...caExceptions import UninitializedDirectory
 
-def statusArgParse():
-    parser = baseArgparse("caMarkdown's status display")
-    return parser.parse_args(sys.argv[2:])
+def statusArgParse(argv = None):
+    parser = baseArgparse("caMarkdown's status display", readsDocuments = True)
+    return parser.parse_args(sys.argv[2:] if argv is None else argv)
 
-def makeStatusString(P):
+def makeStatusDict(P):
     codes = P.getCodes()
     files = P.getFiles()
     allFiles = P.getAllTrackedFiles()
-    s = "This project has {} codes and {} document(s).\n".format(len(codes), len(files))
+    status = {
+        'codes' : len(codes),
+        'documents' : len(files),
+        'untracked' : [],
+        'unDocumented' : [],
+        'unCommented' : [],
+        'unUsed' : [],
+        'commented' : [],
+    }
     if len(files) < len(allFiles):
-        untracked = []
         for fPath in allFiles:
             if fPath not in files:
-                untracked.append(str(fPath.relative_to(P.path)))
-        s += "There are {} untracked file(s). They are:\n\t{}\n".format(len(untracked), '\n\t'.join(untracked))
-    unCommented = {}
-    commented = {}
-    unDocumented = {}
-    unUsed = {}
+                status['untracked'].append(str(fPath.relative_to(P.path)))
     for tag, code in codes.items():
         if len(code.sections) < 1:
-            unUsed[tag] = code
+            status['unUsed'].append(tag)
         if code.unDocumented:
-            unDocumented[tag] = code
+            status['unDocumented'].append(tag)
         elif code.description:
-            commented[tag] = code
+            status['commented'].append(tag)
         else:
-            unCommented[tag] = code
-    if len(unDocumented) > 0:
-        s += "There are {} code(s) not in the codebook used in the texts. They are:\n\t{}\n".format(len(unDocumented), '\n\t'.join(unDocumented.keys()))
-    if len(unCommented) > 0:
-        s += "There are {} code(s) in the codebook without any description. They are:\n\t{}\n".format(len(unCommented), '\n\t'.join(unCommented.keys()))
-    if len(unUsed) > 0:
-        s += "There are {} code(s) in the codebook not used in the text. They are:\n\t{}\n".format(len(unUsed), '\n\t'.join(unUsed.keys()))
-    if len(commented) > 0:
-        s += "There are {} code(s) in the codebook with a description.\n".format(len(commented))
+            status['unCommented'].append(tag)
+    return status
+
+def makeStatusString(P, status = None):
+    if status is None:
+        status = makeStatusDict(P)
+    s = "This project has {} codes and {} document(s).\n".format(status['codes'], status['documents'])
+    if len(status['untracked']) > 0:
+        s += "There are {} untracked file(s). They are:\n\t{}\n".format(len(status['untracked']), '\n\t'.join(status['untracked']))
+    if len(status['unDocumented']) > 0:
+        s += "There are {} code(s) not in the codebook used in the texts. They are:\n\t{}\n".format(len(status['unDocumented']), '\n\t'.join(status['unDocumented']))
+    if len(status['unCommented']) > 0:
+        s += "There are {} code(s) in the codebook without any description. They are:\n\t{}\n".format(len(status['unCommented']), '\n\t'.join(status['unCommented']))
+    if len(status['unUsed']) > 0:
+        s += "There are {} code(s) in the codebook not used in the text. They are:\n\t{}\n".format(len(status['unUsed']), '\n\t'.join(status['unUsed']))
+    if len(status['commented']) > 0:
+        s += "There are {} code(s) in the codebook with a description.\n".format(len(status['commented']))
     return s
 
-def startStatus():
-    args = statusArgParse()
+def startStatus(argv = None):
+    args = statusArgParse(argv)
     try:
-        with CommandOutputHandler(args.output) as writer:
+        with openOutput(args) as writer:
             try:
                 caDir = findTopDir('.')
             except UninitializedDirectory:
-                writer("This is not caMarkdown repository or inside one.\nRun `camd init` to make it one")
+                writer.error("This is not caMarkdown repository or inside one.\nRun `camd init` to make it one")
             else:
-                Proj = Project(caDir)
-                writer(makeStatusString(Proj))
+                Proj = openProject(caDir, readWorkers = args.jobs)
+                status = makeStatusDict(Proj)
+                writer.record(status, makeStatusString(Proj, status))
     except Exception as e:
         #Prettify things if they go bad
         generalExceptionHandler(e, args.debug)
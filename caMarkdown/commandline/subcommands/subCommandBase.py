@@ -1,44 +1,175 @@
 import sys
 import argparse
 import locale
+import json
+import pathlib
 
-def baseArgparse(description):
+from ...documents import defaultReadWorkers
+from ...project import Project
+
+outputFormats = ['text', 'json', 'ndjson']
+flushPolicies = ['auto', 'line', 'buffered', 'exit']
+defaultBufferSize = 2 ** 16
+
+def positiveInt(value):
+    """An argparse type for numbers that must be at least 1"""
+    try:
+        number = int(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError("'{}' is not a whole number".format(value))
+    if number < 1:
+        raise argparse.ArgumentTypeError("{} is less than 1".format(number))
+    return number
+
+def baseArgparse(description, readsDocuments = False):
+    """The parser with the options every command has, readsDocuments adds --jobs for the commands that read the documents through `readDocuments()`"""
     parser = argparse.ArgumentParser(prog = ' '.join(sys.argv[:2]), description = description)
     parser.add_argument("--output", '-o', default = None,
     help = 'output file', metavar = 'FILE')
+    parser.add_argument("--format", dest = 'outputFormat', default = 'text', choices = outputFormats,
+    help = "text for people, json or ndjson (one JSON object per line) for scripts")
+    parser.add_argument("--flush", default = 'auto', choices = flushPolicies,
+    help = "when output is flushed: every write (line), when the buffer is full (buffered) or only at the end (exit). auto flushes every write on a terminal and buffers otherwise")
     parser.add_argument("--verbose", '-v',
     action = 'store_true', default = False,
     help = "be verbose")
     parser.add_argument("--debug", '-d',
     action = 'store_true', default = True,#TODO: Change back before release
     help = "debug mode, may cause crashes")
+    if readsDocuments:
+        parser.add_argument("--jobs", '-j', type = positiveInt,
+        default = defaultReadWorkers, metavar = 'N',
+        help = "the number of documents read at once, raise it on network filesystems")
     return parser
 
+#Set by `camd batch` so all its steps use the same Project, and its caches
+sharedProject = None
+
+#Set by `camd batch` so all its steps write to its output, in its format
+sharedWriter = None
+
+def openProject(caDir, readWorkers = defaultReadWorkers):
+    """Opens the Project at caDir, or gives the shared one if it is of caDir"""
+    if sharedProject is not None and sharedProject.path == pathlib.Path(caDir).resolve():
+        return sharedProject
+    return Project(caDir, readWorkers = readWorkers)
+
+def openOutput(args):
+    """Opens the `CommandOutputHandler` of args, or gives the shared one which is left open when the step is done"""
+    if sharedWriter is not None:
+        return sharedWriter
+    return CommandOutputHandler(args.output, outputFormat = args.outputFormat, flushPolicy = args.flush)
+
 def generalExceptionHandler(e, debugMode):
     if debugMode:
         raise e
     else:
-        print('A {} error was encounterd that caMarkdown was unable to deal with it had the message:\n"{}"\nIf you would like to help fix this error run in debug mode (--debug) and give the output to Reid.'.format(type(e).__name__, e))
+        print('A {} error was encounterd that caMarkdown was unable to deal with it had the message:\n"{}"\nIf you would like to help fix this error run in debug mode (--debug) and give the output to Reid.'.format(type(e).__name__, e), file = sys.stderr)
 
 class CommandOutputHandler(object):
-    def __init__(self, targetStream):
+    """Writes the output of a subcommand. Strings are for people, `record()` takes a dict for scripts, which is written as json or ndjson depending on outputFormat, plain strings then become {"message" : string} records.
+
+    Writes are buffered, flushPolicy decides when the buffer is written out, see `flushPolicies`.
+    """
+    def __init__(self, targetStream, outputFormat = 'text', flushPolicy = 'auto', bufferSize = defaultBufferSize):
         if targetStream is None:
             self.stream = sys.stdout
             self.closeOnExit = False
         else:
             self.stream = open(targetStream, mode = 'a', encoding = locale.getpreferredencoding())
             self.closeOnExit = True
+        if outputFormat not in outputFormats:
+            raise ValueError("'{}' is not an output format, the formats are: {}".format(outputFormat, ', '.join(outputFormats)))
+        if flushPolicy == 'auto':
+            try:
+                flushPolicy = 'line' if self.stream.isatty() else 'buffered'
+            except (AttributeError, ValueError):
+                flushPolicy = 'buffered'
+        elif flushPolicy not in flushPolicies:
+            raise ValueError("'{}' is not a flush policy, the policies are: {}".format(flushPolicy, ', '.join(flushPolicies)))
+        self.outputFormat = outputFormat
+        self.flushPolicy = flushPolicy
+        self.bufferSize = bufferSize
+        self.buffer = []
+        self.bufferedChars = 0
+        self.recordCount = 0
+        self.closed = False
+        #A shared handler is only flushed when used as a context manager, its owner closes it
+        self.shared = False
+
+    @property
+    def isText(self):
+        return self.outputFormat == 'text'
 
     def __call__(self, writtenString):
-        self.stream.write(writtenString)
+        if self.isText:
+            self.write(writtenString)
+        else:
+            self.record({'message' : writtenString.rstrip('\n')})
+
+    def record(self, data, text = None):
+        """Writes data, a JSON serializable dict, in the json formats or text, if given, in the text format. If data is None nothing is written in the json formats."""
+        if self.isText:
+            if text is not None:
+                self.write(text)
+            return
+        elif data is None:
+            return
+        elif self.outputFormat == 'ndjson':
+            self.write(json.dumps(data, default = str) + '\n')
+        else:
+            if self.recordCount == 0:
+                self.write('[\n')
+            else:
+                self.write(',\n')
+            self.write(json.dumps(data, default = str))
+        self.recordCount += 1
+
+    def error(self, message):
+        """Reports message, an error or warning, on stderr in the text format or as an {"error" : message} record in the json formats, so it never mixes with the output"""
+        if self.isText:
+            self.flush()
+            print(message, file = sys.stderr)
+        else:
+            self.record({'error' : str(message)})
+
+    def write(self, writtenString):
+        self.buffer.append(writtenString)
+        self.bufferedChars += len(writtenString)
+        if self.flushPolicy == 'line' or (self.flushPolicy == 'buffered' and self.bufferedChars >= self.bufferSize):
+            self.flush()
+
+    def flush(self):
+        if len(self.buffer) > 0:
+            self.stream.write(''.join(self.buffer))
+            self.buffer = []
+            self.bufferedChars = 0
         self.stream.flush()
 
+    def close(self):
+        if self.closed:
+            return
+        if self.outputFormat == 'json':
+            if self.recordCount == 0:
+                self.write('[]\n')
+            else:
+                self.write('\n]\n')
+        self.flush()
+        self.closed = True
+        if self.closeOnExit:
+            self.stream.close()
+
     def __enter__(self):
         return self
 
     def __exit__(self, exc_type, exc_value, traceback):
-        self.__del__()
+        if self.shared:
+            self.flush()
+        else:
+            self.close()
 
     def __del__(self):
-        if self.closeOnExit:
-            self.stream.close()
+        try:
+            self.close()
+        except (ValueError, AttributeError):
+            pass
@@ -0,0 +1,49 @@
+import sys
+
+from .subCommandBase import baseArgparse, openOutput, generalExceptionHandler, openProject
+
+from ...dirHanders import findTopDir
+from ...summaries import parseShard
+from ...caExceptions import UninitializedDirectory, SummaryException
+
+def summarizeArgParse(argv = None):
+    parser = baseArgparse("caMarkdown's partial summary maker, for splitting the analysis of a project across processes or machines")
+    parser.add_argument("target", type = str, help = "The file the partial result is written to, combine them with `camd merge`")
+    parser.add_argument("--shard", '-s', type = str, default = '1/1', metavar = 'i/n', help = "only summarize the ith of n shards of the documents, the shards are the same on every machine")
+    return parser.parse_args(sys.argv[2:] if argv is None else argv)
+
+def writeSummary(summary, writer):
+    """Writes the counts of a `Summary` for `camd summarize` and `camd merge`"""
+    writer.record(None, "{} document(s) with {} code(s).\n".format(summary.documents, len(summary.counts)))
+    writer.record(None, "Code\tSections\tLength\n")
+    for tag in summary.tags:
+        writer.record({'tag' : tag, 'sections' : summary.counts[tag], 'length' : summary.lengths[tag]}, "{}\t{}\t{}\n".format(tag, summary.counts[tag], summary.lengths[tag]))
+    if len(summary.containment) > 0:
+        writer.record(None, "Outer code\tInner code\tSections\tLength\n")
+        for outerTag in sorted(summary.containment):
+            for innerTag, count in sorted(summary.containment[outerTag].items()):
+                length = summary.overlap(outerTag, innerTag)
+                writer.record({'outer' : outerTag, 'inner' : innerTag, 'sections' : count, 'length' : length}, "{}\t{}\t{}\t{}\n".format(outerTag, innerTag, count, length))
+
+def startSummarize(argv = None):
+    args = summarizeArgParse(argv)
+    try:
+        with openOutput(args) as writer:
+            try:
+                caDir = findTopDir('.')
+            except UninitializedDirectory:
+                writer.error("This is not caMarkdown repository or inside one.\nRun `camd init` to make it one")
+            else:
+                try:
+                    index, count = parseShard(args.shard)
+                except SummaryException as e:
+                    writer.error(e)
+                else:
+                    Proj = openProject(caDir)
+                    partial = Proj.summarizeShard(index, count)
+                    partial.write(args.target)
+                    writer.record(None, "Shard {}/{} written to {}\n".format(index, count, args.target))
+                    writeSummary(partial.summary, writer)
+    except Exception as e:
+        #Prettify things if they go bad
+        generalExceptionHandler(e, args.debug)
@@ -1,28 +1,31 @@
 import sys
 
-from .subCommandBase import baseArgparse, CommandOutputHandler, generalExceptionHandler
+from .subCommandBase import baseArgparse, openOutput, generalExceptionHandler, openProject
 
-from ...project import Project
+from ...project import cacheDirName
+from ...defaultFiles.defaultGitignore import gitignoreName
 from ...caExceptions import UninitializedDirectory
 from ...dirHanders import findTopDir
 
-def syncArgParse():
-    parser = baseArgparse("caMarkdown's sync client")
+def syncArgParse(argv = None):
+    parser = baseArgparse("caMarkdown's sync client", readsDocuments = True)
     parser.add_argument("tags", nargs = '*', type = str, help = "The tags to be synced")
     #parser.add_argument("--description", '-d', nargs = '+', type = str, help = "The descriptions of the tags to be synced")
     #Needs to be rethought as interface currently does not work
-    return parser.parse_args(sys.argv[2:])
+    return parser.parse_args(sys.argv[2:] if argv is None else argv)
 
-def startSync():
-    args = syncArgParse()
+def startSync(argv = None):
+    args = syncArgParse(argv)
     try:
-        with CommandOutputHandler(args.output) as writer:
+        with openOutput(args) as writer:
             try:
                 caDir = findTopDir('.')
             except UninitializedDirectory:
-                print("This is not caMarkdown repository or inside one.\nRun `camd init` to make it one")
+                writer.error("This is not caMarkdown repository or inside one.\nRun `camd init` to make it one")
             else:
-                Proj = Project(caDir)
+                Proj = openProject(caDir, readWorkers = args.jobs)
+                if Proj.ignoreCache():
+                    writer("The cache directory, {}, was added to {}.\n".format(cacheDirName, gitignoreName))
                 codes = Proj.getCodes()
                 if len(args.tags) < 1:
                     unDocumented = []
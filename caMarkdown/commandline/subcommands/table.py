@@ -1,34 +1,33 @@
 import sys
 import collections
 
-from .subCommandBase import baseArgparse, CommandOutputHandler, generalExceptionHandler
+from .subCommandBase import baseArgparse, openOutput, generalExceptionHandler, openProject
 
 from ...dirHanders import findTopDir
 from ...caExceptions import UninitializedDirectory
-from ...project import Project
 
-def tableArgParse():
-    parser = baseArgparse("caMarkdown's table displayer")
+def tableArgParse(argv = None):
+    parser = baseArgparse("caMarkdown's table displayer", readsDocuments = True)
     parser.add_argument("tags", nargs = '+', type = str, help = "The tags to be tablulated")
-    return parser.parse_args(sys.argv[2:])
+    return parser.parse_args(sys.argv[2:] if argv is None else argv)
 
-def startTable():
-    args = tableArgParse()
+def startTable(argv = None):
+    args = tableArgParse(argv)
     try:
-        with CommandOutputHandler(args.output) as writer:
+        with openOutput(args) as writer:
             try:
                 caDir = findTopDir('.')
             except UninitializedDirectory:
-                print("This is not caMarkdown repository or inside one.\nRun `camd init` to make it one")
+                writer.error("This is not caMarkdown repository or inside one.\nRun `camd init` to make it one")
             else:
-                Proj = Project(caDir)
-                codes = Proj.getCodes()
+                Proj = openProject(caDir, readWorkers = args.jobs)
+                codes = Proj.getCodes(tags = args.tags)
                 tagsDict = collections.OrderedDict()
                 for tag in args.tags:
                     try:
                         tagsDict[tag] = codes[tag]
                     except KeyError:
-                        print("'{}' is not a tag in the codebook or the text, it cannot be used in a table, it will be skipped.".format(tag))
+                        writer.error("'{}' is not a tag in the codebook or the text, it cannot be used in a table, it will be skipped.".format(tag))
                 if len(tagsDict) > 0:
                     titles = []
                     lengths = []
@@ -37,13 +36,16 @@ def startTable():
                         titles.append(tagString)
                         lengths.append(str(len(tag)))
                         overlp = ["{} overlap".format(tagString)]
+                        overlapDict = collections.OrderedDict()
                         for tag2String in tagsDict.keys():
-                            overlp.append(str(sum((len(v2) for v2 in tag[tag2String]))))
+                            overlapDict[tag2String] = sum((len(v2) for v2 in tag[tag2String]))
+                            overlp.append(str(overlapDict[tag2String]))
                         overlaps.append('\t'.join(overlp))
-                    writer("Tags    \t{}\n".format('\t'.join(titles)))
-                    writer("Lengths \t{}\n".format('\t'.join(lengths)))
+                        writer.record({'tag' : tagString, 'count' : len(tag), 'overlaps' : overlapDict})
+                    writer.record(None, "Tags    \t{}\n".format('\t'.join(titles)))
+                    writer.record(None, "Lengths \t{}\n".format('\t'.join(lengths)))
                     for oString in overlaps:
-                        writer(oString + '\n')
+                        writer.record(None, oString + '\n')
                 else:
                     writer("No usable tags provided, please provide at least one to get a table.")
     except Exception as e:
@@ -1,39 +1,79 @@
 import sys
+import itertools
 
-from .subCommandBase import baseArgparse, CommandOutputHandler, generalExceptionHandler
+from .subCommandBase import baseArgparse, openOutput, generalExceptionHandler, openProject, positiveInt
 
-from ...project import Project
 from ...caExceptions import UninitializedDirectory
 from ...dirHanders import findTopDir
 
-def tagArgParse():
-    parser = baseArgparse("caMarkdown's tag manipulation client")
+def tagArgParse(argv = None):
+    parser = baseArgparse("caMarkdown's tag manipulation client", readsDocuments = True)
     parser.add_argument("tag", nargs = '?', type = str, help = "The tag being queried.", default = None)
-    return parser.parse_args(sys.argv[2:])
+    parser.add_argument("--kwic", '-k', type = positiveInt, default = None, metavar = 'N',
+    help = "show each section as a keyword in context line with N characters either side")
+    parser.add_argument("--page", type = positiveInt, default = None, metavar = 'P',
+    help = "only show the Pth page of keyword in context lines")
+    parser.add_argument("--pageSize", type = positiveInt, default = 50, metavar = 'S',
+    help = "the number of lines on a page, default 50")
+    return parser.parse_args(sys.argv[2:] if argv is None else argv)
 
-def startTag():
-    args = tagArgParse()
+def codeRecord(code):
+    return {
+        'tag' : code.tag,
+        'codeType' : type(code).__qualname__,
+        'count' : len(code),
+        'description' : code.description,
+        'unDocumented' : code.unDocumented,
+    }
+
+def sectionRecord(sec):
+    return {
+        'tag' : sec.tag,
+        'file' : sec.file,
+        'line' : sec.line,
+        'index' : sec.index,
+        'length' : len(sec),
+        'text' : sec.raw,
+    }
+
+def startTag(argv = None):
+    args = tagArgParse(argv)
     try:
-        with CommandOutputHandler(args.output) as writer:
+        with openOutput(args) as writer:
             try:
                 caDir = findTopDir('.')
             except UninitializedDirectory:
-                print("This is not caMarkdown repository or inside one.\nRun `camd init` to make it one")
+                writer.error("This is not caMarkdown repository or inside one.\nRun `camd init` to make it one")
             else:
-                Proj = Project(caDir)
+                Proj = openProject(caDir, readWorkers = args.jobs)
                 if args.tag is None:
-                    writer("No tag specified, listing all tags:\n")
+                    writer.record(None, "No tag specified, listing all tags:\n")
                     for tag in Proj.codes.values():
-                        writer(str(tag) + "\n")
-                elif args.tag in Proj.codes:
-                    targetCode = Proj.codes[args.tag]
-                    writer("Getting the information on {}\n".format(args.tag))
-                    writer(str(targetCode) + '\n')
-                    writer("The tag is used for the following pieces of text:\n")
-                    for sec in targetCode.sections:
-                        writer(str(sec) + '\n')
+                        writer.record(codeRecord(tag), str(tag) + "\n")
+                elif args.kwic is not None:
+                    lines = Proj.concordance(args.tag, args.kwic)
+                    if args.page is not None:
+                        lines = itertools.islice(lines, (args.page - 1) * args.pageSize, args.page * args.pageSize)
+                    lineCount = 0
+                    for line in lines:
+                        writer.record(line._asdict(), "{}:{}\t{:>{width}} [{}] {}\n".format(line.file, line.line, line.left, line.keyword, line.right, width = args.kwic))
+                        lineCount += 1
+                    if lineCount < 1:
+                        if args.page is not None and args.page > 1:
+                            writer.error("Page {} is past the last page of {}".format(args.page, args.tag))
+                        else:
+                            writer.error("{} has no sections in any of the documents.\nRun `camd tag` to get a list of all the tags.".format(args.tag))
                 else:
-                    print("{} is not in any of the documents or in the codebook.\nRun `camd tag` to get a list of all the tags.".format(args.tag))
+                    codes = Proj.getCodes(tags = [args.tag])
+                    if args.tag in codes:
+                        targetCode = codes[args.tag]
+                        writer.record(None, "Getting the information on {}\n".format(args.tag))
+                        writer.record(codeRecord(targetCode), str(targetCode) + '\n')
+                        writer.record(None, "The tag is used for the following pieces of text:\n")
+                        for sec in targetCode.sections:
+                            writer.record(sectionRecord(sec), str(sec) + '\n')
+                    else:
+                        writer.error("{} is not in any of the documents or in the codebook.\nRun `camd tag` to get a list of all the tags.".format(args.tag))
     except Exception as e:
         #Prettify things if they go bad
         generalExceptionHandler(e, args.debug)
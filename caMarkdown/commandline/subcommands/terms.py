@@ -0,0 +1,37 @@
+import sys
+
+from .subCommandBase import baseArgparse, openOutput, generalExceptionHandler, openProject, positiveInt
+
+from ...dirHanders import findTopDir
+from ...termstats import rankingMethods
+from ...caExceptions import UninitializedDirectory, TermStatsException, MissingDependency
+
+def termsArgParse(argv = None):
+    parser = baseArgparse("caMarkdown's term ranker, finds the most characteristic words of a code")
+    parser.add_argument("tag", type = str, help = "The tag whose words are ranked")
+    parser.add_argument("--method", '-m', default = 'tfidf', choices = rankingMethods, help = "tfidf treats the text of each code as a document, logodds compares the code's text with the rest of the documents")
+    parser.add_argument("--top", '-n', type = positiveInt, default = 20, metavar = 'N', help = "the number of words shown")
+    parser.add_argument("--minCount", type = positiveInt, default = 2, metavar = 'N', help = "leave out words used fewer than N times in the code")
+    return parser.parse_args(sys.argv[2:] if argv is None else argv)
+
+def startTerms(argv = None):
+    args = termsArgParse(argv)
+    try:
+        with openOutput(args) as writer:
+            try:
+                caDir = findTopDir('.')
+            except UninitializedDirectory:
+                writer.error("This is not caMarkdown repository or inside one.\nRun `camd init` to make it one")
+            else:
+                Proj = openProject(caDir)
+                try:
+                    ranked = Proj.termStats().top(args.tag, count = args.top, method = args.method, minCount = args.minCount)
+                except (TermStatsException, MissingDependency) as e:
+                    writer.error(e)
+                else:
+                    writer.record(None, "Term\tScore\tCount\n")
+                    for term, score, count in ranked:
+                        writer.record({'tag' : args.tag, 'term' : term, 'score' : score, 'count' : count}, "{}\t{:.4f}\t{}\n".format(term, score, count))
+    except Exception as e:
+        #Prettify things if they go bad
+        generalExceptionHandler(e, args.debug)
@@ -0,0 +1,70 @@
+import sys
+import pathlib
+
+from .subCommandBase import baseArgparse, openOutput, generalExceptionHandler, positiveInt
+
+from ...workspace import Workspace
+from ...defaultFiles.defaultCodebook import codeBookName
+from ...caExceptions import WorkspaceException
+
+def workspaceArgParse(argv = None):
+    parser = baseArgparse("caMarkdown's multi-project reporter", readsDocuments = True)
+    parser.add_argument("action", choices = ['status', 'table'], help = "status gives the codes of every project and their totals, table the overlaps of some codes across all the projects")
+    parser.add_argument("roots", nargs = '*', type = str, help = "The projects' directories, by default all the projects directly inside the current directory")
+    parser.add_argument("--tags", '-t', nargs = '+', type = str, default = [], help = "The tags to be tabulated")
+    parser.add_argument("--workers", '-w', type = positiveInt, default = None, metavar = 'N', help = "the number of projects parsed at once, by default one per CPU")
+    return parser.parse_args(sys.argv[2:] if argv is None else argv)
+
+def findProjects(targetDir):
+    return sorted(p for p in pathlib.Path(targetDir).iterdir() if pathlib.Path(p, codeBookName).is_file())
+
+def writeStatus(W, writer):
+    summaries = W.summaries()
+    writer.record(None, "Project\tDocuments\tCodes\tSections\tUndocumented\n")
+    for name, summary in summaries.items():
+        writer.record({'project' : name, 'documents' : summary.documents, 'codes' : len(summary.counts), 'sections' : sum(summary.counts.values()), 'unDocumented' : sorted(summary.unDocumented)},
+        "{}\t{}\t{}\t{}\t{}\n".format(name, summary.documents, len(summary.counts), sum(summary.counts.values()), len(summary.unDocumented)))
+    total = W.summary()
+    writer.record(None, "The {} projects have {} codes and {} document(s) in all.\n".format(len(summaries), len(total.counts), total.documents))
+    for name, summary in summaries.items():
+        if len(summary.unDocumented) > 0:
+            writer.record(None, "{} has {} code(s) not in its codebook. They are:\n\t{}\n".format(name, len(summary.unDocumented), '\n\t'.join(sorted(summary.unDocumented))))
+    projectCounts = W.projectCounts()
+    writer.record(None, "Code\tProjects\tSections\tLength\n")
+    for tag in sorted(total.tags, key = lambda t: (-projectCounts[t], -total.counts[t], t)):
+        writer.record({'tag' : tag, 'projects' : projectCounts[tag], 'sections' : total.counts[tag], 'length' : total.lengths[tag]},
+        "{}\t{}\t{}\t{}\n".format(tag, projectCounts[tag], total.counts[tag], total.lengths[tag]))
+
+def writeTable(W, tags, writer):
+    total = W.summary()
+    writer.record(None, "Tags    \t{}\n".format('\t'.join(tags)))
+    writer.record(None, "Lengths \t{}\n".format('\t'.join(str(total.counts.get(tag, 0)) for tag in tags)))
+    for tag in tags:
+        overlaps = {tag2 : total.overlap(tag, tag2) for tag2 in tags}
+        writer.record({'tag' : tag, 'count' : total.counts.get(tag, 0), 'overlaps' : overlaps},
+        "{} overlap\t{}\n".format(tag, '\t'.join(str(overlaps[tag2]) for tag2 in tags)))
+
+def startWorkspace(argv = None):
+    args = workspaceArgParse(argv)
+    try:
+        with openOutput(args) as writer:
+            roots = args.roots
+            if len(roots) < 1:
+                roots = findProjects('.')
+            if len(roots) < 1:
+                writer.error("No caMarkdown projects were given or found in the current directory.")
+            elif args.action == 'table' and len(args.tags) < 1:
+                writer.error("No tags provided, please provide at least one with --tags to get a table.")
+            else:
+                try:
+                    W = Workspace(roots, workers = args.workers, readWorkers = args.jobs)
+                except WorkspaceException as e:
+                    writer.error(e)
+                else:
+                    if args.action == 'status':
+                        writeStatus(W, writer)
+                    else:
+                        writeTable(W, args.tags, writer)
+    except Exception as e:
+        #Prettify things if they go bad
+        generalExceptionHandler(e, args.debug)
@@ -0,0 +1,47 @@
+import re
+import collections
+
+from .codes import stripSpans
+from .documents import documentEncoding
+
+ConcordanceLine = collections.namedtuple('ConcordanceLine', ['file', 'line', 'left', 'keyword', 'right'])
+
+whitespaceRegex = re.compile(r'\s+')
+
+def cleanWindow(buffer, spans, start, end):
+    return whitespaceRegex.sub(' ', stripSpans(buffer, start, end, spans).decode(documentEncoding, errors = 'ignore'))
+
+def contextBefore(buffer, spans, pos, width):
+    """The last width characters of clean text before pos, the window of bytes read grows until there are enough"""
+    if width < 1:
+        return ''
+    window = width * 4 + 16
+    while True:
+        low = max(0, pos - window)
+        text = cleanWindow(buffer, spans, low, pos)
+        if len(text) >= width or low == 0:
+            return text[-width:]
+        window *= 2
+
+def contextAfter(buffer, spans, pos, width):
+    """The first width characters of clean text after pos"""
+    if width < 1:
+        return ''
+    window = width * 4 + 16
+    while True:
+        high = min(len(buffer), pos + window)
+        text = cleanWindow(buffer, spans, pos, high)
+        if len(text) >= width or high == len(buffer):
+            return text[:width]
+        window *= 2
+
+def iterConcordance(doc, tag, width):
+    """Yields a `ConcordanceLine` for each section of tag in doc, a `MappedDocument`, in order. Only the bytes around each section are decoded and sections longer than twice width have their middle elided, width must be at least 1."""
+    if width < 1:
+        raise ValueError("The width of the context must be at least 1, not {}".format(width))
+    sections, spans = doc.scan()
+    for sec in sorted((s for s in sections if s.tag == tag), key = lambda s: s.start):
+        keyword = cleanWindow(doc.buffer, spans, sec.start + 1, sec.textEnd).strip()
+        if len(keyword) > 2 * width + 5:
+            keyword = "{} ... {}".format(keyword[:width], keyword[-width:])
+        yield ConcordanceLine(sec.file, sec.line, contextBefore(doc.buffer, spans, sec.start, width), keyword, contextAfter(doc.buffer, spans, sec.end, width))
@@ -0,0 +1,51 @@
+import collections
+
+from .codes import codeTypes
+from .plaintext import stripMarkup
+
+#The coverage of all the codes together is given under allCodes, the others are under their code type's character
+allCodes = 'all'
+
+Coverage = collections.namedtuple('Coverage', ['file', 'codeType', 'length', 'covered', 'gaps', 'depths'])
+Coverage.__doc__ = """How much of a document is coded, with codes of codeType. length is the length of the document's text without markup, covered that of the text within at least one section, gaps the (start, end) spans of the uncoded text and depths a dict of how many characters are within that many sections, 0 is uncoded. All offsets are in the text without markup."""
+
+def coverageFraction(coverage):
+    if coverage.length < 1:
+        return 0.0
+    return coverage.covered / coverage.length
+
+def sweep(intervals, length):
+    """Sweeps over intervals, in order of their offsets, counting how many are open. Returns the uncoded gaps and the depth histogram, see `Coverage`."""
+    events = []
+    for start, end in intervals:
+        if end > start:
+            events.append((start, 1))
+            events.append((end, -1))
+    #Ends sort before starts at the same offset so touching intervals do not overlap
+    events.sort()
+    depths = {}
+    gaps = []
+    depth = 0
+    pos = 0
+    for offset, change in events:
+        if offset > pos:
+            depths[depth] = depths.get(depth, 0) + offset - pos
+            if depth == 0:
+                gaps.append((pos, offset))
+            pos = offset
+        depth += change
+    if length > pos:
+        depths[0] = depths.get(0, 0) + length - pos
+        gaps.append((pos, length))
+    return gaps, depths
+
+def documentCoverage(source, filePath = None):
+    """Computes the `Coverage` of source, a str, for all the codes together and for each type of code. Returns a dict keyed by `allCodes` and the code type characters."""
+    plain = stripMarkup(source, filePath)
+    length = len(plain.text)
+    ret = {}
+    for codeType in [allCodes] + list(codeTypes.keys()):
+        typeIntervals = [(sec.start, sec.end) for sec in plain.sections if codeType == allCodes or sec.tag[0] == codeType]
+        gaps, depths = sweep(typeIntervals, length)
+        ret[codeType] = Coverage(filePath, codeType, length, length - depths.get(0, 0), gaps, depths)
+    return ret
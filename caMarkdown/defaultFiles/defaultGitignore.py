@@ -2,10 +2,29 @@ import pathlib
 
 gitignoreName =  ".gitignore"
 
-defaultGitignore = "#Put the files you want git and caMarkdown to not track here:\n"
+#caMarkdown's cache directory, see `Project.cachePath()`
+cacheIgnoreRule = ".camd/"
+
+defaultGitignore = "#Put the files you want git and caMarkdown to not track here:\n{}\n".format(cacheIgnoreRule)
 
 
 def makeGitignore(targetDir):
     """Makes .gitignore in the current working dir"""
     with open(str(pathlib.Path(targetDir, gitignoreName)), 'x') as target:
         target.write(defaultGitignore)
+
+def addIgnoreRule(targetDir, rule = cacheIgnoreRule):
+    """Adds rule to the .gitignore in targetDir if it is not already there, for projects made before rule was in the default. Returns True if it was added."""
+    target = pathlib.Path(targetDir, gitignoreName)
+    try:
+        with open(str(target)) as f:
+            current = f.read()
+    except FileNotFoundError:
+        current = ''
+    if any(line.strip().strip('/') == rule.strip('/') for line in current.splitlines()):
+        return False
+    with open(str(target), 'a') as f:
+        if len(current) > 0 and not current.endswith('\n'):
+            f.write('\n')
+        f.write(rule + '\n')
+    return True
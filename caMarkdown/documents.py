@@ -0,0 +1,160 @@
+import mmap
+import os
+import shutil
+import tempfile
+import pathlib
+import re
+import collections
+import concurrent.futures
+
+from .codes import SectionScanner, defaultChunkSize
+
+documentEncoding = 'utf-8'
+
+markupBytes = b']('
+
+defaultReadWorkers = 8
+
+class MappedDocument(object):
+    """A read only memory map of a document. The markup characters are all ASCII so the UTF-8 bytes are scanned directly and the `Section`s it gives have byte offsets, only the slices of text that are asked for get decoded.
+    """
+    def __init__(self, targetPath, filePath = None):
+        self.path = pathlib.Path(targetPath)
+        if filePath is None:
+            self.file = self.path
+        else:
+            self.file = filePath
+        self._f = open(str(self.path), 'rb')
+        try:
+            self.buffer = mmap.mmap(self._f.fileno(), 0, access = mmap.ACCESS_READ)
+        except ValueError:
+            #Empty files cannot be mapped
+            self.buffer = b''
+        except Exception:
+            self._f.close()
+            raise
+
+    def __len__(self):
+        return len(self.buffer)
+
+    def __repr__(self):
+        return "< MappedDocument {} [{}] >".format(self.file, len(self))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def close(self):
+        if isinstance(self.buffer, mmap.mmap):
+            self.buffer.close()
+        self.buffer = b''
+        self._f.close()
+
+    def sections(self, chunkSize = defaultChunkSize):
+        """Yields the `Section`s of the document, the offsets are in bytes"""
+        scanner = SectionScanner(self.file)
+        for i in range(0, len(self.buffer), chunkSize):
+            for sec in scanner.feed(self.buffer[i:i + chunkSize]):
+                yield sec
+        scanner.close()
+
+    def scan(self, chunkSize = defaultChunkSize):
+        """Returns all the `Section`s of the document and the spans of its markup, see `SectionScanner.markupSpans()`"""
+        scanner = SectionScanner(self.file, keepMarkup = True)
+        sections = []
+        for i in range(0, len(self.buffer), chunkSize):
+            sections += scanner.feed(self.buffer[i:i + chunkSize])
+        scanner.close()
+        return sections, scanner.markupSpans()
+
+    def text(self, start = 0, end = None, errors = 'strict'):
+        """Decodes the bytes from start to end"""
+        if end is None:
+            end = len(self.buffer)
+        return self.buffer[start:end].decode(documentEncoding, errors = errors)
+
+    def sectionText(self, sec):
+        """The text of sec, nested markup included"""
+        return self.text(sec.start + 1, sec.textEnd)
+
+def hasMarkup(buffer):
+    """Checks if buffer, bytes or a mmap, has a '](' so could contain a code"""
+    return buffer.find(markupBytes) >= 0
+
+def tagsPattern(tags):
+    """Makes a bytes regex that finds any of tags used as a code, i.e. one of the space separated tokens in the braces"""
+    alternatives = b'|'.join(re.escape(tag.encode(documentEncoding)) for tag in tags)
+    return re.compile(br'(?<=[( ])(?:' + alternatives + br')(?=[ )])')
+
+def mayContainTags(buffer, tags = None):
+    """A fast check on the bytes of a document. If False there are no codes, or none of tags, in buffer so it does not need to be parsed. If tags is None any code will do."""
+    if not hasMarkup(buffer):
+        return False
+    elif tags is None:
+        return True
+    elif len(tags) < 1:
+        return False
+    else:
+        return tagsPattern(tags).search(buffer) is not None
+
+def fileMayContainTags(targetPath, tags = None):
+    """`mayContainTags` on the file at targetPath"""
+    with MappedDocument(targetPath) as doc:
+        return mayContainTags(doc.buffer, tags)
+
+def writeTemporary(targetPath, text):
+    """Writes text, a str, to a new temporary file next to targetPath, with the same permissions, and returns its path. Renaming it over targetPath, with `os.replace()`, then swaps the document in one step. The line endings of text are kept as they are."""
+    targetPath = pathlib.Path(targetPath)
+    fd, tempName = tempfile.mkstemp(prefix = '.' + targetPath.name + '.', suffix = '.tmp', dir = str(targetPath.parent))
+    try:
+        with open(fd, 'w', encoding = documentEncoding, newline = '') as f:
+            f.write(text)
+        if targetPath.exists():
+            shutil.copymode(str(targetPath), tempName)
+    except BaseException:
+        removeTemporary(tempName)
+        raise
+    return tempName
+
+def removeTemporary(tempName):
+    try:
+        os.unlink(tempName)
+    except OSError:
+        pass
+
+def writeAtomically(targetPath, text):
+    """Replaces the document at targetPath with text, through `writeTemporary()`, so a reader, or a crash, never sees a partly written document"""
+    tempName = writeTemporary(targetPath, text)
+    try:
+        os.replace(tempName, str(targetPath))
+    except BaseException:
+        removeTemporary(tempName)
+        raise
+
+def readText(targetPath):
+    """Reads the document at targetPath as a str. Its line endings are kept as they are, with newline = '', so offsets in the str are those of its decoded bytes, as the parsers of the mapped and read ahead documents give them."""
+    with open(str(targetPath), encoding = documentEncoding, newline = '') as f:
+        return f.read()
+
+def readBytes(targetPath):
+    with open(str(targetPath), 'rb') as f:
+        return f.read()
+
+def readDocuments(targetPaths, workers = defaultReadWorkers):
+    """Yields (path, bytes) for each of targetPaths, in order. With more than one worker the files are read ahead in a thread pool with at most workers files read but not yet yielded, so on network filesystems the latency of each read overlaps with the processing of the ones before it."""
+    if workers is None or workers <= 1:
+        for targetPath in targetPaths:
+            yield targetPath, readBytes(targetPath)
+        return
+    with concurrent.futures.ThreadPoolExecutor(max_workers = workers) as executor:
+        pending = collections.deque()
+        for targetPath in targetPaths:
+            if len(pending) >= workers:
+                readPath, future = pending.popleft()
+                yield readPath, future.result()
+            pending.append((targetPath, executor.submit(readBytes, targetPath)))
+        while len(pending) > 0:
+            readPath, future = pending.popleft()
+            yield readPath, future.result()
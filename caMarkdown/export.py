@@ -0,0 +1,163 @@
+import csv
+import json
+import pathlib
+import itertools
+import concurrent.futures
+
+try:
+    import pyarrow
+    import pyarrow.parquet
+    import pyarrow.ipc
+except ImportError:
+    pyarrow = None
+
+from .codes import iterNesting, codeTypes
+from .documents import documentEncoding, readText
+from .plaintext import stripMarkup
+from .caExceptions import ExportException
+
+defaultBatchSize = 10000
+
+exportFormats = {
+    '.csv' : 'csv',
+    '.parquet' : 'parquet',
+    '.arrow' : 'arrow',
+    '.feather' : 'arrow',
+}
+
+sectionColumns = [('tag', 'string'), ('codeType', 'string'), ('file', 'string'), ('start', 'int64'), ('end', 'int64'), ('line', 'int64'), ('endLine', 'int64'), ('length', 'int64'), ('parentStart', 'int64'), ('parentTags', 'string')]
+textColumn = ('text', 'string')
+codebookColumns = [('tag', 'string'), ('codeType', 'string'), ('description', 'string')]
+
+class CSVTableWriter(object):
+    def __init__(self, target, columns):
+        self.columns = [name for name, colType in columns]
+        self.f = open(str(target), 'w', newline = '', encoding = documentEncoding)
+        self.writer = csv.DictWriter(self.f, self.columns)
+        self.writer.writeheader()
+
+    def writeBatch(self, rows):
+        self.writer.writerows(rows)
+
+    def close(self):
+        self.f.close()
+
+class ArrowTableWriter(object):
+    def __init__(self, target, columns, fileFormat):
+        if pyarrow is None:
+            raise ExportException("pyarrow is needed to write {} files, it can be installed with `pip install pyarrow`.".format(fileFormat))
+        self.columns = [name for name, colType in columns]
+        self.schema = pyarrow.schema([(name, getattr(pyarrow, colType)()) for name, colType in columns])
+        if fileFormat == 'parquet':
+            self.writer = pyarrow.parquet.ParquetWriter(str(target), self.schema)
+        else:
+            self.writer = pyarrow.ipc.new_file(str(target), self.schema)
+
+    def writeBatch(self, rows):
+        arrays = [[row[name] for row in rows] for name in self.columns]
+        self.writer.write_batch(pyarrow.RecordBatch.from_arrays([pyarrow.array(a, type = f.type) for a, f in zip(arrays, self.schema)], schema = self.schema))
+
+    def close(self):
+        self.writer.close()
+
+def getFormat(target, fileFormat = None):
+    if fileFormat is None:
+        try:
+            return exportFormats[pathlib.Path(target).suffix.lower()]
+        except KeyError:
+            raise ExportException("The format of '{}' could not be worked out from its extension, the known extensions are: {}".format(target, ', '.join(exportFormats.keys())))
+    elif fileFormat not in exportFormats.values():
+        raise ExportException("'{}' is not a known export format, the known formats are: {}".format(fileFormat, ', '.join(sorted(set(exportFormats.values())))))
+    return fileFormat
+
+def openTableWriter(target, columns, fileFormat = None):
+    fileFormat = getFormat(target, fileFormat)
+    if fileFormat == 'csv':
+        return CSVTableWriter(target, columns)
+    else:
+        return ArrowTableWriter(target, columns, fileFormat)
+
+def writeRows(rows, target, columns, fileFormat = None, batchSize = defaultBatchSize):
+    """Writes rows, an iterable of dicts, to target batchSize rows at a time and returns the number written"""
+    writer = openTableWriter(target, columns, fileFormat)
+    count = 0
+    try:
+        while True:
+            batch = list(itertools.islice(rows, batchSize))
+            if len(batch) < 1:
+                break
+            writer.writeBatch(batch)
+            count += len(batch)
+    finally:
+        writer.close()
+    return count
+
+def iterSectionRows(project, tags = None, text = False):
+    """Yields a dict for each section of project, one file at a time with the sections ordered by start"""
+    for fname, sections in itertools.groupby(project.iterSections(tags = tags), key = lambda s: s.file):
+        if text:
+            docText = readText(pathlib.Path(project.path, fname))
+        for sec, parents in iterNesting(sections):
+            row = {
+                'tag' : sec.tag,
+                'codeType' : codeTypes[sec.tag[0]].__name__,
+                'file' : str(sec.file),
+                'start' : sec.start,
+                'end' : sec.end,
+                'line' : sec.line,
+                'endLine' : sec.endLine,
+                'length' : sec.length,
+                'parentStart' : None,
+                'parentTags' : None,
+            }
+            if len(parents) > 0:
+                row['parentStart'] = parents[-1].start
+                row['parentTags'] = ' '.join(p.tag for p in parents if p.start == parents[-1].start)
+            if text:
+                row['text'] = docText[sec.start + 1:sec.textEnd]
+            yield row
+
+def exportSections(project, target, fileFormat = None, tags = None, text = False, batchSize = defaultBatchSize):
+    """Writes one row per section of project to target, as csv, parquet or arrow. The format is taken from the extension of target if not given. The rows are written in batches so memory use stays flat."""
+    columns = list(sectionColumns)
+    if text:
+        columns.append(textColumn)
+    return writeRows(iterSectionRows(project, tags = tags, text = text), target, columns, fileFormat = fileFormat, batchSize = batchSize)
+
+def exportCodebook(project, target, fileFormat = None):
+    """Writes one row per code in the codebook of project to target"""
+    rows = []
+    for tag, data in sorted(project.readCodes().items()):
+        if isinstance(data, dict):
+            description = data.get('description')
+        else:
+            description = None
+        rows.append({'tag' : tag, 'codeType' : codeTypes[tag[0]].__name__, 'description' : description})
+    return writeRows(iter(rows), target, codebookColumns, fileFormat = fileFormat)
+
+def writePlainDocument(sourcePath, relativePath, targetDir):
+    """Writes the text of the document at sourcePath without its markup to relativePath + '.txt' in targetDir, and its `OffsetMap` and sections, in clean coordinates, to relativePath + '.json'. Returns the number of sections."""
+    plain = stripMarkup(readText(sourcePath), relativePath)
+    target = pathlib.Path(targetDir, relativePath)
+    target.parent.mkdir(parents = True, exist_ok = True)
+    with open(str(target) + '.txt', 'w', encoding = documentEncoding, newline = '') as f:
+        f.write(plain.text)
+    with open(str(target) + '.json', 'w', encoding = documentEncoding) as f:
+        json.dump({
+            'file' : pathlib.PurePath(relativePath).as_posix(),
+            'sections' : [sec._asdict() for sec in plain.sections],
+            'offsets' : plain.offsets.toDict(),
+        }, f)
+    return len(plain.sections)
+
+def exportPlain(project, targetDir, workers = None):
+    """Writes the clean text and offset map of every document of project to targetDir, see `writePlainDocument()`, in parallel worker processes. Returns the number of documents written."""
+    jobs = [(str(fname), str(fname.relative_to(project.path)), str(targetDir)) for fname in project.getFiles()]
+    if workers == 1 or len(jobs) < 2:
+        for job in jobs:
+            writePlainDocument(*job)
+    else:
+        with concurrent.futures.ProcessPoolExecutor(max_workers = workers) as executor:
+            for future in [executor.submit(writePlainDocument, *job) for job in jobs]:
+                future.result()
+    return len(jobs)
@@ -1,11 +1,13 @@
+import sys
+
 from ..caExceptions import GitException
 
 try:
     from .gitPythonStuff import *
-    print("***DEBUG***: Using gitPython")
+    print("***DEBUG***: Using gitPython", file = sys.stderr)
 except (ImportError, AttributeError):
     try:
         from .dulwichStuff import *
-        print("***DEBUG***: Using dulwich")
+        print("***DEBUG***: Using dulwich", file = sys.stderr)
     except (ImportError, AttributeError):
         raise GitException("You need to have gitPython or dulwich installed to use caMarkdown.")
@@ -0,0 +1,7 @@
+import collections
+
+CommitInfo = collections.namedtuple('CommitInfo', ['id', 'time', 'author', 'message', 'tree'])
+CommitInfo.__doc__ = """A commit as the git wrappers give it, id and tree are hex ids and time is seconds since the epoch"""
+
+BlameLine = collections.namedtuple('BlameLine', ['commit', 'author', 'time'])
+BlameLine.__doc__ = """The commit that last changed a line of a file, its hex id, author and time of authoring"""
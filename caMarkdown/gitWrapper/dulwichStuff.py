@@ -1,10 +1,18 @@
+import re
+import stat
+import pathlib
+
 import dulwich.repo
 import dulwich.objects
 import dulwich.errors
+import dulwich.objectspec
+import dulwich.object_store
+import dulwich.porcelain
 
-from ..caExceptions import GitException, GitRepositoryMissing
+from .commits import CommitInfo, BlameLine
+from ..caExceptions import GitException, GitRepositoryMissing, GitRefMissing
 
-__all__ = ['containsGitRepo', 'openRepo', 'init']
+__all__ = ['containsGitRepo', 'openRepo', 'init', 'readBlob', 'treeBlobs', 'readBlobId', 'iterCommits', 'CommitInfo', 'commitId', 'blameLines', 'BlameLine']
 
 def containsGitRepo(targetDir):
     """Checks if targetDir can be initialized as a git repo"""
@@ -22,6 +30,86 @@ def openRepo(targetDir):
     except dulwich.errors.NotGitRepository:
         raise GitRepositoryMissing("No git repo found at {}".format(targetDir))
 
+#git's suffixes for going back through the parents of a commit, e.g. HEAD~2 or HEAD^2
+revisionRegex = re.compile(r'^(.+?)((?:[~^]\d*)*)$')
+suffixRegex = re.compile(r'([~^])(\d*)')
+
+def resolveCommit(repo, ref):
+    """The commit named by ref, a branch, tag or commit id, which can be followed by ~N and ^N as in git"""
+    match = revisionRegex.match(ref)
+    if match is None:
+        raise GitRefMissing("There is no branch, tag or commit named '{}'".format(ref))
+    base, suffixes = match.groups()
+    try:
+        commit = dulwich.objectspec.parse_commit(repo, base)
+    except (KeyError, ValueError, dulwich.errors.NotCommitError):
+        raise GitRefMissing("There is no branch, tag or commit named '{}'".format(ref))
+    try:
+        for op, count in suffixRegex.findall(suffixes):
+            count = 1 if count == '' else int(count)
+            if op == '~':
+                for i in range(count):
+                    commit = repo[commit.parents[0]]
+            elif count > 0:
+                commit = repo[commit.parents[count - 1]]
+    except IndexError:
+        raise GitRefMissing("'{}' goes back past the first commit".format(ref))
+    return commit
+
+def readBlob(repo, ref, path):
+    """Returns the bytes of the file at path, relative to the root of repo, as it is in the commit ref, or None if it is not in that commit"""
+    commit = resolveCommit(repo, ref)
+    try:
+        mode, sha = dulwich.object_store.tree_lookup_path(repo.__getitem__, commit.tree, pathlib.PurePath(path).as_posix().encode('utf-8'))
+    except (KeyError, dulwich.errors.NotTreeError):
+        return None
+    return repo[sha].as_raw_string()
+
+def treeBlobs(repo, ref):
+    """Returns a dict of the path, relative to the root of repo, of every file in the commit ref to the hex id of its blob"""
+    commit = resolveCommit(repo, ref)
+    ret = {}
+    if hasattr(dulwich.object_store, 'iter_tree_contents'):
+        entries = dulwich.object_store.iter_tree_contents(repo.object_store, commit.tree)
+    else:
+        #Older versions of dulwich only have the method
+        entries = repo.object_store.iter_tree_contents(commit.tree)
+    for entry in entries:
+        if stat.S_ISREG(entry.mode):
+            ret[entry.path.decode('utf-8')] = entry.sha.decode('ascii')
+    return ret
+
+def readBlobId(repo, blobId):
+    """Returns the bytes of the blob with the hex id blobId"""
+    try:
+        return repo[blobId.encode('ascii')].as_raw_string()
+    except KeyError:
+        raise GitException("There is no blob with the id '{}'".format(blobId))
+
+def iterCommits(repo, ref = 'HEAD'):
+    """Yields a `CommitInfo` for each commit on the first parent line of ref, oldest first"""
+    commits = []
+    commit = resolveCommit(repo, ref)
+    while True:
+        commits.append(CommitInfo(commit.id.decode('ascii'), commit.commit_time, commit.author.decode('utf-8', errors = 'replace'), commit.message.decode('utf-8', errors = 'replace'), commit.tree.decode('ascii')))
+        if len(commit.parents) < 1:
+            break
+        commit = repo[commit.parents[0]]
+    for info in reversed(commits):
+        yield info
+
+def commitId(repo, ref):
+    """The hex id of the commit ref"""
+    return resolveCommit(repo, ref).id.decode('ascii')
+
+def blameLines(repo, ref, path):
+    """Returns a `BlameLine` for each line of the file at path, relative to the root of repo, in the commit ref"""
+    commit = resolveCommit(repo, ref)
+    ret = []
+    for (lineCommit, entry), line in dulwich.porcelain.annotate(repo, pathlib.PurePath(path).as_posix().encode('utf-8'), commit.id):
+        ret.append(BlameLine(lineCommit.id.decode('ascii'), lineCommit.author.decode('utf-8', errors = 'replace'), lineCommit.author_time))
+    return ret
+
 def init(targetDir):
     """initializes and retuns targetDir as a dulwich repo
     """
@@ -1,8 +1,11 @@
+import pathlib
+
 import git
 
-from ..caExceptions import GitException, GitRepositoryMissing
+from .commits import CommitInfo, BlameLine
+from ..caExceptions import GitException, GitRepositoryMissing, GitRefMissing
 
-__all__ = ['containsGitRepo', 'openRepo', 'init']
+__all__ = ['containsGitRepo', 'openRepo', 'init', 'readBlob', 'treeBlobs', 'readBlobId', 'iterCommits', 'CommitInfo', 'commitId', 'blameLines', 'BlameLine']
 
 def containsGitRepo(targetDir):
     """Checks if targetDir can be initialized as a git repo"""
@@ -20,6 +23,53 @@ def openRepo(targetDir):
     except git.exc.InvalidGitRepositoryError:
         raise GitRepositoryMissing("No git repo found at {}".format(targetDir))
 
+def resolveCommit(repo, ref):
+    """The commit named by ref, a branch, tag or commit id"""
+    try:
+        return repo.commit(ref)
+    except (git.exc.BadName, ValueError):
+        raise GitRefMissing("There is no branch, tag or commit named '{}'".format(ref))
+
+def readBlob(repo, ref, path):
+    """Returns the bytes of the file at path, relative to the root of repo, as it is in the commit ref, or None if it is not in that commit"""
+    commit = resolveCommit(repo, ref)
+    try:
+        blob = commit.tree / pathlib.PurePath(path).as_posix()
+    except KeyError:
+        return None
+    return blob.data_stream.read()
+
+def treeBlobs(repo, ref):
+    """Returns a dict of the path, relative to the root of repo, of every file in the commit ref to the hex id of its blob"""
+    commit = resolveCommit(repo, ref)
+    return {item.path : item.hexsha for item in commit.tree.traverse() if item.type == 'blob'}
+
+def readBlobId(repo, blobId):
+    """Returns the bytes of the blob with the hex id blobId"""
+    try:
+        return repo.odb.stream(bytes.fromhex(blobId)).read()
+    except (ValueError, git.exc.BadObject):
+        raise GitException("There is no blob with the id '{}'".format(blobId))
+
+def iterCommits(repo, ref = 'HEAD'):
+    """Yields a `CommitInfo` for each commit on the first parent line of ref, oldest first"""
+    resolveCommit(repo, ref)
+    commits = list(repo.iter_commits(ref, first_parent = True))
+    for commit in reversed(commits):
+        yield CommitInfo(commit.hexsha, commit.committed_date, "{} <{}>".format(commit.author.name, commit.author.email), commit.message, commit.tree.hexsha)
+
+def commitId(repo, ref):
+    """The hex id of the commit ref"""
+    return resolveCommit(repo, ref).hexsha
+
+def blameLines(repo, ref, path):
+    """Returns a `BlameLine` for each line of the file at path, relative to the root of repo, in the commit ref"""
+    resolveCommit(repo, ref)
+    ret = []
+    for commit, lines in repo.blame(ref, pathlib.PurePath(path).as_posix()):
+        ret += [BlameLine(commit.hexsha, "{} <{}>".format(commit.author.name, commit.author.email), commit.authored_date)] * len(lines)
+    return ret
+
 def init(targetDir):
     """initializes and retuns targetDir as a gitPython repo
     """
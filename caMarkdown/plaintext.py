@@ -0,0 +1,89 @@
+import re
+import array
+import bisect
+import collections
+
+from .codes import scanMarkup
+
+PlainText = collections.namedtuple('PlainText', ['text', 'offsets', 'sections'])
+PlainText.__doc__ = """A document without its markup. offsets is the `OffsetMap` between the clean text and the raw document and sections the `CleanSpan`s of its codes."""
+
+CleanSpan = collections.namedtuple('CleanSpan', ['tag', 'start', 'end', 'line', 'endLine'])
+CleanSpan.__doc__ = """Where the text of a section is in the clean text, start and end are offsets into `PlainText.text`"""
+
+tokenRegex = re.compile(r'\w+')
+
+def tokenize(text):
+    """Splits text into words, returns the lowercased words and the lists of their start and end offsets"""
+    terms = []
+    starts = []
+    ends = []
+    for match in tokenRegex.finditer(text):
+        terms.append(match.group().lower())
+        starts.append(match.start())
+        ends.append(match.end())
+    return terms, starts, ends
+
+class OffsetMap(object):
+    """Maps offsets in the clean text of a document to the raw document and back. The clean text is made of runs of the raw text between pieces of markup, cleanStarts and rawStarts are arrays of where each run starts in each, so a lookup is a bisect of one of them."""
+    def __init__(self, spans, rawLength):
+        self.cleanStarts = array.array('q')
+        self.rawStarts = array.array('q')
+        clean = 0
+        raw = 0
+        for start, end in spans:
+            if start > raw:
+                self.cleanStarts.append(clean)
+                self.rawStarts.append(raw)
+                clean += start - raw
+            raw = max(raw, end)
+        if rawLength > raw or len(self.rawStarts) < 1:
+            self.cleanStarts.append(clean)
+            self.rawStarts.append(raw)
+            clean += rawLength - raw
+        self.cleanLength = clean
+        self.rawLength = rawLength
+
+    def __len__(self):
+        return len(self.cleanStarts)
+
+    def __repr__(self):
+        return "< OffsetMap [{} runs, {} to {}] >".format(len(self), self.rawLength, self.cleanLength)
+
+    def toDict(self):
+        """The runs as lists, for JSON, `fromDict()` reads them back"""
+        return {'cleanStarts' : self.cleanStarts.tolist(), 'rawStarts' : self.rawStarts.tolist(), 'cleanLength' : self.cleanLength, 'rawLength' : self.rawLength}
+
+    @classmethod
+    def fromDict(cls, data):
+        offsets = cls.__new__(cls)
+        offsets.cleanStarts = array.array('q', data['cleanStarts'])
+        offsets.rawStarts = array.array('q', data['rawStarts'])
+        offsets.cleanLength = data['cleanLength']
+        offsets.rawLength = data['rawLength']
+        return offsets
+
+    def runLength(self, i):
+        if i + 1 < len(self.cleanStarts):
+            return self.cleanStarts[i + 1] - self.cleanStarts[i]
+        return self.cleanLength - self.cleanStarts[i]
+
+    def toRaw(self, cleanOffset):
+        """The offset in the raw document of the character at cleanOffset in the clean text"""
+        i = max(bisect.bisect_right(self.cleanStarts, cleanOffset) - 1, 0)
+        return self.rawStarts[i] + cleanOffset - self.cleanStarts[i]
+
+    def toClean(self, rawOffset):
+        """The offset in the clean text of rawOffset in the raw document, offsets within markup go to the end of the text before it"""
+        i = bisect.bisect_right(self.rawStarts, rawOffset) - 1
+        if i < 0:
+            return 0
+        return self.cleanStarts[i] + min(rawOffset - self.rawStarts[i], self.runLength(i))
+
+def stripMarkup(source, filePath = None):
+    """Removes the markup from source, a str, in one scan. Returns a `PlainText` of the clean text, the `OffsetMap` from it to source and the spans of the sections in the clean text."""
+    sections, spans = scanMarkup(source, filePath)
+    offsets = OffsetMap(spans, len(source))
+    text = ''.join(source[raw:raw + offsets.runLength(i)] for i, raw in enumerate(offsets.rawStarts))
+    cleanSections = [CleanSpan(sec.tag, offsets.toClean(sec.start + 1), offsets.toClean(sec.textEnd), sec.line, sec.endLine) for sec in sections]
+    return PlainText(text, offsets, cleanSections)
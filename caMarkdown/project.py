@@ -3,23 +3,43 @@ import os
 import os.path
 import fnmatch
 import collections
+import itertools
 import shutil
 import re
+import copy
+import hashlib
 
 import yaml
 
 from .defaultFiles.defaultCodebook import makeCodeBook, codeBookName, codebookHeaders, charHeaderMap, codebookFileHeader, headerCharMap
 from .defaultFiles.defaultConf import makeConf, confName
-from .defaultFiles.defaultGitignore import makeGitignore, gitignoreName
+from .defaultFiles.defaultGitignore import makeGitignore, gitignoreName, addIgnoreRule
 from .defaultFiles.defaultCaignore import makeCAignore, caIgnoreName
-from .gitWrapper import openRepo, init
-from .codes import parseTree, codeTypes, makeCode
+from .gitWrapper import openRepo, init, readBlob
+from .codes import parseTree, Corpus, codeTypes, makeCode, iterSections, containmentCounts
+from .query import parseQuery, runQuery
+from .export import exportSections, exportCodebook, exportPlain, defaultBatchSize
+from .sectionTable import SectionTable
+from .summaries import Summary, Partial, inShard
+from .agreement import Agreement
+from .coverage import documentCoverage
+from .termstats import TermStats, readTokens, termMatrixName
+from .trigrams import TrigramIndex
+from .autocode import RuleSet, readRules, autocodeProject
+from .recode import recodeProject
+from .revisions import BlobCache, diffRevisions, codeHistory
+from .blame import attributeSections
+from .concordance import iterConcordance
+from .documents import MappedDocument, documentEncoding, hasMarkup, mayContainTags, fileMayContainTags, readDocuments, defaultReadWorkers
 from .caExceptions import AddingException, UninitializedDirectory, ProjectDirectoryMissing, ProjectMissingFiles, ProjectException, ProjectTypeError, CodeBookException, ProjectFileError, ProjectCodeError, ProjectGitError, ProjectReservedFileError, GitRepositoryMissing
 
 reservedFileNames = [codeBookName, confName, gitignoreName, caIgnoreName]
 
+#Where caMarkdown keeps the things it can rebuild, it is in the default .gitignore
+cacheDirName = '.camd'
+
 class Project(object):
-    def __init__(self, dirName):
+    def __init__(self, dirName, readWorkers = defaultReadWorkers):
         if isinstance(dirName, pathlib.Path):
             self.path = dirName.resolve()
         elif isinstance(dirName, str):
@@ -29,8 +49,12 @@ class Project(object):
         self.Repo = None
         self.error = None
         self.bad = False
+        self.readWorkers = readWorkers
 
         self._code = None
+        self._trees = {}
+        self._codebook = None
+        self._termStats = None
 
         try:
             self.openDir()
@@ -226,10 +250,13 @@ class Project(object):
                 f.seek(0)
                 f.write(yaml.safe_dump(yamlDict, allow_unicode=True, default_flow_style=False))
                 f.truncate()
+            self._codebook = None
+            self._code = None
 
     def addCode(self, targetCode, description = None):
-        if targetCode in self.codes:
-            if not self.codes[targetCode].unDocumented:
+        existingCodes = self.getCodes(tags = [targetCode])
+        if targetCode in existingCodes:
+            if not existingCodes[targetCode].unDocumented:
                 raise ProjectCodeError("The code '{}' already exists".format(targetCode))
         if targetCode[0] not in codeTypes:
             raise ProjectCodeError("The code '{}' does not start with the correct character, it cannot be a code.".format(targetCode))
@@ -255,6 +282,8 @@ class Project(object):
             f.seek(0)
             f.write(yaml.safe_dump(yamlDict, allow_unicode=True, default_flow_style=False))
             f.truncate()
+        self._codebook = None
+        self._code = None
 
     def organizeCodebook(self):
         """Rewrites the codebook with properly formatted YAML"""
@@ -270,6 +299,8 @@ class Project(object):
             f.seek(0)
             f.write(re.sub(r': null\n', lambda x: '\n', dumpString))
             f.truncate()
+        self._codebook = None
+        self._code = None
 
     def getFiles(self):
         """gets all files from codebook"""
@@ -301,19 +332,254 @@ class Project(object):
         #return getFiles(self.path, condensedRule)
         return getFiles(self.path, lambda x: x.name[0] != '.' and x.name not in reservedFileNames) #Return all nonhidden files
 
-    def parseTree(self):
+    def parseTree(self, tags = None):
+        """Parses each of the documents and returns them as a `Corpus`. If tags is given the documents that cannot contain any of tags are not parsed and left out. The documents are read ahead by `readWorkers` threads.
+
+        The trees are kept, so later calls only parse the documents that have changed or were left out before.
+        """
         files = self.getFiles()
-        if len(files) > 0:
-            with open(str(files[0]), 'r') as f:
-                tree = parseTree(f.read(), files[0].relative_to(self.path))
-            for fname in files[1:]:
-                with open(str(fname), 'r') as f:
-                    tree += parseTree(f.read(), fname.relative_to(self.path))
-        else:
-            tree = parseTree('')
-        return tree
+        trees = {}
+        toRead = []
+        stamps = {}
+        for fname in files:
+            stat = fname.stat()
+            stamps[fname] = (stat.st_mtime_ns, stat.st_size)
+            try:
+                stamp, tree = self._trees[fname]
+            except KeyError:
+                toRead.append(fname)
+            else:
+                if stamp == stamps[fname]:
+                    trees[fname] = tree
+                else:
+                    toRead.append(fname)
+        for fname, docBytes in readDocuments(toRead, workers = self.readWorkers):
+            if not hasMarkup(docBytes):
+                tree = parseTree('', fname.relative_to(self.path))
+            elif mayContainTags(docBytes, tags):
+                tree = parseTree(docBytes.decode(documentEncoding), fname.relative_to(self.path))
+            else:
+                continue
+            self._trees[fname] = (stamps[fname], tree)
+            trees[fname] = tree
+        return Corpus(trees[fname] for fname in files if fname in trees)
+
+    def clearCache(self):
+        """Drops the parsed documents, codebook, codes and term statistics kept in memory"""
+        self._trees = {}
+        self._codebook = None
+        self._termStats = None
+        self._code = None
+
+    def cachePath(self, name, makeDir = False):
+        """The path of the cache file name, in the project's cache directory. The directory is only made if makeDir, for writing, so reading the cache leaves the project as it was. When it is made it is added to .gitignore if it is not already there."""
+        cacheDir = pathlib.Path(self.path, cacheDirName)
+        if makeDir and not cacheDir.is_dir():
+            cacheDir.mkdir(exist_ok = True)
+            self.ignoreCache()
+        return pathlib.Path(cacheDir, name)
+
+    def ignoreCache(self):
+        """Adds the cache directory to the project's .gitignore, which projects made before it was in the default lack. Returns True if it was added."""
+        return addIgnoreRule(self.path)
+
+    def fingerprint(self, files = None):
+        """A hash of the modification times and sizes of the codebook and files, by default all the documents. It changes when any of them do."""
+        if files is None:
+            files = self.readFilesList()
+        h = hashlib.sha1()
+        for fname in [pathlib.Path(self.path, codeBookName)] + sorted(pathlib.Path(self.path, f) for f in files):
+            try:
+                stat = fname.stat()
+            except FileNotFoundError:
+                stamp = None
+            else:
+                stamp = (stat.st_mtime_ns, stat.st_size)
+            h.update("{}\t{}\n".format(fname.relative_to(self.path), stamp).encode(documentEncoding))
+        return h.hexdigest()
+
+    def shardFiles(self, index, count):
+        """The documents in shard index of count, see `inShard()`"""
+        return [fname for fname in self.getFiles() if inShard(fname.relative_to(self.path), index, count)]
+
+    def summarizeShard(self, index, count):
+        """Makes the `Partial` of shard index of count, see `inShard()`"""
+        files = self.shardFiles(index, count)
+        return Partial(self.summarize(files = files), (index, count), [fname.relative_to(self.path) for fname in files])
+
+    def summarize(self, files = None):
+        """Makes a `Summary` of the documents, by default all of them. The documents are read one at a time without building parse trees."""
+        if files is None:
+            files = self.getFiles()
+        summary = Summary()
+        summary.documents = len(files)
+        for fname, sections in itertools.groupby(self.iterSections(files = files), key = lambda s: s.file):
+            summary.add(sections)
+        codebookCodes = self.readCodes()
+        summary.unDocumented = set(tag for tag in summary.counts if tag not in codebookCodes)
+        return summary
+
+    def openDocument(self, targetPath):
+        """Memory maps the document at targetPath, relative paths are taken from the project's root"""
+        targetPath = pathlib.Path(self.path, targetPath)
+        return MappedDocument(targetPath, targetPath.relative_to(self.path))
+
+    def iterSections(self, tags = None, files = None, mapped = False):
+        """Yields the `Section`s of the documents one at a time without building any parse trees, so memory use does not grow with the size of the documents. tags and files restrict the sections to those tags and files, by default all the files in the codebook are read.
+
+        If mapped is True the documents are memory mapped and never decoded, the offsets of the sections are then in bytes not characters.
+        """
+        if files is None:
+            files = self.getFiles()
+        if tags is not None:
+            tags = set(tags)
+        for fname in files:
+            fname = pathlib.Path(self.path, fname)
+            if mapped:
+                with self.openDocument(fname) as doc:
+                    if mayContainTags(doc.buffer, tags):
+                        for sec in doc.sections():
+                            if tags is None or sec.tag in tags:
+                                yield sec
+            elif fileMayContainTags(fname, tags):
+                #newline = '' keeps '\r\n' so the offsets match those of `parseTree()`
+                with open(str(fname), 'r', encoding = documentEncoding, newline = '') as f:
+                    for sec in iterSections(f, fname.relative_to(self.path)):
+                        if tags is None or sec.tag in tags:
+                            yield sec
+
+    def containmentGraph(self, tags = None):
+        """Counts for every pair of codes how many sections of one are nested within sections of the other, the result is {outerTag : {innerTag : count}}. If tags is given only those codes are counted."""
+        graph = {}
+        for fname, sections in itertools.groupby(self.iterSections(tags = tags), key = lambda s: s.file):
+            containmentCounts(sections, graph)
+        return graph
+
+    def query(self, queryString):
+        """Runs a query, see `parseQuery()` for the syntax, over the documents and returns the `Match`es. Only the sections of the codes in the query are read."""
+        query = parseQuery(queryString)
+        return runQuery(query, self.iterSections(tags = query.tags()))
+
+    def exportSections(self, target, fileFormat = None, tags = None, text = False, batchSize = defaultBatchSize):
+        """Streams one row per section to target as csv, or parquet or arrow if pyarrow is installed. Returns the number of rows written."""
+        return exportSections(self, target, fileFormat = fileFormat, tags = tags, text = text, batchSize = batchSize)
+
+    def exportCodebook(self, target, fileFormat = None):
+        """Writes the codes in the codebook to target as a table"""
+        return exportCodebook(self, target, fileFormat = fileFormat)
+
+    def exportPlain(self, targetDir, workers = None):
+        """Writes the text of each document without its markup, along with its offset map and sections, to targetDir. The documents are done in parallel by workers processes. Returns the number of documents written."""
+        return exportPlain(self, targetDir, workers = workers)
+
+    def concordance(self, tag, width, files = None):
+        """Yields a keyword-in-context `ConcordanceLine` for each section of tag, with width characters of clean text either side. The documents are memory mapped and only the text around the sections is decoded."""
+        if files is None:
+            files = self.getFiles()
+        for fname in files:
+            with self.openDocument(fname) as doc:
+                if mayContainTags(doc.buffer, [tag]):
+                    for line in iterConcordance(doc, tag, width):
+                        yield line
+
+    def agreement(self, firstRef, secondRef, tags = None, unit = 'char', files = None):
+        """Compares the coding of the documents in two commits, e.g. the branches of two coders, and returns an `Agreement`. The documents are read from git so neither needs to be checked out. By default all the documents in the codebook are compared, over all the codes used in either. unit is 'char' or 'token'. Needs numpy."""
+        agreement = Agreement(unit = unit)
+        if files is None:
+            files = self.readFilesList()
+        for fname in files:
+            fname = pathlib.Path(self.path, fname).relative_to(self.path)
+            firstBytes = readBlob(self.Repo, firstRef, fname)
+            secondBytes = readBlob(self.Repo, secondRef, fname)
+            if firstBytes is None or secondBytes is None:
+                agreement.skipped.append(fname)
+            else:
+                agreement.addDocument(fname, firstBytes.decode(documentEncoding), secondBytes.decode(documentEncoding), tags = tags)
+        return agreement
+
+    def diff(self, firstRef, secondRef, tags = None):
+        """Compares the sections of the documents in the commits firstRef and secondRef and returns the list of `SectionChange`s, those of tags if given. Only the documents whose blobs differ between the commits are parsed, and each blob only once as they are cached by id."""
+        return diffRevisions(self, firstRef, secondRef, tags = tags, cache = BlobCache(self))
+
+    def history(self, ref = 'HEAD', tags = None):
+        """Yields a `HistoryPoint`, the counts of the codes, for each commit on the first parent line of ref, oldest first. Only the documents that changed from one commit to the next are reparsed, and each blob only once, see `codeHistory()`."""
+        return codeHistory(self, ref = ref, tags = tags, cache = BlobCache(self))
+
+    def blame(self, ref = 'HEAD', tags = None, workers = None):
+        """Finds who coded each section of the documents in the commit ref, see `attributeSections()`. The blame of each document is cached by its path and blob id so only the documents changed since the last call are blamed again."""
+        return attributeSections(self, ref = ref, tags = tags, workers = workers)
+
+    def coverage(self, files = None):
+        """Yields, for each document, a dict of the `Coverage` of its text by all the codes and by each type of code, see `documentCoverage()`. The documents are read ahead by `readWorkers` threads."""
+        if files is None:
+            files = self.getFiles()
+        for fname, docBytes in readDocuments([pathlib.Path(self.path, f) for f in files], workers = self.readWorkers):
+            yield documentCoverage(docBytes.decode(documentEncoding), fname.relative_to(self.path))
+
+    def termStats(self):
+        """Makes the `TermStats`, the counts of the words in the sections of each code, for ranking the words of codes. Each document's words are cached in the cache directory until it changes and the matrix until any document does. Needs numpy."""
+        key = self.fingerprint()
+        if self._termStats is None or self._termStats[0] != key:
+            matrixPath = self.cachePath(termMatrixName)
+            stats = TermStats.load(matrixPath, key)
+            if stats is None:
+                stats = TermStats.fromDocuments(readTokens(self, fname) for fname in self.getFiles())
+                stats.save(self.cachePath(termMatrixName, makeDir = True), key)
+            self._termStats = (key, stats)
+        return self._termStats[1]
+
+    def trigramIndex(self):
+        """Opens the `TrigramIndex` of the documents' text, updating it for any documents that have changed"""
+        index = TrigramIndex(self)
+        index.update()
+        return index
+
+    def grep(self, pattern, within = None, ignoreCase = False):
+        """Yields a `GrepMatch` for each match of the regex pattern in the text of the documents, without markup. within is a query, e.g. a tag, that the matches must be inside, see `parseQuery()`. The trigram index is used to skip the documents and positions that cannot match."""
+        return self.trigramIndex().grep(pattern, within = within, ignoreCase = ignoreCase)
+
+    def autocode(self, rules, dryRun = False, workers = None, files = None):
+        """Codes the matches of rules, a rules file or a list of `Rule`s, in the documents, see `autocodeText()`. The documents are done in parallel worker processes and each is replaced atomically. Returns a list of (file, `RuleCount`s), if dryRun the documents are left as they were."""
+        if not isinstance(rules, RuleSet):
+            if isinstance(rules, (str, pathlib.Path)):
+                rules = readRules(rules)
+            rules = RuleSet(rules)
+        results = list(autocodeProject(self, rules, dryRun = dryRun, workers = workers, files = files))
+        if not dryRun:
+            self.clearCache()
+        return results
+
+    def renameCode(self, oldCode, newCode, dryRun = False, workers = None):
+        """Renames oldCode to newCode in every document and the codebook, see `recodeProject()`. Returns the list of `Edit`s made, or that would be made if dryRun."""
+        return self.recode({oldCode : newCode}, dryRun = dryRun, workers = workers)
+
+    def mergeCodes(self, oldCodes, newCode, dryRun = False, workers = None):
+        """Replaces each of oldCodes with newCode in every document and the codebook, a section with more than one of them gets newCode once"""
+        return self.recode({code : newCode for code in oldCodes}, dryRun = dryRun, workers = workers)
+
+    def recode(self, mapping, dryRun = False, workers = None):
+        edits = recodeProject(self, mapping, dryRun = dryRun, workers = workers)
+        if not dryRun:
+            self.clearCache()
+        return edits
+
+    def sectionTable(self, tags = None):
+        """Makes a `SectionTable`, NumPy arrays of the sections, for vectorized analysis. Needs numpy."""
+        return SectionTable(self.iterSections(tags = tags))
 
     def readCodebook(self):
+        """Returns the codes and files in the codebook. The codebook is only reread when it has changed since the last call."""
+        try:
+            stat = pathlib.Path(self.path, codeBookName).stat()
+        except FileNotFoundError:
+            raise ProjectMissingFiles("{} missing".format(codeBookName))
+        stamp = (stat.st_mtime_ns, stat.st_size)
+        if self._codebook is None or self._codebook[0] != stamp:
+            self._codebook = (stamp, self._parseCodebook())
+        #The code's data dicts are consumed by `addDocs()` so copies are given out
+        return copy.deepcopy(self._codebook[1])
+
+    def _parseCodebook(self):
         f = self._openCodebook()
         #Maybe make load_all if header is added
         codeTree = yaml.safe_load(f)
@@ -376,9 +642,14 @@ class Project(object):
             self._code = self.getCodes()
         return self._code
 
-    def getCodes(self):
+    def getCodes(self, tags = None):
+        """Makes the codes from the documents and the codebook. If tags is given only those codes are made, from only their codebook entries and the documents that may use them."""
         codebookCodes = self.readCodes()
-        documentCodes = self.parseTree().tags
+        documentCodes = self.parseTree(tags = tags).tags
+        if tags is not None:
+            tags = set(tags)
+            codebookCodes = {codeString : data for codeString, data in codebookCodes.items() if codeString in tags}
+            documentCodes = {codeString : code for codeString, code in documentCodes.items() if codeString in tags}
         for codeString, data in codebookCodes.items():
             if codeString in documentCodes:
                 documentCodes[codeString].addDocs(data)
@@ -0,0 +1,356 @@
+import re
+import collections
+
+from .caExceptions import QueryException
+
+Match = collections.namedtuple('Match', ['file', 'start', 'end', 'line', 'endLine'])
+
+tokenRegex = re.compile(r'\s*(?:(?P<paren>[()])|(?P<tag>[@$^][^\s()]+)|(?P<number>\d+)|(?P<word>[A-Za-z]+))')
+
+def tokenize(queryString):
+    tokens = []
+    pos = 0
+    queryString = queryString.rstrip()
+    while pos < len(queryString):
+        match = tokenRegex.match(queryString, pos)
+        if match is None:
+            raise QueryException("Unexpected character '{}' at position {} of the query.".format(queryString[pos:].lstrip()[:1], pos))
+        if match.group('word') is not None:
+            tokens.append(('word', match.group('word').lower()))
+        else:
+            tokens.append((match.lastgroup, match.group(match.lastgroup)))
+        pos = match.end()
+    return tokens
+
+#Interval lists are sorted lists of disjoint (start, end, line, endLine) tuples
+
+def normalize(intervals):
+    """Sorts intervals and merges the overlapping and touching ones"""
+    ret = []
+    for start, end, line, endLine in sorted(intervals):
+        if len(ret) > 0 and start <= ret[-1][1]:
+            if end > ret[-1][1]:
+                ret[-1] = (ret[-1][0], end, ret[-1][2], endLine)
+        else:
+            ret.append((start, end, line, endLine))
+    return ret
+
+def intersect(a, b):
+    ret = []
+    i = j = 0
+    while i < len(a) and j < len(b):
+        if a[i][0] >= b[j][0]:
+            start, line = a[i][0], a[i][2]
+        else:
+            start, line = b[j][0], b[j][2]
+        if a[i][1] <= b[j][1]:
+            end, endLine = a[i][1], a[i][3]
+            i += 1
+        else:
+            end, endLine = b[j][1], b[j][3]
+            j += 1
+        if start < end:
+            ret.append((start, end, line, endLine))
+    return ret
+
+def difference(a, b):
+    ret = []
+    j = 0
+    for start, end, line, endLine in a:
+        while j < len(b) and b[j][1] <= start:
+            j += 1
+        k = j
+        while k < len(b) and b[k][0] < end:
+            bStart, bEnd, bLine, bEndLine = b[k]
+            if bStart > start:
+                ret.append((start, bStart, line, bLine))
+            if bEnd > start:
+                start, line = bEnd, bEndLine
+            k += 1
+        if start < end:
+            ret.append((start, end, line, endLine))
+    return ret
+
+def inside(a, b):
+    ret = []
+    j = 0
+    for interval in a:
+        while j < len(b) and b[j][1] < interval[1]:
+            j += 1
+        if j < len(b) and b[j][0] <= interval[0]:
+            ret.append(interval)
+    return ret
+
+def near(a, b, distance):
+    ret = []
+    j = 0
+    for interval in a:
+        while j < len(b) and b[j][1] < interval[0] - distance:
+            j += 1
+        if j < len(b) and b[j][0] <= interval[1] + distance:
+            ret.append(interval)
+    return ret
+
+class SectionIndex(object):
+    """The sections of some codes as sorted interval lists for each file and code"""
+    def __init__(self, sections):
+        self.intervals = {}
+        self.counts = {}
+        self.tagFiles = {}
+        for sec in sections:
+            self.intervals.setdefault(sec.file, {}).setdefault(sec.tag, []).append((sec.start, sec.end, sec.line, sec.endLine))
+            self.counts[sec.tag] = self.counts.get(sec.tag, 0) + 1
+            self.tagFiles.setdefault(sec.tag, set()).add(sec.file)
+        for tagDict in self.intervals.values():
+            for tag, intervals in tagDict.items():
+                tagDict[tag] = normalize(intervals)
+
+    def get(self, fname, tag):
+        try:
+            return self.intervals[fname][tag]
+        except KeyError:
+            return []
+
+    def files(self, tag):
+        return self.tagFiles.get(tag, set())
+
+class TagTerm(object):
+    def __init__(self, tag):
+        self.tag = tag
+
+    def __repr__(self):
+        return self.tag
+
+    def tags(self):
+        return {self.tag}
+
+    def estimate(self, index):
+        return index.counts.get(self.tag, 0)
+
+    def candidateFiles(self, index):
+        return index.files(self.tag)
+
+    def evaluate(self, index, fname):
+        return index.get(fname, self.tag)
+
+class Operator(object):
+    def __init__(self, *children):
+        self.children = list(children)
+
+    def __repr__(self):
+        return "({})".format(" {} ".format(self.name).join(repr(c) for c in self.children))
+
+    def tags(self):
+        ret = set()
+        for c in self.children:
+            ret |= c.tags()
+        return ret
+
+class Union(Operator):
+    name = 'or'
+
+    def estimate(self, index):
+        return sum(c.estimate(index) for c in self.children)
+
+    def candidateFiles(self, index):
+        ret = set()
+        for c in self.children:
+            ret |= c.candidateFiles(index)
+        return ret
+
+    def evaluate(self, index, fname):
+        ret = []
+        for c in self.children:
+            ret += c.evaluate(index, fname)
+        return normalize(ret)
+
+class Intersection(Operator):
+    name = 'and'
+
+    def plan(self, index):
+        """The children ordered with the most selective first"""
+        return sorted(self.children, key = lambda c: c.estimate(index))
+
+    def estimate(self, index):
+        return min(c.estimate(index) for c in self.children)
+
+    def candidateFiles(self, index):
+        plan = self.plan(index)
+        ret = set(plan[0].candidateFiles(index))
+        for c in plan[1:]:
+            if len(ret) < 1:
+                break
+            ret &= c.candidateFiles(index)
+        return ret
+
+    def evaluate(self, index, fname):
+        plan = self.plan(index)
+        ret = plan[0].evaluate(index, fname)
+        for c in plan[1:]:
+            if len(ret) < 1:
+                break
+            ret = intersect(ret, c.evaluate(index, fname))
+        return ret
+
+class Difference(Operator):
+    name = 'not'
+
+    def estimate(self, index):
+        return self.children[0].estimate(index)
+
+    def candidateFiles(self, index):
+        return self.children[0].candidateFiles(index)
+
+    def evaluate(self, index, fname):
+        ret = self.children[0].evaluate(index, fname)
+        if len(ret) > 0:
+            ret = difference(ret, self.children[1].evaluate(index, fname))
+        return ret
+
+class Inside(Operator):
+    name = 'inside'
+
+    def estimate(self, index):
+        return min(c.estimate(index) for c in self.children)
+
+    def candidateFiles(self, index):
+        return self.children[0].candidateFiles(index) & self.children[1].candidateFiles(index)
+
+    def evaluate(self, index, fname):
+        ret = self.children[0].evaluate(index, fname)
+        if len(ret) > 0:
+            ret = inside(ret, self.children[1].evaluate(index, fname))
+        return ret
+
+class Near(Inside):
+    name = 'near'
+
+    def __init__(self, left, right, distance):
+        super().__init__(left, right)
+        self.distance = distance
+
+    def __repr__(self):
+        return "({} near {} {})".format(self.children[0], self.distance, self.children[1])
+
+    def evaluate(self, index, fname):
+        ret = self.children[0].evaluate(index, fname)
+        if len(ret) > 0:
+            ret = near(ret, self.children[1].evaluate(index, fname), self.distance)
+        return ret
+
+class QueryParser(object):
+    def __init__(self, queryString):
+        self.tokens = tokenize(queryString)
+        self.pos = 0
+
+    def peek(self, offset = 0):
+        try:
+            return self.tokens[self.pos + offset]
+        except IndexError:
+            return (None, None)
+
+    def next(self):
+        token = self.peek()
+        self.pos += 1
+        return token
+
+    def isWord(self, words, offset = 0):
+        kind, value = self.peek(offset)
+        return kind == 'word' and value in words
+
+    def expect(self, kind, value = None):
+        token = self.next()
+        if token[0] != kind or (value is not None and token[1] != value):
+            if token[0] is None:
+                raise QueryException("The query ended early, expected {}.".format(value or kind))
+            raise QueryException("Expected {} but found '{}' in the query.".format(value or kind, token[1]))
+        return token[1]
+
+    def parse(self):
+        if len(self.tokens) < 1:
+            raise QueryException("The query is empty.")
+        expr = self.orExpr()
+        if self.peek()[0] is not None:
+            raise QueryException("Unexpected '{}' in the query.".format(self.peek()[1]))
+        return expr
+
+    def orExpr(self):
+        expr = self.andExpr()
+        while self.isWord(('or',)):
+            self.next()
+            expr = Union(expr, self.andExpr())
+        return expr
+
+    def andExpr(self):
+        expr = self.filterExpr()
+        while True:
+            if self.isWord(('and', 'but')) and not self.isWord(('inside', 'near', 'within'), offset = 1):
+                self.next()
+                if self.isWord(('not',)):
+                    self.next()
+                    expr = Difference(expr, self.filterExpr())
+                else:
+                    expr = Intersection(expr, self.filterExpr())
+            elif self.isWord(('not',)):
+                self.next()
+                expr = Difference(expr, self.filterExpr())
+            else:
+                return expr
+
+    def filterExpr(self):
+        expr = self.atom()
+        while True:
+            if self.isWord(('and', 'but')) and self.isWord(('inside', 'near', 'within'), offset = 1):
+                self.next()
+            if self.isWord(('inside',)):
+                self.next()
+                expr = Inside(expr, self.atom())
+            elif self.isWord(('near', 'within')):
+                self.next()
+                distance = int(self.expect('number'))
+                if self.isWord(('characters', 'chars')):
+                    self.next()
+                if self.isWord(('of',)):
+                    self.next()
+                expr = Near(expr, self.atom(), distance)
+            else:
+                return expr
+
+    def atom(self):
+        kind, value = self.next()
+        if kind == 'tag':
+            return TagTerm(value)
+        elif kind == 'paren' and value == '(':
+            expr = self.orExpr()
+            self.expect('paren', ')')
+            return expr
+        elif kind is None:
+            raise QueryException("The query ended early, expected a code.")
+        else:
+            raise QueryException("Expected a code but found '{}' in the query.".format(value))
+
+def parseQuery(queryString):
+    """Parses queryString into a tree of query operators. A query is made of codes combined with:
+
+        A and B        the text coded with both A and B
+        A or B         the text coded with either
+        A not B        the text coded with A but not B, also written `A and not B`
+        A inside B     the sections of A that are entirely within a section of B
+        A near N B     the sections of A with a section of B at most N characters away, also `A within N characters of B`
+
+    `but` can be used in place of `and` and parentheses group, e.g. `$stress inside @workplace but not ^interviewer`
+
+    Distances are offsets in the raw documents, so the markup between two sections counts towards them. The sections of a code that overlap or touch are merged by `normalize()` before they are combined, so they count as one.
+    """
+    return QueryParser(queryString).parse()
+
+def runQuery(query, sections):
+    """Evaluates query, a string or a parsed query, over sections and returns a list of `Match`es. Only the files where the most selective parts of the query are found get evaluated."""
+    if isinstance(query, str):
+        query = parseQuery(query)
+    index = SectionIndex(sections)
+    matches = []
+    for fname in sorted(query.candidateFiles(index), key = str):
+        for start, end, line, endLine in query.evaluate(index, fname):
+            matches.append(Match(fname, start, end, line, endLine))
+    return matches
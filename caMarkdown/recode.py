@@ -0,0 +1,161 @@
+import os
+import pathlib
+import collections
+import concurrent.futures
+
+import yaml
+
+from .codes import codeTypes, scanMarkup
+from .defaultFiles.defaultCodebook import charHeaderMap, codeBookName
+from .documents import documentEncoding, fileMayContainTags, writeTemporary, removeTemporary
+from .caExceptions import RecodeException
+
+Edit = collections.namedtuple('Edit', ['file', 'line', 'start', 'end', 'old', 'new'])
+Edit.__doc__ = """A change to the codes of one section's markup, start and end are the offsets, in the document before the change, of the codes, the text between the '](' and ')', which go from old to new"""
+
+def checkMapping(mapping):
+    """Checks mapping, of old codes to new ones, is a renaming that can be done"""
+    if len(mapping) < 1:
+        raise RecodeException("No codes were given to be changed")
+    for old, new in mapping.items():
+        for code in (old, new):
+            if len(code) < 2 or code[0] not in codeTypes or any(c.isspace() for c in code):
+                raise RecodeException("'{}' is not a code, codes must start with one of: {} and not contain whitespace".format(code, ' '.join(codeTypes.keys())))
+        if new in mapping and mapping[new] != new:
+            raise RecodeException("'{}' is both renamed and the new name of '{}'".format(new, old))
+    if all(old == new for old, new in mapping.items()):
+        raise RecodeException("The codes would not be changed")
+
+def recodeTokens(tokens, mapping):
+    """Applies mapping to the space separated codes in tokens, a new code is dropped if it is already there, as when merged codes are used together. Anything else, including repeats of codes that are not changed, is kept as it is."""
+    tokenList = tokens.split(' ')
+    present = set(token for token in tokenList if token not in mapping)
+    ret = []
+    for token in tokenList:
+        if token in mapping:
+            token = mapping[token]
+            if token in present:
+                continue
+            present.add(token)
+        ret.append(token)
+    return ' '.join(ret)
+
+def recodeText(source, mapping, filePath = None):
+    """Rewrites the codes of the sections of source, a str, following mapping in one pass over its markup. Only the codes are changed, the rest of source is copied. Returns the new source and the list of `Edit`s."""
+    sections, spans = scanMarkup(source, filePath)
+    edits = []
+    pieces = []
+    pos = 0
+    line = 1
+    counted = 0
+    for start, end in spans:
+        #The spans are the '['s and the '](...)'s, only the latter have codes
+        if source[start] != ']' or end - start < 3:
+            continue
+        tokens = source[start + 2:end - 1]
+        newTokens = recodeTokens(tokens, mapping)
+        if newTokens != tokens:
+            line += source.count('\n', counted, start)
+            counted = start
+            pieces.append(source[pos:start + 2])
+            pieces.append(newTokens)
+            edits.append(Edit(filePath, line, start + 2, end - 1, tokens, newTokens))
+            pos = end - 1
+    if len(edits) < 1:
+        return source, edits
+    pieces.append(source[pos:])
+    return ''.join(pieces), edits
+
+def prepareDocument(sourcePath, relativePath, mapping, dryRun = False):
+    """Works out the `Edit`s for the document at sourcePath, the ones without any of the codes are skipped after a quick check of their bytes. Unless dryRun the new document is written to a temporary file. Returns relativePath, the edits and the temporary file's path or None."""
+    if not fileMayContainTags(sourcePath, list(mapping.keys())):
+        return relativePath, [], None
+    #newline = '' keeps the document's line endings as they are
+    with open(str(sourcePath), encoding = documentEncoding, newline = '') as f:
+        source = f.read()
+    newSource, edits = recodeText(source, mapping, relativePath)
+    if dryRun or len(edits) < 1:
+        return relativePath, edits, None
+    return relativePath, edits, writeTemporary(sourcePath, newSource)
+
+def recodeCodebook(codeTree, mapping):
+    """Applies mapping to codeTree, the loaded YAML of a codebook. The entries of the old codes are removed and, if a new code has no entry, it takes that of the first old code that has one. Returns True if codeTree was changed."""
+    def entries(code):
+        heading = charHeaderMap[code[0]]
+        entryList = codeTree.get(heading)
+        if entryList is None:
+            entryList = []
+        elif isinstance(entryList, dict):
+            entryList = [{k : v} for k, v in entryList.items()]
+        codeTree[heading] = entryList
+        return entryList
+
+    def findEntry(code):
+        entryList = entries(code)
+        for i, entry in enumerate(entryList):
+            if entry == code[1:] or (isinstance(entry, dict) and code[1:] in entry):
+                return entryList, i
+        return entryList, None
+
+    changed = False
+    removed = {}
+    for old, new in mapping.items():
+        if old == new:
+            continue
+        entryList, i = findEntry(old)
+        if i is not None:
+            removed[old] = entryList.pop(i)
+            changed = True
+    for old, new in mapping.items():
+        if old in removed and old != new:
+            entryList, i = findEntry(new)
+            if i is None:
+                entry = removed[old]
+                if isinstance(entry, dict):
+                    entry = {new[1:] : entry[old[1:]]}
+                else:
+                    entry = new[1:]
+                entryList.append(entry)
+    return changed
+
+def recodeProject(project, mapping, dryRun = False, workers = None, files = None):
+    """Changes the codes of project following mapping, in its documents and codebook, see `recodeText()` and `recodeCodebook()`. The documents are prepared in parallel worker processes and nothing is replaced until all of them, and the codebook, are ready. Then each is swapped in with a rename. Returns the list of `Edit`s, with dryRun nothing is changed."""
+    checkMapping(mapping)
+    if files is None:
+        files = project.getFiles()
+    jobs = [(str(pathlib.Path(project.path, fname)), pathlib.Path(project.path, fname).relative_to(project.path).as_posix(), mapping, dryRun) for fname in files]
+    prepared = []
+    try:
+        if workers == 1 or len(jobs) < 2:
+            for job in jobs:
+                prepared.append(prepareDocument(*job))
+        else:
+            with concurrent.futures.ProcessPoolExecutor(max_workers = workers) as executor:
+                futures = [executor.submit(prepareDocument, *job) for job in jobs]
+                #All the results are collected, even after a failure, so no temporary file is left behind
+                errors = []
+                for future in futures:
+                    try:
+                        prepared.append(future.result())
+                    except Exception as e:
+                        errors.append(e)
+                if len(errors) > 0:
+                    raise errors[0]
+        codebookPath = pathlib.Path(project.path, codeBookName)
+        codebookTemp = None
+        if not dryRun:
+            with project._openCodebook() as f:
+                codeTree = yaml.safe_load(f)
+            if recodeCodebook(codeTree, mapping):
+                codebookTemp = writeTemporary(codebookPath, yaml.safe_dump(codeTree, allow_unicode=True, default_flow_style=False))
+    except BaseException:
+        for relativePath, edits, tempName in prepared:
+            if tempName is not None:
+                removeTemporary(tempName)
+        raise
+    for relativePath, edits, tempName in prepared:
+        if tempName is not None:
+            os.replace(tempName, str(pathlib.Path(project.path, relativePath)))
+    if codebookTemp is not None:
+        os.replace(codebookTemp, str(codebookPath))
+    return [edit for relativePath, edits, tempName in prepared for edit in edits]
@@ -0,0 +1,251 @@
+import json
+import pathlib
+import difflib
+import bisect
+import collections
+
+import yaml
+
+from .plaintext import stripMarkup, CleanSpan
+from .documents import documentEncoding
+from .defaultFiles.defaultCodebook import codeBookName, codebookFileHeader
+from .gitWrapper import treeBlobs, readBlobId, iterCommits
+
+blobCacheDirName = 'blobs'
+
+ParsedBlob = collections.namedtuple('ParsedBlob', ['blobId', 'text', 'sections'])
+ParsedBlob.__doc__ = """A document as stored in one git blob, its text without markup and the `CleanSpan`s of its sections"""
+
+SectionChange = collections.namedtuple('SectionChange', ['kind', 'file', 'oldTag', 'newTag', 'oldStart', 'oldEnd', 'newStart', 'newEnd', 'line'])
+SectionChange.__doc__ = """A change to the sections of one document between two revisions. kind is one of `changeKinds`, the offsets are in the text without markup of each revision and line is the line of the section in the newer one, or the older one if it was removed. The fields of the missing side are None."""
+
+HistoryPoint = collections.namedtuple('HistoryPoint', ['commit', 'time', 'author', 'documents', 'counts'])
+HistoryPoint.__doc__ = """The codes of a project at one commit, documents is the number of documents and counts a dict of the number of sections of each code"""
+
+#added and removed sections have only a new or old side, recoded ones are on the same text with another code and resized ones have the same code with other bounds
+changeKinds = ['added', 'removed', 'recoded', 'resized']
+
+class BlobCache(object):
+    """The parsed versions of documents, kept in the cache directory of a Project keyed by git blob id. A blob never changes so an entry never needs to be invalidated, and each version of a document is only parsed once whatever the number of revisions it is in."""
+    def __init__(self, P):
+        self.repo = P.Repo
+        self.cacheDir = P.cachePath(blobCacheDirName, makeDir = True)
+        self.cacheDir.mkdir(exist_ok = True)
+        self._parsed = {}
+        self._counts = {}
+
+    def __len__(self):
+        return len(self._parsed)
+
+    def __repr__(self):
+        return "< BlobCache [{} parsed] >".format(len(self))
+
+    def counts(self, blobId):
+        """The number of sections of each code in the blob blobId, as a `collections.Counter`"""
+        try:
+            return self._counts[blobId]
+        except KeyError:
+            counts = collections.Counter(sec.tag for sec in self.parse(blobId).sections)
+            self._counts[blobId] = counts
+            return counts
+
+    def parse(self, blobId):
+        """The `ParsedBlob` of the blob blobId"""
+        try:
+            return self._parsed[blobId]
+        except KeyError:
+            pass
+        cachePath = pathlib.Path(self.cacheDir, blobId + '.json')
+        try:
+            with open(str(cachePath), encoding = documentEncoding) as f:
+                cached = json.load(f)
+            parsed = ParsedBlob(blobId, cached['text'], [CleanSpan(*sec) for sec in cached['sections']])
+        except (OSError, ValueError, KeyError, TypeError):
+            plain = stripMarkup(readBlobId(self.repo, blobId).decode(documentEncoding, errors = 'replace'))
+            parsed = ParsedBlob(blobId, plain.text, plain.sections)
+            with open(str(cachePath), 'w', encoding = documentEncoding) as f:
+                json.dump({'text' : parsed.text, 'sections' : [list(sec) for sec in parsed.sections]}, f)
+        self._parsed[blobId] = parsed
+        return parsed
+
+def documentBlobs(repo, ref):
+    """The documents of the project in the commit ref, the files listed in its codebook, as a dict of path to blob id. The project must be at the root of repo."""
+    blobs = treeBlobs(repo, ref)
+    if codeBookName not in blobs:
+        return {}
+    try:
+        codeTree = yaml.safe_load(readBlobId(repo, blobs[codeBookName]).decode(documentEncoding))
+        fileList = codeTree.get(codebookFileHeader) or []
+    except (yaml.YAMLError, AttributeError):
+        fileList = []
+    ret = {}
+    for entry in fileList:
+        if isinstance(entry, dict):
+            entry = next(iter(entry), None)
+        if isinstance(entry, str):
+            path = pathlib.PurePath(entry).as_posix()
+            if path in blobs:
+                ret[path] = blobs[path]
+    return ret
+
+#The longest changed run of lines, in characters, that is aligned character by character
+maxCharacterAlignment = 20000
+
+class OffsetAligner(object):
+    """Maps offsets in one version of a text to another. The texts are aligned by their lines and then the lines that were changed by their characters, offsets in text that was changed go to the start of what replaced it."""
+    def __init__(self, oldText, newText):
+        self.same = oldText == newText
+        if not self.same:
+            oldLines = oldText.splitlines(keepends = True)
+            newLines = newText.splitlines(keepends = True)
+            oldOffsets = [0]
+            for line in oldLines:
+                oldOffsets.append(oldOffsets[-1] + len(line))
+            newOffsets = [0]
+            for line in newLines:
+                newOffsets.append(newOffsets[-1] + len(line))
+            #Each block is (old start, new start, length), the unchanged blocks map one to one
+            self.blocks = []
+            for tag, i1, i2, j1, j2 in difflib.SequenceMatcher(None, oldLines, newLines, autojunk = False).get_opcodes():
+                oldStart, oldEnd, newStart, newEnd = oldOffsets[i1], oldOffsets[i2], newOffsets[j1], newOffsets[j2]
+                if tag == 'equal':
+                    self.blocks.append((oldStart, newStart, oldEnd - oldStart))
+                elif tag == 'replace' and oldEnd - oldStart + newEnd - newStart <= maxCharacterAlignment:
+                    matcher = difflib.SequenceMatcher(None, oldText[oldStart:oldEnd], newText[newStart:newEnd], autojunk = False)
+                    for charTag, k1, k2, l1, l2 in matcher.get_opcodes():
+                        self.blocks.append((oldStart + k1, newStart + l1, k2 - k1 if charTag == 'equal' else 0))
+                else:
+                    self.blocks.append((oldStart, newStart, 0))
+            self.oldStarts = [block[0] for block in self.blocks]
+
+    def __call__(self, offset):
+        if self.same:
+            return offset
+        i = bisect.bisect_right(self.oldStarts, offset) - 1
+        if i < 0:
+            return 0
+        oldStart, newStart, length = self.blocks[i]
+        return newStart + min(offset - oldStart, length)
+
+def pairCodes(lost, gained):
+    """Pairs the codes lost from a section with those gained, codes of the same type first, removing the paired ones from both lists. Returns the list of (lost code, gained code)."""
+    pairs = []
+    for sameType in (True, False):
+        for newTag in list(gained):
+            for oldTag in lost:
+                if not sameType or oldTag[0] == newTag[0]:
+                    pairs.append((oldTag, newTag))
+                    lost.remove(oldTag)
+                    gained.remove(newTag)
+                    break
+    return pairs
+
+def diffSections(fname, old, new):
+    """Compares the sections of old and new, `ParsedBlob`s or None for a missing version, and returns the list of `SectionChange`s between them"""
+    oldSections = old.sections if old is not None else []
+    newSections = new.sections if new is not None else []
+    if old is not None and new is not None:
+        align = OffsetAligner(old.text, new.text)
+    else:
+        align = lambda offset: offset
+    #The sections of each version by their span, in the new version's offsets
+    oldSpans = collections.OrderedDict()
+    for sec in oldSections:
+        oldSpans.setdefault((align(sec.start), align(sec.end)), []).append(sec)
+    newSpans = collections.OrderedDict()
+    for sec in newSections:
+        newSpans.setdefault((sec.start, sec.end), []).append(sec)
+    changes = []
+    unmatchedOld = []
+    unmatchedNew = []
+    for span, secs in oldSpans.items():
+        oldTags = collections.Counter(sec.tag for sec in secs)
+        newTags = collections.Counter(sec.tag for sec in newSpans.get(span, []))
+        lost = sorted((oldTags - newTags).elements())
+        gained = sorted((newTags - oldTags).elements())
+        oldByTag = {sec.tag : sec for sec in secs}
+        for oldTag, newTag in pairCodes(lost, gained):
+            oldSec = oldByTag[oldTag]
+            changes.append(SectionChange('recoded', fname, oldTag, newTag, oldSec.start, oldSec.end, span[0], span[1], newSpans[span][0].line))
+        unmatchedOld += [(tag, span, oldByTag[tag]) for tag in lost]
+        unmatchedNew += [(tag, span) for tag in gained]
+    for span, secs in newSpans.items():
+        if span not in oldSpans:
+            unmatchedNew += [(sec.tag, span) for sec in secs]
+    #A section that lost its code and one of the same code over some of the same text are taken to be the same section with new bounds
+    for tag, span, oldSec in unmatchedOld:
+        for i, (newTag, newSpan) in enumerate(unmatchedNew):
+            if newTag == tag and newSpan[0] < span[1] and span[0] < newSpan[1]:
+                changes.append(SectionChange('resized', fname, tag, tag, oldSec.start, oldSec.end, newSpan[0], newSpan[1], newSpans[newSpan][0].line))
+                del unmatchedNew[i]
+                break
+        else:
+            changes.append(SectionChange('removed', fname, tag, None, oldSec.start, oldSec.end, None, None, oldSec.line))
+    for tag, span in unmatchedNew:
+        changes.append(SectionChange('added', fname, None, tag, None, None, span[0], span[1], newSpans[span][0].line))
+    #In the order of the new version, the removed sections where their text went
+    return sorted(changes, key = lambda c: (c.newStart if c.newStart is not None else align(c.oldStart), changeKinds.index(c.kind)))
+
+def diffRevisions(P, firstRef, secondRef, tags = None, cache = None):
+    """Compares the sections of the documents of P between the commits firstRef and secondRef. Only the documents whose blobs differ are parsed, through cache, a `BlobCache`. Returns the list of `SectionChange`s, those of tags if given."""
+    if cache is None:
+        cache = BlobCache(P)
+    firstBlobs = documentBlobs(P.Repo, firstRef)
+    secondBlobs = documentBlobs(P.Repo, secondRef)
+    changes = []
+    for fname in sorted(set(firstBlobs) | set(secondBlobs)):
+        firstId = firstBlobs.get(fname)
+        secondId = secondBlobs.get(fname)
+        if firstId == secondId:
+            continue
+        old = cache.parse(firstId) if firstId is not None else None
+        new = cache.parse(secondId) if secondId is not None else None
+        changes += diffSections(fname, old, new)
+    if tags is not None:
+        tags = set(tags)
+        changes = [c for c in changes if c.oldTag in tags or c.newTag in tags]
+    return changes
+
+def changeCounts(changes):
+    """Counts changes for each code, as a dict of code to a dict of the count of each kind. A recoding counts as 'recodedFrom' for the old code and 'recodedTo' for the new one."""
+    counts = {}
+    def add(tag, kind):
+        tagCounts = counts.setdefault(tag, {'added' : 0, 'removed' : 0, 'recodedFrom' : 0, 'recodedTo' : 0, 'resized' : 0})
+        tagCounts[kind] += 1
+    for change in changes:
+        if change.kind == 'recoded':
+            add(change.oldTag, 'recodedFrom')
+            add(change.newTag, 'recodedTo')
+        elif change.kind == 'added':
+            add(change.newTag, 'added')
+        else:
+            add(change.oldTag, change.kind)
+    return counts
+
+def codeHistory(P, ref = 'HEAD', tags = None, cache = None):
+    """Yields a `HistoryPoint` for each commit on the first parent line of ref, oldest first. The counts are kept running from commit to commit, only the documents whose blobs changed are parsed, through cache, a `BlobCache`, and their old counts taken away and new ones added. If tags are given only their counts are kept."""
+    if cache is None:
+        cache = BlobCache(P)
+    if tags is not None:
+        tags = set(tags)
+    counts = collections.Counter()
+    blobs = {}
+    lastTree = None
+    for commit in iterCommits(P.Repo, ref):
+        if commit.tree != lastTree:
+            newBlobs = documentBlobs(P.Repo, commit.id)
+            for fname in set(blobs) | set(newBlobs):
+                oldId = blobs.get(fname)
+                newId = newBlobs.get(fname)
+                if oldId != newId:
+                    if oldId is not None:
+                        counts -= cache.counts(oldId)
+                    if newId is not None:
+                        counts += cache.counts(newId)
+            blobs = newBlobs
+            lastTree = commit.tree
+        if tags is None:
+            pointCounts = dict(counts)
+        else:
+            pointCounts = {tag : counts[tag] for tag in tags if counts[tag] > 0}
+        yield HistoryPoint(commit, commit.time, commit.author, len(blobs), pointCounts)
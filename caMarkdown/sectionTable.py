@@ -0,0 +1,113 @@
+import array
+import pathlib
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+try:
+    import pandas
+except ImportError:
+    pandas = None
+
+from .codes import codeTypes
+from .caExceptions import MissingDependency
+
+codeTypeChars = list(codeTypes.keys())
+
+def asNumpy(values, dtype):
+    """Wraps the buffer of an array.array in a numpy array without copying it"""
+    if len(values) < 1:
+        return numpy.zeros(0, dtype = dtype)
+    return numpy.frombuffer(values, dtype = dtype)
+
+class SectionTable(object):
+    """The sections of a project as parallel NumPy arrays, one entry per section. tags and files are the string dictionaries that tagIds and fileIds index into, the files as posix paths, typeIds index into `codeTypeChars`.
+
+    The statistics are all vectorized group-bys over the arrays so nothing loops over the sections after the table is built.
+    """
+    def __init__(self, sections):
+        if numpy is None:
+            raise MissingDependency("numpy is needed to make a SectionTable, it can be installed with `pip install numpy`.")
+        self.tags = []
+        self.files = []
+        tagIndices = {}
+        fileIndices = {}
+        typeIndices = {c : i for i, c in enumerate(codeTypeChars)}
+        tagIds = array.array('q')
+        fileIds = array.array('q')
+        typeIds = array.array('b')
+        starts = array.array('q')
+        ends = array.array('q')
+        lengths = array.array('q')
+        for sec in sections:
+            try:
+                tagIds.append(tagIndices[sec.tag])
+            except KeyError:
+                tagIndices[sec.tag] = len(self.tags)
+                tagIds.append(len(self.tags))
+                self.tags.append(sec.tag)
+            try:
+                fileIds.append(fileIndices[sec.file])
+            except KeyError:
+                fileIndices[sec.file] = len(self.files)
+                fileIds.append(len(self.files))
+                self.files.append(pathlib.PurePath(sec.file).as_posix())
+            typeIds.append(typeIndices[sec.tag[0]])
+            starts.append(sec.start)
+            ends.append(sec.end)
+            lengths.append(sec.length)
+        self.tagIds = asNumpy(tagIds, numpy.int64)
+        self.fileIds = asNumpy(fileIds, numpy.int64)
+        self.typeIds = asNumpy(typeIds, numpy.int8)
+        self.starts = asNumpy(starts, numpy.int64)
+        self.ends = asNumpy(ends, numpy.int64)
+        self.lengths = asNumpy(lengths, numpy.int64)
+
+    def __len__(self):
+        return len(self.tagIds)
+
+    def __repr__(self):
+        return "< SectionTable [{}] {} tags {} files >".format(len(self), len(self.tags), len(self.files))
+
+    def tagCounts(self):
+        """The number of sections of each tag"""
+        counts = numpy.bincount(self.tagIds, minlength = len(self.tags))
+        return dict(zip(self.tags, counts.tolist()))
+
+    def tagLengths(self):
+        """The total length of text coded with each tag"""
+        totals = numpy.bincount(self.tagIds, weights = self.lengths, minlength = len(self.tags))
+        return dict(zip(self.tags, totals.astype(numpy.int64).tolist()))
+
+    def fileCounts(self):
+        """The number of sections in each file"""
+        counts = numpy.bincount(self.fileIds, minlength = len(self.files))
+        return dict(zip(self.files, counts.tolist()))
+
+    def fileTagCounts(self):
+        """A files by tags matrix of section counts"""
+        counts = numpy.zeros((len(self.files), len(self.tags)), dtype = numpy.int64)
+        numpy.add.at(counts, (self.fileIds, self.tagIds), 1)
+        return counts
+
+    def typeStats(self):
+        """The count, total length and mean length of the sections of each code type"""
+        counts = numpy.bincount(self.typeIds, minlength = len(codeTypeChars))
+        totals = numpy.bincount(self.typeIds, weights = self.lengths, minlength = len(codeTypeChars))
+        means = numpy.divide(totals, counts, out = numpy.zeros(len(codeTypeChars)), where = counts > 0)
+        return {c : {'count' : int(counts[i]), 'length' : int(totals[i]), 'mean' : float(means[i])} for i, c in enumerate(codeTypeChars)}
+
+    def toDataFrame(self):
+        """Makes a pandas DataFrame that shares the arrays, the tags and files are categoricals over their dictionaries"""
+        if pandas is None:
+            raise MissingDependency("pandas is needed to make a DataFrame, it can be installed with `pip install pandas`.")
+        return pandas.DataFrame({
+            'tag' : pandas.Categorical.from_codes(self.tagIds, categories = self.tags),
+            'file' : pandas.Categorical.from_codes(self.fileIds, categories = self.files),
+            'codeType' : pandas.Categorical.from_codes(self.typeIds, categories = codeTypeChars),
+            'start' : self.starts,
+            'end' : self.ends,
+            'length' : self.lengths,
+        }, copy = False)
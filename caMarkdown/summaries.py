@@ -0,0 +1,169 @@
+import json
+import zlib
+import pathlib
+
+from .codes import iterNesting
+from .caExceptions import SummaryException
+
+class Summary(object):
+    """Counts of the codes in a set of documents: the number of sections of each code, their total length and the overlap matrix, the total length of the sections of each code nested within each other code, as `camd table` gives it, and the containment counts, the number of sections of each code nested within each other code, as `camd nesting` gives them. unDocumented is the codes used in the documents but missing from their codebook.
+
+    Summaries of separate sets of documents can be added together and give the same result as summarizing all the documents at once. They convert to and from JSON ready dicts with `toDict()` and `fromDict()`.
+    """
+    formatVersion = 2
+
+    def __init__(self):
+        self.documents = 0
+        self.counts = {}
+        self.lengths = {}
+        self.overlaps = {}
+        self.containment = {}
+        self.unDocumented = set()
+
+    def __repr__(self):
+        return "< Summary [{} documents, {} codes] >".format(self.documents, len(self.counts))
+
+    def __eq__(self, other):
+        return isinstance(other, Summary) and self.toDict() == other.toDict()
+
+    def __add__(self, other):
+        ret = Summary()
+        ret += self
+        ret += other
+        return ret
+
+    def __iadd__(self, other):
+        self.merge(other)
+        return self
+
+    @property
+    def tags(self):
+        return sorted(self.counts.keys())
+
+    def overlap(self, outerTag, innerTag):
+        """The total length of the sections of innerTag nested within sections of outerTag"""
+        return self.overlaps.get(outerTag, {}).get(innerTag, 0)
+
+    def add(self, sections):
+        """Adds the `Section`s of one document"""
+        for sec, parents in iterNesting(sections):
+            self.counts[sec.tag] = self.counts.get(sec.tag, 0) + 1
+            self.lengths[sec.tag] = self.lengths.get(sec.tag, 0) + sec.length
+            for parent in parents:
+                innerLengths = self.overlaps.setdefault(parent.tag, {})
+                innerLengths[sec.tag] = innerLengths.get(sec.tag, 0) + sec.length
+            for outerTag in set(p.tag for p in parents):
+                innerCounts = self.containment.setdefault(outerTag, {})
+                innerCounts[sec.tag] = innerCounts.get(sec.tag, 0) + 1
+
+    def merge(self, other):
+        """Adds the counts of other, a Summary of other documents, to this one"""
+        self.documents += other.documents
+        for tag, count in other.counts.items():
+            self.counts[tag] = self.counts.get(tag, 0) + count
+        for tag, length in other.lengths.items():
+            self.lengths[tag] = self.lengths.get(tag, 0) + length
+        for outerTag, otherLengths in other.overlaps.items():
+            innerLengths = self.overlaps.setdefault(outerTag, {})
+            for innerTag, length in otherLengths.items():
+                innerLengths[innerTag] = innerLengths.get(innerTag, 0) + length
+        for outerTag, otherCounts in other.containment.items():
+            innerCounts = self.containment.setdefault(outerTag, {})
+            for innerTag, count in otherCounts.items():
+                innerCounts[innerTag] = innerCounts.get(innerTag, 0) + count
+        self.unDocumented |= other.unDocumented
+
+    def toDict(self):
+        return {
+            'formatVersion' : self.formatVersion,
+            'documents' : self.documents,
+            'counts' : {tag : self.counts[tag] for tag in sorted(self.counts)},
+            'lengths' : {tag : self.lengths[tag] for tag in sorted(self.lengths)},
+            'overlaps' : {outerTag : dict(sorted(self.overlaps[outerTag].items())) for outerTag in sorted(self.overlaps)},
+            'containment' : {outerTag : dict(sorted(self.containment[outerTag].items())) for outerTag in sorted(self.containment)},
+            'unDocumented' : sorted(self.unDocumented),
+        }
+
+    @classmethod
+    def fromDict(cls, summaryDict):
+        if summaryDict.get('formatVersion') != cls.formatVersion:
+            raise SummaryException("The summary is from version {} of the format, only version {} can be read".format(summaryDict.get('formatVersion'), cls.formatVersion))
+        ret = cls()
+        ret.documents = summaryDict['documents']
+        ret.counts = dict(summaryDict['counts'])
+        ret.lengths = dict(summaryDict['lengths'])
+        ret.overlaps = {outerTag : dict(innerLengths) for outerTag, innerLengths in summaryDict['overlaps'].items()}
+        ret.containment = {outerTag : dict(innerCounts) for outerTag, innerCounts in summaryDict['containment'].items()}
+        ret.unDocumented = set(summaryDict['unDocumented'])
+        return ret
+
+def parseShard(shardString):
+    """Parses a shard given as 'i/n', the ith of n with i counting from 1, into (i, n)"""
+    try:
+        index, count = (int(v) for v in shardString.split('/'))
+    except ValueError:
+        raise SummaryException("'{}' is not a shard, shards are given as i/n, e.g. 2/8 for the second of eight.".format(shardString))
+    if count < 1 or index < 1 or index > count:
+        raise SummaryException("'{}' is not a shard, i must be between 1 and n in i/n.".format(shardString))
+    return index, count
+
+def inShard(relativePath, index, count):
+    """Checks if the document at relativePath, relative to the project's root, is in shard index of count. The shards are picked by a checksum of the path, so they are the same on every machine and a document stays in its shard as others are added."""
+    return zlib.crc32(pathlib.PurePath(relativePath).as_posix().encode('utf-8')) % count == index - 1
+
+class Partial(object):
+    """A `Summary` of one shard of a project's documents, along with which shard it is and the documents in it, so partials can be checked as they are merged"""
+    def __init__(self, summary, shard, files):
+        self.summary = summary
+        self.shard = tuple(shard)
+        self.files = sorted(str(pathlib.PurePath(f).as_posix()) for f in files)
+
+    def __repr__(self):
+        return "< Partial {}/{} [{} documents] >".format(self.shard[0], self.shard[1], len(self.files))
+
+    def toDict(self):
+        return {'shard' : list(self.shard), 'files' : self.files, 'summary' : self.summary.toDict()}
+
+    @classmethod
+    def fromDict(cls, partialDict):
+        try:
+            return cls(Summary.fromDict(partialDict['summary']), partialDict['shard'], partialDict['files'])
+        except (KeyError, TypeError):
+            raise SummaryException("The partial result is missing some of its entries.")
+
+    def write(self, target):
+        with open(str(target), 'w') as f:
+            json.dump(self.toDict(), f)
+
+    @classmethod
+    def read(cls, source):
+        try:
+            with open(str(source)) as f:
+                return cls.fromDict(json.load(f))
+        except ValueError:
+            raise SummaryException("'{}' is not a partial result, it is not valid JSON.".format(source))
+
+def mergePartials(partials):
+    """Merges partials, `Partial`s of disjoint sets of documents, into one `Summary`. Returns the summary and the shards, counting from 1, that are missing. A SummaryException is raised if partials have documents in common or were sharded differently."""
+    summary = Summary()
+    seenFiles = set()
+    shards = set()
+    shardCount = None
+    for partial in partials:
+        if shardCount is None:
+            shardCount = partial.shard[1]
+        elif partial.shard[1] != shardCount:
+            raise SummaryException("The partials were split into different numbers of shards, {} and {}, so cannot be merged.".format(shardCount, partial.shard[1]))
+        if partial.shard in shards:
+            raise SummaryException("Shard {}/{} was given more than once.".format(*partial.shard))
+        shared = seenFiles.intersection(partial.files)
+        if len(shared) > 0:
+            raise SummaryException("The partials share the document(s): {}, so merging them would count those twice.".format(', '.join(sorted(shared))))
+        seenFiles.update(partial.files)
+        shards.add(partial.shard)
+        summary += partial.summary
+    if shardCount is None:
+        missing = []
+    else:
+        missing = [i for i in range(1, shardCount + 1) if (i, shardCount) not in shards]
+    return summary, missing
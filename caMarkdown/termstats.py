@@ -0,0 +1,154 @@
+import json
+import hashlib
+import pathlib
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+from .plaintext import stripMarkup, tokenize
+from .documents import documentEncoding, readText
+from .caExceptions import MissingDependency, TermStatsException
+
+tokenCacheDirName = 'tokens'
+termMatrixName = 'terms.npz'
+#Changed when the cached tokens would differ, so older caches are redone
+tokenCacheVersion = 2
+
+rankingMethods = ['tfidf', 'logodds']
+
+def tokenCachePath(P, relativePath):
+    name = hashlib.sha1(pathlib.PurePath(relativePath).as_posix().encode(documentEncoding)).hexdigest() + '.json'
+    return pathlib.Path(P.cachePath(tokenCacheDirName), name)
+
+def readTokens(P, fname):
+    """Returns the words of the document fname of P, without its markup, their starts and the (tag, start, end) of its sections, all in clean coordinates. The result is cached in P's cache directory until the document changes."""
+    fname = pathlib.Path(P.path, fname)
+    stat = fname.stat()
+    stamp = [stat.st_mtime_ns, stat.st_size]
+    cachePath = tokenCachePath(P, fname.relative_to(P.path))
+    try:
+        with open(str(cachePath)) as f:
+            cached = json.load(f)
+        if cached.get('version') == tokenCacheVersion and cached['stamp'] == stamp:
+            return cached['terms'], cached['starts'], [tuple(sec) for sec in cached['sections']]
+    except (OSError, ValueError, KeyError):
+        pass
+    plain = stripMarkup(readText(fname), fname.relative_to(P.path))
+    terms, starts, ends = tokenize(plain.text)
+    sections = [(sec.tag, sec.start, sec.end) for sec in plain.sections]
+    P.cachePath(tokenCacheDirName, makeDir = True).mkdir(exist_ok = True)
+    with open(str(cachePath), 'w') as f:
+        json.dump({'version' : tokenCacheVersion, 'stamp' : stamp, 'terms' : terms, 'starts' : starts, 'sections' : sections}, f)
+    return terms, starts, sections
+
+class TermStats(object):
+    """The counts of the words in the sections of each code, as a sparse code by term matrix stored as the parallel arrays rows, cols and counts. A word is counted for a code if it starts within one of the code's sections, once however many of them it is in. termTotals is the count of each word in all the documents and documentFrequencies the number of codes using it.
+    """
+    def __init__(self, tags, terms, rows, cols, counts, termTotals):
+        if numpy is None:
+            raise MissingDependency("numpy is needed for term statistics, it can be installed with `pip install numpy`.")
+        self.tags = list(tags)
+        self.terms = list(terms)
+        self.rows = rows
+        self.cols = cols
+        self.counts = counts
+        self.termTotals = termTotals
+        self.tagIndices = {tag : i for i, tag in enumerate(self.tags)}
+        self.documentFrequencies = numpy.bincount(cols, minlength = len(self.terms))
+
+    def __repr__(self):
+        return "< TermStats [{} codes, {} terms] >".format(len(self.tags), len(self.terms))
+
+    @classmethod
+    def fromDocuments(cls, documents):
+        """Builds the matrix from documents, an iterable of (terms, starts, sections) as `readTokens()` gives"""
+        if numpy is None:
+            raise MissingDependency("numpy is needed for term statistics, it can be installed with `pip install numpy`.")
+        tagIndices = {}
+        termIndices = {}
+        pairs = []
+        termIds = []
+        for terms, starts, sections in documents:
+            docTermIds = numpy.array([termIndices.setdefault(t, len(termIndices)) for t in terms], dtype = numpy.int64)
+            termIds.append(docTermIds)
+            starts = numpy.array(starts, dtype = numpy.int64)
+            docTags = {}
+            for tag, start, end in sections:
+                docTags.setdefault(tag, []).append((start, end))
+            for tag, intervals in docTags.items():
+                tagId = tagIndices.setdefault(tag, len(tagIndices))
+                #The words starting in any of the sections, found with a running sum over the word indices
+                delta = numpy.zeros(len(starts) + 1, dtype = numpy.int32)
+                intervals = numpy.array(intervals, dtype = numpy.int64)
+                numpy.add.at(delta, numpy.searchsorted(starts, intervals[:, 0], side = 'left'), 1)
+                numpy.add.at(delta, numpy.searchsorted(starts, intervals[:, 1], side = 'left'), -1)
+                insideTerms = docTermIds[numpy.cumsum(delta[:-1]) > 0]
+                pairs.append(numpy.stack((numpy.full(len(insideTerms), tagId, dtype = numpy.int64), insideTerms)))
+        termCount = len(termIndices)
+        if len(pairs) > 0:
+            allPairs = numpy.concatenate(pairs, axis = 1)
+            keys, counts = numpy.unique(allPairs[0] * termCount + allPairs[1], return_counts = True)
+        else:
+            keys = counts = numpy.zeros(0, dtype = numpy.int64)
+        if len(termIds) > 0:
+            termTotals = numpy.bincount(numpy.concatenate(termIds), minlength = termCount)
+        else:
+            termTotals = numpy.zeros(0, dtype = numpy.int64)
+        return cls(tagIndices.keys(), termIndices.keys(), keys // max(termCount, 1), keys % max(termCount, 1), counts, termTotals)
+
+    def tagCounts(self, tag):
+        """The count of each term in the sections of tag, as a dense array"""
+        try:
+            tagId = self.tagIndices[tag]
+        except KeyError:
+            raise TermStatsException("The code '{}' is not used in any of the documents".format(tag))
+        ret = numpy.zeros(len(self.terms), dtype = numpy.int64)
+        selected = self.rows == tagId
+        ret[self.cols[selected]] = self.counts[selected]
+        return ret
+
+    def tfidf(self, tag):
+        """The TF-IDF of each term for tag, treating the text of each code as one document"""
+        counts = self.tagCounts(tag)
+        tf = counts / max(counts.sum(), 1)
+        idf = numpy.log((1 + len(self.tags)) / (1 + self.documentFrequencies)) + 1
+        return tf * idf
+
+    def logOdds(self, tag):
+        """The z-scores of the log-odds ratio of each term in the sections of tag against the rest of the documents, with an informative Dirichlet prior from the whole corpus (Monroe, Colaresi and Quinn 2008). The prior adds on average one count per term."""
+        inside = self.tagCounts(tag).astype(numpy.float64)
+        outside = numpy.maximum(self.termTotals - inside, 0)
+        prior = len(self.terms) * self.termTotals / max(self.termTotals.sum(), 1)
+        priorTotal = prior.sum()
+        insideTotal = inside.sum()
+        outsideTotal = outside.sum()
+        with numpy.errstate(divide = 'ignore', invalid = 'ignore'):
+            delta = numpy.log((inside + prior) / (insideTotal + priorTotal - inside - prior)) - numpy.log((outside + prior) / (outsideTotal + priorTotal - outside - prior))
+            variance = 1 / (inside + prior) + 1 / (outside + prior)
+            return delta / numpy.sqrt(variance)
+
+    def top(self, tag, count = 20, method = 'tfidf', minCount = 1):
+        """The count highest scoring terms of tag by method, 'tfidf' or 'logodds', as a list of (term, score, count). Terms used fewer than minCount times in the sections are left out."""
+        if method not in rankingMethods:
+            raise TermStatsException("'{}' is not a ranking method, the methods are: {}".format(method, ', '.join(rankingMethods)))
+        counts = self.tagCounts(tag)
+        scores = self.tfidf(tag) if method == 'tfidf' else self.logOdds(tag)
+        candidates = numpy.flatnonzero(counts >= max(minCount, 1))
+        order = candidates[numpy.argsort(-scores[candidates], kind = 'stable')][:count]
+        return [(self.terms[i], float(scores[i]), int(counts[i])) for i in order]
+
+    def save(self, target, key):
+        numpy.savez(str(target), key = numpy.array(key), tags = numpy.array(self.tags, dtype = str), terms = numpy.array(self.terms, dtype = str), rows = self.rows, cols = self.cols, counts = self.counts, termTotals = self.termTotals)
+
+    @classmethod
+    def load(cls, source, key):
+        """Loads the matrix saved at source if it was saved with key, otherwise returns None"""
+        try:
+            with numpy.load(str(source)) as data:
+                if str(data['key']) != key:
+                    return None
+                return cls(data['tags'].tolist(), data['terms'].tolist(), data['rows'], data['cols'], data['counts'], data['termTotals'])
+        except (OSError, ValueError, KeyError):
+            return None
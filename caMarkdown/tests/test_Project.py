@@ -4,6 +4,9 @@ import shutil
 import pathlib
 
 import caMarkdown
+import caMarkdown.export
+import caMarkdown.coverage
+import caMarkdown.sectionTable
 
 from .helpers import makeTestDir
 
@@ -16,6 +19,8 @@ testingFilesDir = os.path.join(os.path.dirname(__file__), 'womenInComp')
 
 tempDirName = 'tempTestingDir'
 
+crlfDirName = 'tempNewlinesDir'
+
 class Test_Project(unittest.TestCase):
 
     @classmethod
@@ -40,9 +45,61 @@ class Test_Project(unittest.TestCase):
         self.P.addDir(tempDirName, recursive = True)
         self.assertEqual(set(self.P.getAllTrackedFiles()), set(self.P.getFiles()))
 
+    def test_targetedCodes(self):
+        self.P.addDir(tempDirName, recursive = True)
+        targets = sorted(self.P.parseTree().tags.keys())[:3]
+        self.P.clearCache()
+        targetedCodes = self.P.getCodes(tags = targets)
+        self.assertEqual(set(targetedCodes.keys()), set(targets))
+        allCodes = self.P.codes
+        for tag in targets:
+            self.assertEqual(len(targetedCodes[tag]), len(allCodes[tag]))
+
+    def test_codebookCache(self):
+        self.P.addCode('$cached', description = 'kept')
+        self.assertEqual(self.P.codes['$cached'].description, 'kept')
+        self.assertEqual(self.P.readCodes()['$cached'], {'description' : 'kept'})
+        self.P.addCode('@cached')
+        self.assertIn('@cached', self.P.readCodes())
+
+    def test_missingCodebook(self):
+        os.remove(str(pathlib.Path(self.P.path, codeBookName)))
+        self.P.clearCache()
+        with self.assertRaises(caMarkdown.caExceptions.ProjectMissingFiles):
+            self.P.readCodebook()
+
     def tearDown(self):
         self.P.delete(force = True)
 
     @classmethod
     def tearDownClass(cls):
         shutil.rmtree(tempDirName)
+
+class Test_newlines(unittest.TestCase):
+
+    def setUp(self):
+        pathlib.Path(crlfDirName).mkdir()
+        with open(os.path.join(crlfDirName, 'doc.md'), 'wb') as f:
+            f.write(b"line one\r\nline [two\r\nmore](@a) x\r\n")
+        self.P = caMarkdown.Project(crlfDirName)
+        self.P.initializeDir()
+        self.P.addFile(os.path.join(crlfDirName, 'doc.md'))
+
+    def test_sameOffsets(self):
+        #'\r\n' is kept as two characters by every way of reading the documents
+        tree = [(sec.index, len(sec)) for sec in self.P.parseTree().tagSegments]
+        self.assertEqual(tree, [(15, 9)])
+        self.assertEqual([(sec.start, sec.length) for sec in self.P.iterSections()], tree)
+        self.assertEqual([(sec.start, sec.length) for sec in self.P.iterSections(mapped = True)], tree)
+        self.assertEqual([(row['start'], row['length'], row['text']) for row in caMarkdown.export.iterSectionRows(self.P, text = True)], [(15, 9, "two\r\nmore")])
+        if caMarkdown.sectionTable.numpy is not None:
+            table = self.P.sectionTable()
+            self.assertEqual((table.starts.tolist(), table.lengths.tolist()), ([15], [9]))
+        coverage = list(self.P.coverage())[0]
+        self.assertEqual(coverage[caMarkdown.coverage.allCodes].covered, 9)
+        matches = list(self.P.grep('more'))
+        self.assertEqual([(m.rawStart, m.rawEnd) for m in matches], [(21, 25)])
+
+    def tearDown(self):
+        self.P.delete(force = True)
+        shutil.rmtree(crlfDirName, ignore_errors = True)
@@ -0,0 +1,48 @@
+import unittest
+import itertools
+
+import caMarkdown.agreement
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+def coincidenceAlpha(first, second):
+    """Krippendorff's alpha from the coincidence matrix, for two coders with binary values"""
+    coincidences = {(a, b) : 0 for a, b in itertools.product((0, 1), repeat = 2)}
+    for a, b in zip(first, second):
+        coincidences[(a, b)] += 1
+        coincidences[(b, a)] += 1
+    n = 2 * len(first)
+    ones = coincidences[(1, 1)] + coincidences[(1, 0)]
+    zeros = n - ones
+    return 1 - (n - 1) * coincidences[(0, 1)] / (ones * zeros)
+
+@unittest.skipIf(numpy is None, "numpy is not installed")
+class Test_Agreement(unittest.TestCase):
+
+    def test_counts(self):
+        first = "a [[bc](@x) de](^y) f [gh](@x)"
+        second = "a bc [de f](@x) gh"
+        A = caMarkdown.agreement.Agreement()
+        A.addDocument('t.md', first, second)
+        self.assertEqual(A.tags, ['@x', '^y'])
+        counts, kappas, alphas = A.byCode()
+        #The clean text is "a bc de f gh", @x is "bc" and "gh" then "de f"
+        self.assertEqual(counts[0].tolist(), [0, 4, 4, 4])
+        self.assertEqual(counts[1].tolist(), [0, 5, 0, 7])
+        firstMask = [0, 0, 1, 1, 0, 0, 0, 0, 0, 0, 1, 1]
+        secondMask = [0, 0, 0, 0, 0, 1, 1, 1, 1, 0, 0, 0]
+        self.assertAlmostEqual(alphas[0], coincidenceAlpha(firstMask, secondMask))
+
+    def test_identical(self):
+        doc = "[one](@x) two [three](^y $z)"
+        A = caMarkdown.agreement.Agreement(unit = 'token')
+        A.addDocument('t.md', doc, doc)
+        A.addDocument('u.md', doc, doc.replace('two', 'too'))
+        self.assertEqual(A.skipped, ['u.md'])
+        counts, kappas, alphas = A.byCode()
+        self.assertEqual(counts.sum(axis = 1).tolist(), [3, 3, 3])
+        self.assertTrue(numpy.allclose(kappas, 1))
+        self.assertTrue(numpy.allclose(alphas, 1))
@@ -0,0 +1,52 @@
+import unittest
+
+import caMarkdown.autocode
+import caMarkdown.plaintext
+
+class Test_autocode(unittest.TestCase):
+
+    def setUp(self):
+        rules = [
+            caMarkdown.autocode.makeRule({'code' : '^speaker', 'literal' : 'Q:'}, 1),
+            caMarkdown.autocode.makeRule({'code' : '$stress', 'literal' : ['stress', 'stressed'], 'ignoreCase' : True, 'wholeWord' : True}, 2),
+            caMarkdown.autocode.makeRule({'code' : '@year $date', 'regex' : r'19\d\d'}, 3),
+        ]
+        self.ruleSet = caMarkdown.autocode.RuleSet(rules)
+
+    def test_wrapping(self):
+        source = "Q: Stressed in 1984? [Q: no](^speaker), [not stress in distress](@calm)\r\n"
+        coded, counts = caMarkdown.autocode.autocodeText(source, self.ruleSet)
+        self.assertEqual(coded, "[Q:](^speaker) [Stressed]($stress) in [1984](@year $date)? [Q: no](^speaker), [not [stress]($stress) in distress](@calm)\r\n")
+        self.assertEqual([c.coded for c in counts], [1, 2, 1])
+        self.assertEqual([c.skipped for c in counts], [1, 0, 0])
+        #Running the rules again changes nothing
+        again, counts = caMarkdown.autocode.autocodeText(coded, self.ruleSet)
+        self.assertEqual(again, coded)
+        self.assertEqual([c.coded for c in counts], [0, 0, 0])
+        self.assertEqual(caMarkdown.plaintext.stripMarkup(coded).text, caMarkdown.plaintext.stripMarkup(source).text)
+
+    def test_crossingMarkup(self):
+        source = "str[ess and 1984](@x) but [19](^y)84"
+        coded, counts = caMarkdown.autocode.autocodeText(source, self.ruleSet)
+        self.assertEqual(coded, "str[ess and [1984](@year $date)](@x) but [19](^y)84")
+        self.assertEqual([c.skipped for c in counts], [0, 1, 1])
+
+    def test_markupCharacters(self):
+        ruleSet = caMarkdown.autocode.RuleSet([
+            caMarkdown.autocode.makeRule({'code' : '$x', 'regex' : r'see \[1\]'}, 1),
+            caMarkdown.autocode.makeRule({'code' : '$y', 'regex' : r'q\)?'}, 2),
+        ])
+        source = "we see [1] here (q) and q"
+        coded, counts = caMarkdown.autocode.autocodeText(source, ruleSet)
+        self.assertEqual(coded, "we see [1] here (q) and [q]($y)")
+        self.assertEqual([c.coded for c in counts], [0, 1])
+        self.assertEqual([c.skipped for c in counts], [1, 1])
+        self.assertEqual(caMarkdown.plaintext.stripMarkup(coded).text, source.replace('[q]($y)', 'q'))
+        again, counts = caMarkdown.autocode.autocodeText(coded, ruleSet)
+        self.assertEqual(again, coded)
+        self.assertEqual([c.coded for c in counts], [0, 0])
+
+    def test_badRules(self):
+        for entry in [{'literal' : 'a'}, {'code' : 'nope', 'literal' : 'a'}, {'code' : '$a'}, {'code' : '$a', 'regex' : '('}, {'code' : '$a', 'literal' : 'a', 'other' : 1}, {'code' : '$a', 'regex' : r'(\w)\1'}, {'code' : '$a', 'regex' : ['x', r'(?P<c>a)b(?P=c)']}]:
+            with self.assertRaises(caMarkdown.caExceptions.AutocodeException):
+                caMarkdown.autocode.makeRule(entry, 1)
@@ -0,0 +1,131 @@
+import unittest
+import io
+import os.path
+import random
+
+import caMarkdown.codes
+import caMarkdown.documents
+
+from .helpers import addCodes
+
+targetFile = os.path.join(os.path.dirname(__file__), 'testProject', 'RecordTarget.md')
+testingFilesDir = os.path.join(os.path.dirname(__file__), 'womenInComp')
+
+def treeSections(targetString):
+    tree = caMarkdown.codes.parseTree(targetString)
+    return sorted((sec.tag, sec.line, sec.index, len(sec)) for sec in tree.tagSegments)
+
+def scannedSections(targetString, chunkSize = caMarkdown.codes.defaultChunkSize):
+    secs = caMarkdown.codes.iterSections(io.StringIO(targetString), chunkSize = chunkSize)
+    return sorted((sec.tag, sec.line, sec.start, sec.length) for sec in secs)
+
+class Test_iterSections(unittest.TestCase):
+
+    def setUp(self):
+        with open(targetFile) as f:
+            self.targetString = f.read()
+
+    def test_matchesTree(self):
+        self.assertEqual(scannedSections(self.targetString), treeSections(self.targetString))
+
+    def test_chunkBoundaries(self):
+        expected = scannedSections(self.targetString)
+        for chunkSize in (1, 2, 3, 7, 64):
+            self.assertEqual(scannedSections(self.targetString, chunkSize = chunkSize), expected)
+
+    def test_bytes(self):
+        targetBytes = self.targetString.encode('utf-8')
+        strSecs = list(caMarkdown.codes.iterSections(io.StringIO(self.targetString)))
+        byteSecs = list(caMarkdown.codes.iterSections(io.BytesIO(targetBytes), chunkSize = 5))
+        self.assertEqual([(s.tag, s.line) for s in strSecs], [(s.tag, s.line) for s in byteSecs])
+        for sec in byteSecs:
+            self.assertEqual(targetBytes[sec.start:sec.start + 1], b'[')
+            self.assertEqual(targetBytes[sec.end - 1:sec.end], b')')
+
+    def test_randomCodes(self):
+        random.seed(0)
+        fname = sorted(os.listdir(testingFilesDir))[0]
+        with open(os.path.join(testingFilesDir, fname)) as f:
+            s = addCodes(f.read()[:5000], 15, 5)[2]
+        self.assertEqual(scannedSections(s, chunkSize = 11), treeSections(s))
+
+class Test_prefilter(unittest.TestCase):
+
+    def test_mayContainTags(self):
+        with open(targetFile, 'rb') as f:
+            targetBytes = f.read()
+        self.assertTrue(caMarkdown.documents.mayContainTags(targetBytes))
+        self.assertTrue(caMarkdown.documents.mayContainTags(targetBytes, ['^tag2']))
+        self.assertTrue(caMarkdown.documents.mayContainTags(targetBytes, ['$tag6', '@missing']))
+        self.assertFalse(caMarkdown.documents.mayContainTags(targetBytes, ['^tag']))
+        self.assertFalse(caMarkdown.documents.mayContainTags(targetBytes, []))
+        self.assertFalse(caMarkdown.documents.mayContainTags(b'[not a code] (^tag1)'))
+
+class Test_Corpus(unittest.TestCase):
+
+    def test_tags(self):
+        with open(targetFile) as f:
+            targetString = f.read()
+        trees = [caMarkdown.codes.parseTree(targetString, 'a.md'), caMarkdown.codes.parseTree(targetString, 'b.md')]
+        corpus = caMarkdown.codes.Corpus(trees)
+        self.assertEqual(corpus.files, ['a.md', 'b.md'])
+        single = caMarkdown.codes.parseTree(targetString).tags
+        self.assertEqual(set(corpus.tags), set(single))
+        for tagString, tag in corpus.tags.items():
+            self.assertIsInstance(tag, type(single[tagString]))
+            self.assertEqual(len(tag), 2 * len(single[tagString]))
+            self.assertEqual([sec.file for sec in tag.sections], ['a.md'] * len(single[tagString]) + ['b.md'] * len(single[tagString]))
+
+class Test_containment(unittest.TestCase):
+
+    def test_matchesTree(self):
+        with open(targetFile) as f:
+            targetString = f.read()
+        graph = caMarkdown.codes.containmentCounts(caMarkdown.codes.iterSections(io.StringIO(targetString)))
+        for tagString, tag in caMarkdown.codes.parseTree(targetString).tags.items():
+            self.assertEqual(set(graph.get(tagString, {})), set(tag.containedTags))
+            for innerTag, count in graph.get(tagString, {}).items():
+                self.assertEqual(count, len(set((s.index, s.tag) for s in tag[innerTag])))
+        self.assertEqual(graph['$tag6']['^tag1'], 3)
+        self.assertNotIn('^tag1', graph)
+
+class Test_scanMarkup(unittest.TestCase):
+
+    def setUp(self):
+        self.source = "ab [cd [ef](^m) gh](@c) [ij]($t) [no] (x)\n[é](@c)"
+
+    def test_sections(self):
+        sections, spans = caMarkdown.codes.scanMarkup(self.source)
+        self.assertEqual(sorted((sec.tag, sec.line, sec.start, sec.end) for sec in sections), [('$t', 1, 24, 32), ('@c', 1, 3, 23), ('@c', 2, 42, 49), ('^m', 1, 7, 15)])
+        self.assertEqual(spans, [(3, 4), (7, 8), (10, 15), (18, 23), (24, 25), (27, 32), (42, 43), (44, 49)])
+        for sec in sections:
+            self.assertEqual(self.source[sec.start], '[')
+            self.assertEqual(self.source[sec.end - 1], ')')
+
+    def test_bytes(self):
+        sections, spans = caMarkdown.codes.scanMarkup(self.source.encode('utf-8'))
+        #The é is two bytes so the last section is one byte further along
+        self.assertEqual(spans, [(3, 4), (7, 8), (10, 15), (18, 23), (24, 25), (27, 32), (42, 43), (45, 50)])
+        self.assertEqual(sorted(sec.tag for sec in sections), ['$t', '@c', '@c', '^m'])
+
+class Test_stripSpans(unittest.TestCase):
+
+    def setUp(self):
+        self.source = "ab [cd [ef](^m) gh](@c) [ij]($t) [no] (x)\n[é](@c)"
+        self.spans = caMarkdown.codes.scanMarkup(self.source)[1]
+
+    def test_whole(self):
+        self.assertEqual(caMarkdown.codes.stripSpans(self.source, 0, len(self.source), self.spans), "ab cd ef gh ij [no] (x)\né")
+        self.assertEqual(caMarkdown.codes.stripSpans(self.source, 0, len(self.source), []), self.source)
+
+    def test_slices(self):
+        #Starting and ending inside markup
+        self.assertEqual(caMarkdown.codes.stripSpans(self.source, 5, 12, self.spans), "d ef")
+        self.assertEqual(caMarkdown.codes.stripSpans(self.source, 11, 20, self.spans), " gh")
+        self.assertEqual(caMarkdown.codes.stripSpans(self.source, 10, 15, self.spans), "")
+        self.assertEqual(caMarkdown.codes.stripSpans(self.source, 4, 4, self.spans), "")
+
+    def test_bytes(self):
+        source = self.source.encode('utf-8')
+        spans = caMarkdown.codes.scanMarkup(source)[1]
+        self.assertEqual(caMarkdown.codes.stripSpans(source, 0, len(source), spans), "ab cd ef gh ij [no] (x)\né".encode('utf-8'))
@@ -0,0 +1,123 @@
+import unittest
+import io
+import os
+import json
+import shutil
+import pathlib
+import contextlib
+
+import caMarkdown
+from caMarkdown.commandline.subcommands.batch import startBatch
+from caMarkdown.commandline.subcommands.subCommandBase import CommandOutputHandler
+
+tempDirName = 'tempCommandlineDir'
+
+class Test_CommandOutputHandler(unittest.TestCase):
+
+    def makeHandler(self, outputFormat, flushPolicy = 'exit', bufferSize = 100):
+        stream = io.StringIO()
+        with contextlib.redirect_stdout(stream):
+            return stream, CommandOutputHandler(None, outputFormat = outputFormat, flushPolicy = flushPolicy, bufferSize = bufferSize)
+
+    def test_json(self):
+        stream, writer = self.makeHandler('json')
+        with writer:
+            writer.record({'a' : 1}, "a is 1\n")
+            writer.record(None, "only for people\n")
+            writer("a message\n")
+            writer.record({'b' : [2, 3]})
+        self.assertEqual(json.loads(stream.getvalue()), [{'a' : 1}, {'message' : 'a message'}, {'b' : [2, 3]}])
+        stream, writer = self.makeHandler('json')
+        with writer:
+            writer.record(None, "only for people\n")
+        self.assertEqual(json.loads(stream.getvalue()), [])
+
+    def test_ndjson(self):
+        stream, writer = self.makeHandler('ndjson')
+        with writer:
+            writer.record({'a' : 1}, "a is 1\n")
+            writer.record(None, "only for people\n")
+            writer.record({'b' : 2})
+        self.assertEqual([json.loads(line) for line in stream.getvalue().splitlines()], [{'a' : 1}, {'b' : 2}])
+
+    def test_text(self):
+        stream, writer = self.makeHandler('text')
+        with writer:
+            writer.record({'a' : 1}, "a is 1\n")
+            writer.record({'b' : 2})
+            writer("a message\n")
+        self.assertEqual(stream.getvalue(), "a is 1\na message\n")
+
+    def test_flushPolicies(self):
+        stream, writer = self.makeHandler('text', flushPolicy = 'line')
+        writer("first\n")
+        self.assertEqual(stream.getvalue(), "first\n")
+        writer.close()
+        stream, writer = self.makeHandler('text', flushPolicy = 'buffered', bufferSize = 10)
+        writer("first\n")
+        self.assertEqual(stream.getvalue(), "")
+        writer("second\n")
+        self.assertEqual(stream.getvalue(), "first\nsecond\n")
+        writer.close()
+        stream, writer = self.makeHandler('text', flushPolicy = 'exit', bufferSize = 10)
+        writer("first\nsecond\n")
+        self.assertEqual(stream.getvalue(), "")
+        writer.close()
+        self.assertEqual(stream.getvalue(), "first\nsecond\n")
+        with self.assertRaises(ValueError):
+            self.makeHandler('text', flushPolicy = 'sometimes')
+
+    def test_errors(self):
+        stream, writer = self.makeHandler('text')
+        errStream = io.StringIO()
+        with writer, contextlib.redirect_stderr(errStream):
+            writer("output\n")
+            writer.error("went wrong")
+        self.assertEqual(stream.getvalue(), "output\n")
+        self.assertEqual(errStream.getvalue(), "went wrong\n")
+        stream, writer = self.makeHandler('json')
+        with writer:
+            writer.error("went wrong")
+        self.assertEqual(json.loads(stream.getvalue()), [{'error' : 'went wrong'}])
+
+class Test_batch(unittest.TestCase):
+
+    def setUp(self):
+        pathlib.Path(tempDirName).mkdir()
+        with open(os.path.join(tempDirName, 'doc.md'), 'w') as f:
+            f.write("Some [coded]($one) text and [more](@two $one)\n")
+        self.P = caMarkdown.Project(tempDirName)
+        self.P.initializeDir()
+        self.P.addFile(os.path.join(tempDirName, 'doc.md'))
+        with open(os.path.join(tempDirName, 'script'), 'w') as f:
+            f.write("status --format json\n# a comment\ncoverage\ncamd status --format ndjson\n")
+        self.cwd = os.getcwd()
+        os.chdir(tempDirName)
+
+    def test_jsonOutput(self):
+        startBatch(['script', '--format', 'json', '--output', 'out.json'])
+        with open('out.json') as f:
+            records = json.loads(f.read())
+        self.assertEqual(len(records), 3)
+        self.assertEqual(records[0], records[2])
+        self.assertEqual(records[1]['file'], 'doc.md')
+
+    def test_ndjsonOutput(self):
+        startBatch(['script', '--format', 'ndjson', '--output', 'out.ndjson'])
+        with open('out.ndjson') as f:
+            records = [json.loads(line) for line in f]
+        self.assertEqual(len(records), 3)
+
+    def test_mergeCodes(self):
+        with open('script', 'w') as f:
+            f.write("mergecodes $one @two --into $three --format json\n")
+        startBatch(['script', '--format', 'json', '--output', 'out.json'])
+        with open('out.json') as f:
+            records = json.loads(f.read())
+        self.assertEqual([(r['old'], r['new']) for r in records], [('$one', '$three'), ('@two $one', '$three')])
+        with open('doc.md') as f:
+            self.assertEqual(f.read(), "Some [coded]($three) text and [more]($three)\n")
+
+    def tearDown(self):
+        os.chdir(self.cwd)
+        shutil.rmtree(tempDirName)
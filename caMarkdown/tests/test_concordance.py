@@ -0,0 +1,75 @@
+import unittest
+import os
+import shutil
+import pathlib
+
+import caMarkdown.codes
+import caMarkdown.concordance
+import caMarkdown.documents
+
+tempDirName = 'tempConcordanceDir'
+
+class Test_context(unittest.TestCase):
+
+    def setUp(self):
+        self.source = "start [one](@a) two [three](@b) four five six seven end".encode('utf-8')
+        self.spans = caMarkdown.codes.scanMarkup(self.source)[1]
+
+    def test_before(self):
+        pos = self.source.index(b'four')
+        self.assertEqual(caMarkdown.concordance.contextBefore(self.source, self.spans, pos, 9), "wo three ")
+        #The window grows past the markup until there is enough text
+        self.assertEqual(caMarkdown.concordance.contextBefore(self.source, self.spans, pos, 17), "start one two three "[-17:])
+        #At the start of the buffer there is only what there is
+        self.assertEqual(caMarkdown.concordance.contextBefore(self.source, self.spans, pos, 1000), "start one two three ")
+        self.assertEqual(caMarkdown.concordance.contextBefore(self.source, self.spans, 0, 5), "")
+        self.assertEqual(caMarkdown.concordance.contextBefore(self.source, self.spans, pos, 0), "")
+
+    def test_after(self):
+        pos = self.source.index(b' two')
+        self.assertEqual(caMarkdown.concordance.contextAfter(self.source, self.spans, pos, 10), " two three")
+        self.assertEqual(caMarkdown.concordance.contextAfter(self.source, self.spans, pos, 1000), " two three four five six seven end")
+        self.assertEqual(caMarkdown.concordance.contextAfter(self.source, self.spans, len(self.source), 5), "")
+        self.assertEqual(caMarkdown.concordance.contextAfter(self.source, self.spans, pos, 0), "")
+
+    def test_growth(self):
+        #Far more markup than text, so the first windows are too small
+        source = ("[x](@{}) ".format('a' * 100) * 20).encode('utf-8')
+        spans = caMarkdown.codes.scanMarkup(source)[1]
+        self.assertEqual(caMarkdown.concordance.contextAfter(source, spans, 0, 30), "x x x x x x x x x x x x x x x ")
+        self.assertEqual(caMarkdown.concordance.contextBefore(source, spans, len(source), 30), "x x x x x x x x x x x x x x x ")
+
+    def test_multibyte(self):
+        source = "日本語のテキスト [です](@a) ね、そうです。".encode('utf-8')
+        spans = caMarkdown.codes.scanMarkup(source)[1]
+        pos = source.index('[です]'.encode('utf-8'))
+        end = source.index(' ね'.encode('utf-8'))
+        self.assertEqual(caMarkdown.concordance.contextBefore(source, spans, pos, 5), "テキスト ")
+        self.assertEqual(caMarkdown.concordance.contextBefore(source, spans, pos, 100), "日本語のテキスト ")
+        self.assertEqual(caMarkdown.concordance.contextAfter(source, spans, end, 4), " ね、そ")
+        self.assertEqual(caMarkdown.concordance.contextAfter(source, spans, end, 100), " ね、そうです。")
+
+class Test_iterConcordance(unittest.TestCase):
+
+    def setUp(self):
+        pathlib.Path(tempDirName).mkdir()
+        self.path = os.path.join(tempDirName, 'doc.md')
+        with open(self.path, 'w', encoding = 'utf-8') as f:
+            f.write("first [short](@a) line\nthen [a rather long [coded](@b) section of text](@a) é\n")
+
+    def test_lines(self):
+        with caMarkdown.documents.MappedDocument(self.path, 'doc.md') as doc:
+            lines = list(caMarkdown.concordance.iterConcordance(doc, '@a', 5))
+        self.assertEqual([(l.file, l.line) for l in lines], [('doc.md', 1), ('doc.md', 2)])
+        self.assertEqual(lines[0], caMarkdown.concordance.ConcordanceLine('doc.md', 1, 'irst ', 'short', ' line'))
+        self.assertEqual(lines[1].keyword, "a rat ...  text")
+        self.assertEqual(lines[1].right, " é ")
+
+    def test_badWidth(self):
+        with caMarkdown.documents.MappedDocument(self.path, 'doc.md') as doc:
+            for width in (0, -3):
+                with self.assertRaises(ValueError):
+                    list(caMarkdown.concordance.iterConcordance(doc, '@a', width))
+
+    def tearDown(self):
+        shutil.rmtree(tempDirName)
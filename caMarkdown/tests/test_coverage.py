@@ -0,0 +1,38 @@
+import unittest
+import os.path
+import random
+
+import caMarkdown.codes
+import caMarkdown.coverage
+import caMarkdown.plaintext
+
+from .helpers import addCodes
+
+testingFilesDir = os.path.join(os.path.dirname(__file__), 'womenInComp')
+
+class Test_coverage(unittest.TestCase):
+
+    def test_matchesCharacters(self):
+        random.seed(2)
+        fname = sorted(os.listdir(testingFilesDir))[1]
+        with open(os.path.join(testingFilesDir, fname)) as f:
+            s = addCodes(f.read()[:3000], 10, 4)[2]
+        sections, spans = caMarkdown.codes.scanMarkup(s)
+        clean = caMarkdown.codes.stripSpans(s, 0, len(s), spans)
+        intervals = [(sec.start, sec.end) for sec in caMarkdown.plaintext.stripMarkup(s).sections]
+        depths = [0] * len(clean)
+        for start, end in intervals:
+            for i in range(start, end):
+                depths[i] += 1
+        coverage = caMarkdown.coverage.documentCoverage(s)[caMarkdown.coverage.allCodes]
+        self.assertEqual(coverage.length, len(clean))
+        self.assertEqual(coverage.covered, sum(1 for d in depths if d > 0))
+        self.assertEqual(coverage.depths, {d : depths.count(d) for d in set(depths)})
+        self.assertEqual(sum(end - start for start, end in coverage.gaps), depths.count(0))
+
+    def test_types(self):
+        coverage = caMarkdown.coverage.documentCoverage("ab [cd [ef](^m) gh](@c) [ij]($t)")
+        self.assertEqual(coverage['@'].covered, 8)
+        self.assertEqual(coverage['^'].gaps, [(0, 6), (8, 14)])
+        self.assertEqual(coverage['$'].depths, {0 : 12, 1 : 2})
+        self.assertEqual(coverage[caMarkdown.coverage.allCodes].depths, {0 : 4, 1 : 8, 2 : 2})
@@ -0,0 +1,114 @@
+import unittest
+import unittest.mock
+import gc
+import warnings
+import os
+import shutil
+import pathlib
+import threading
+
+import caMarkdown.codes
+import caMarkdown.documents
+import caMarkdown.plaintext
+
+tempDirName = 'tempDocumentsDir'
+
+class Test_MappedDocument(unittest.TestCase):
+
+    def setUp(self):
+        pathlib.Path(tempDirName).mkdir()
+        self.source = "Ünïcödé [naïve [café](^m) text](@c) and 日本 [語](@j)\r\n[x](@c) 😀 [](@e) [no] end"
+        self.path = os.path.join(tempDirName, 'doc.md')
+        with open(self.path, 'w', encoding = 'utf-8', newline = '') as f:
+            f.write(self.source)
+        self.emptyPath = os.path.join(tempDirName, 'empty.md')
+        open(self.emptyPath, 'w').close()
+
+    def test_matchesTree(self):
+        tree = sorted((sec.tag, sec.line, sec.index, sec.raw) for sec in caMarkdown.codes.parseTree(self.source).tagSegments)
+        sourceBytes = self.source.encode('utf-8')
+        for chunkSize in (1, 3, caMarkdown.codes.defaultChunkSize):
+            with caMarkdown.documents.MappedDocument(self.path, 'doc.md') as doc:
+                mapped = []
+                for sec in doc.sections(chunkSize = chunkSize):
+                    self.assertEqual(sec.file, 'doc.md')
+                    #The offsets are in bytes
+                    index = len(sourceBytes[:sec.start].decode('utf-8'))
+                    mapped.append((sec.tag, sec.line, index, caMarkdown.plaintext.stripMarkup(doc.sectionText(sec)).text))
+            self.assertEqual(sorted(mapped), tree)
+
+    def test_text(self):
+        with caMarkdown.documents.MappedDocument(self.path) as doc:
+            self.assertEqual(len(doc), len(self.source.encode('utf-8')))
+            self.assertEqual(doc.text(), self.source)
+            sections, spans = doc.scan()
+            self.assertEqual(sorted(doc.sectionText(sec) for sec in sections), sorted(['naïve [café](^m) text', 'café', '語', 'x', '']))
+            start = len("Ünïcödé ".encode('utf-8'))
+            self.assertEqual(doc.text(start, start + len("[naïve".encode('utf-8'))), "[naïve")
+            #Half of a character
+            with self.assertRaises(UnicodeDecodeError):
+                doc.text(0, 1)
+            self.assertEqual(doc.text(0, 1, errors = 'replace'), '�')
+
+    def test_empty(self):
+        with caMarkdown.documents.MappedDocument(self.emptyPath) as doc:
+            self.assertEqual(len(doc), 0)
+            self.assertEqual(list(doc.sections()), [])
+            self.assertEqual(doc.scan(), ([], []))
+            self.assertEqual(doc.text(), '')
+        self.assertEqual(doc.buffer, b'')
+
+    def test_mapFails(self):
+        def failingMap(*args, **kwargs):
+            raise OSError("no memory")
+        #A file that is not closed warns when it is collected
+        with warnings.catch_warnings(record = True) as caught, unittest.mock.patch('mmap.mmap', failingMap):
+            warnings.simplefilter('always', ResourceWarning)
+            with self.assertRaises(OSError):
+                caMarkdown.documents.MappedDocument(self.path)
+            gc.collect()
+        self.assertEqual([w for w in caught if issubclass(w.category, ResourceWarning)], [])
+
+    def tearDown(self):
+        shutil.rmtree(tempDirName)
+
+class Test_readDocuments(unittest.TestCase):
+
+    def setUp(self):
+        pathlib.Path(tempDirName).mkdir()
+        self.paths = []
+        for i in range(20):
+            path = pathlib.Path(tempDirName, 'doc{}.md'.format(i))
+            #Different sizes so the reads finish out of order
+            path.write_bytes("[doc {}](@n) é\n".format(i).encode('utf-8') * (1 + (i * 7919) % 500))
+            self.paths.append(path)
+
+    def test_order(self):
+        expected = [(path, path.read_bytes()) for path in self.paths]
+        for workers in (None, 0, 1, 2, 4, 32):
+            self.assertEqual(list(caMarkdown.documents.readDocuments(self.paths, workers = workers)), expected)
+        self.assertEqual(list(caMarkdown.documents.readDocuments([], workers = 4)), [])
+
+    def test_inFlight(self):
+        lock = threading.Lock()
+        counts = {'read' : 0, 'yielded' : 0, 'ahead' : 0}
+        readBytes = caMarkdown.documents.readBytes
+        def countingRead(targetPath):
+            with lock:
+                counts['read'] += 1
+                counts['ahead'] = max(counts['ahead'], counts['read'] - counts['yielded'])
+            return readBytes(targetPath)
+        caMarkdown.documents.readBytes = countingRead
+        try:
+            for workers in (1, 3):
+                counts.update(read = 0, yielded = 0, ahead = 0)
+                for path, docBytes in caMarkdown.documents.readDocuments(self.paths, workers = workers):
+                    with lock:
+                        counts['yielded'] += 1
+                self.assertEqual(counts['read'], len(self.paths))
+                self.assertLessEqual(counts['ahead'], workers)
+        finally:
+            caMarkdown.documents.readBytes = readBytes
+
+    def tearDown(self):
+        shutil.rmtree(tempDirName)
@@ -0,0 +1,100 @@
+import unittest
+import os
+import csv
+import shutil
+import pathlib
+
+import caMarkdown
+import caMarkdown.export
+
+tempDirName = 'tempExportDir'
+
+expectedRows = [
+    {'tag' : '@y', 'codeType' : 'ContextCode', 'file' : 'doc.md', 'start' : 2, 'end' : 22, 'line' : 1, 'endLine' : 1, 'length' : 5, 'parentStart' : None, 'parentTags' : None, 'text' : 'b [c](^x) d'},
+    {'tag' : '$z', 'codeType' : 'ContentCode', 'file' : 'doc.md', 'start' : 2, 'end' : 22, 'line' : 1, 'endLine' : 1, 'length' : 5, 'parentStart' : None, 'parentTags' : None, 'text' : 'b [c](^x) d'},
+    {'tag' : '^x', 'codeType' : 'MetaCode', 'file' : 'doc.md', 'start' : 5, 'end' : 12, 'line' : 1, 'endLine' : 1, 'length' : 1, 'parentStart' : 2, 'parentTags' : '@y $z', 'text' : 'c'},
+    {'tag' : '@y', 'codeType' : 'ContextCode', 'file' : 'doc.md', 'start' : 25, 'end' : 32, 'line' : 2, 'endLine' : 2, 'length' : 1, 'parentStart' : None, 'parentTags' : None, 'text' : 'f'},
+    {'tag' : '@y', 'codeType' : 'ContextCode', 'file' : 'doc.md', 'start' : 33, 'end' : 48, 'line' : 2, 'endLine' : 2, 'length' : 3, 'parentStart' : None, 'parentTags' : None, 'text' : 'g [h](^x)'},
+    {'tag' : '^x', 'codeType' : 'MetaCode', 'file' : 'doc.md', 'start' : 36, 'end' : 43, 'line' : 2, 'endLine' : 2, 'length' : 1, 'parentStart' : 33, 'parentTags' : '@y', 'text' : 'h'},
+]
+
+intColumns = [name for name, colType in caMarkdown.export.sectionColumns if colType == 'int64']
+
+def readCSV(target):
+    """The rows of the CSV at target, with the integers and empty cells as they were exported"""
+    with open(str(target), newline = '') as f:
+        rows = list(csv.DictReader(f))
+    for row in rows:
+        for name, value in row.items():
+            if value == '':
+                row[name] = None
+            elif name in intColumns:
+                row[name] = int(value)
+    return rows
+
+class Test_export(unittest.TestCase):
+
+    def setUp(self):
+        pathlib.Path(tempDirName).mkdir()
+        with open(os.path.join(tempDirName, 'doc.md'), 'w') as f:
+            f.write("a [b [c](^x) d](@y $z) e\n[f](@y) [g [h](^x)](@y)\n")
+        self.P = caMarkdown.Project(tempDirName)
+        self.P.initializeDir()
+        self.P.addFile(os.path.join(tempDirName, 'doc.md'))
+        self.P.addCode('$z', description = 'zed')
+        self.P.addCode('^x')
+
+    def test_csv(self):
+        target = pathlib.Path(tempDirName, 'sections.csv')
+        self.assertEqual(self.P.exportSections(target, text = True), len(expectedRows))
+        self.assertEqual(readCSV(target), expectedRows)
+        self.assertEqual(self.P.exportSections(target, tags = ['^x']), 2)
+        #The parents are only looked for among the sections exported
+        self.assertEqual(readCSV(target), [dict({k : v for k, v in row.items() if k != 'text'}, parentStart = None, parentTags = None) for row in expectedRows if row['tag'] == '^x'])
+
+    def test_parquet(self):
+        if caMarkdown.export.pyarrow is None:
+            self.skipTest("pyarrow is not installed")
+        import pyarrow.parquet
+        target = pathlib.Path(tempDirName, 'sections.parquet')
+        self.assertEqual(self.P.exportSections(target, text = True, batchSize = 4), len(expectedRows))
+        table = pyarrow.parquet.read_table(str(target))
+        self.assertEqual(table.to_pylist(), expectedRows)
+        self.assertEqual(str(table.schema.field('parentStart').type), 'int64')
+        self.assertEqual(pyarrow.parquet.ParquetFile(str(target)).num_row_groups, 2)
+
+    def test_codebook(self):
+        target = pathlib.Path(tempDirName, 'codebook.csv')
+        self.assertEqual(self.P.exportCodebook(target), 2)
+        self.assertEqual(readCSV(target), [
+            {'tag' : '$z', 'codeType' : 'ContentCode', 'description' : 'zed'},
+            {'tag' : '^x', 'codeType' : 'MetaCode', 'description' : None},
+        ])
+
+    def test_batches(self):
+        columns = [('n', 'int64')]
+        batches = []
+        writeBatch = caMarkdown.export.CSVTableWriter.writeBatch
+        def countingWrite(writer, rows):
+            batches.append(len(rows))
+            writeBatch(writer, rows)
+        caMarkdown.export.CSVTableWriter.writeBatch = countingWrite
+        try:
+            for count, batchSize, expected in [(7, 3, [3, 3, 1]), (6, 3, [3, 3]), (2, 3, [2]), (0, 3, [])]:
+                del batches[:]
+                target = pathlib.Path(tempDirName, 'rows.csv')
+                self.assertEqual(caMarkdown.export.writeRows(iter({'n' : i} for i in range(count)), target, columns, batchSize = batchSize), count)
+                self.assertEqual(batches, expected)
+                with open(str(target), newline = '') as f:
+                    self.assertEqual([int(row['n']) for row in csv.DictReader(f)], list(range(count)))
+        finally:
+            caMarkdown.export.CSVTableWriter.writeBatch = writeBatch
+
+    def test_badFormat(self):
+        with self.assertRaises(caMarkdown.caExceptions.ExportException):
+            self.P.exportSections(pathlib.Path(tempDirName, 'sections.txt'))
+        with self.assertRaises(caMarkdown.caExceptions.ExportException):
+            self.P.exportSections(pathlib.Path(tempDirName, 'sections.csv'), fileFormat = 'xlsx')
+
+    def tearDown(self):
+        shutil.rmtree(tempDirName)
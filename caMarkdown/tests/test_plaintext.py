@@ -0,0 +1,36 @@
+import unittest
+import os.path
+import random
+
+import caMarkdown.codes
+import caMarkdown.plaintext
+
+from .helpers import addCodes
+
+testingFilesDir = os.path.join(os.path.dirname(__file__), 'womenInComp')
+
+class Test_stripMarkup(unittest.TestCase):
+
+    def setUp(self):
+        random.seed(4)
+        fname = sorted(os.listdir(testingFilesDir))[2]
+        with open(os.path.join(testingFilesDir, fname)) as f:
+            self.source = addCodes(f.read()[:3000], 10, 4)[2]
+
+    def test_text(self):
+        plain = caMarkdown.plaintext.stripMarkup(self.source)
+        sections, spans = caMarkdown.codes.scanMarkup(self.source)
+        self.assertEqual(plain.text, caMarkdown.codes.stripSpans(self.source, 0, len(self.source), spans))
+        for sec, cleanSec in zip(sections, plain.sections):
+            self.assertEqual(cleanSec.end - cleanSec.start, sec.length)
+            self.assertEqual(plain.text[cleanSec.start:cleanSec.end], caMarkdown.codes.stripSpans(self.source, sec.start + 1, sec.textEnd, spans))
+
+    def test_offsets(self):
+        plain = caMarkdown.plaintext.stripMarkup(self.source)
+        for cleanOffset in range(len(plain.text)):
+            rawOffset = plain.offsets.toRaw(cleanOffset)
+            self.assertEqual(self.source[rawOffset], plain.text[cleanOffset])
+            self.assertEqual(plain.offsets.toClean(rawOffset), cleanOffset)
+        plain = caMarkdown.plaintext.stripMarkup("[[a](@x)b](^y)")
+        self.assertEqual(plain.text, 'ab')
+        self.assertEqual([plain.offsets.toClean(i) for i in range(14)], [0, 0, 0, 1, 1, 1, 1, 1, 1, 2, 2, 2, 2, 2])
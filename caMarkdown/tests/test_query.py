@@ -0,0 +1,42 @@
+import unittest
+import io
+import os.path
+
+import caMarkdown.codes
+import caMarkdown.query
+
+from ..caExceptions import QueryException
+
+targetFile = os.path.join(os.path.dirname(__file__), 'testProject', 'RecordTarget.md')
+
+class Test_query(unittest.TestCase):
+
+    def setUp(self):
+        with open(targetFile) as f:
+            self.sections = list(caMarkdown.codes.iterSections(io.StringIO(f.read()), 'RecordTarget.md'))
+
+    def spans(self, queryString):
+        return [(m.start, m.end) for m in caMarkdown.query.runQuery(queryString, self.sections)]
+
+    def test_intervals(self):
+        a = [(0, 10, 1, 1), (20, 30, 2, 2)]
+        b = [(5, 25, 1, 2)]
+        self.assertEqual(caMarkdown.query.intersect(a, b), [(5, 10, 1, 1), (20, 25, 2, 2)])
+        self.assertEqual(caMarkdown.query.difference(a, b), [(0, 5, 1, 1), (25, 30, 2, 2)])
+        self.assertEqual(caMarkdown.query.inside(a, [(0, 12, 1, 1)]), [(0, 10, 1, 1)])
+        self.assertEqual(caMarkdown.query.near(a, [(14, 15, 1, 1)], 4), [(0, 10, 1, 1)])
+        self.assertEqual(caMarkdown.query.normalize(a + b), [(0, 30, 1, 2)])
+
+    def test_queries(self):
+        self.assertEqual(self.spans('^tag1 and ^tag2'), [(1125, 1175), (2050, 2158)])
+        self.assertEqual(self.spans('^tag1 inside $tag6 but not ^tag2'), [(32, 101)])
+        self.assertEqual(self.spans('(^tag3 or ^tag4) near 100 @tag1'), [(987, 1039)])
+        self.assertEqual(self.spans('^tag3 within 10 of @tag1'), [])
+        self.assertEqual(self.spans('(^tag3 or ^tag4) within 100 characters of @tag1'), [(987, 1039)])
+        self.assertEqual(self.spans('(^tag3 or ^tag4) near 100 chars @tag1'), [(987, 1039)])
+        self.assertEqual(self.spans('@missing and ^tag1'), [])
+
+    def test_badQueries(self):
+        for queryString in ('', '$a and', '($a', 'foo', '$a near $b', '$a near 5 characters'):
+            with self.assertRaises(QueryException):
+                caMarkdown.query.parseQuery(queryString)
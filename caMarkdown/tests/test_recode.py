@@ -0,0 +1,32 @@
+import unittest
+
+import caMarkdown.recode
+
+class Test_recode(unittest.TestCase):
+
+    def test_recodeText(self):
+        source = "a [b [c](@stres $x)](@stres)\r\n[d](@stress @stres) [link](http://e) [@stres](^m)"
+        recoded, edits = caMarkdown.recode.recodeText(source, {'@stres' : '@stress'})
+        self.assertEqual(recoded, "a [b [c](@stress $x)](@stress)\r\n[d](@stress) [link](http://e) [@stres](^m)")
+        self.assertEqual([(e.line, e.old, e.new) for e in edits], [(1, '@stres $x', '@stress $x'), (1, '@stres', '@stress'), (2, '@stress @stres', '@stress')])
+        self.assertEqual([source[e.start:e.end] for e in edits], [e.old for e in edits])
+
+    def test_recodeTokens(self):
+        mapping = {'@a' : '@c', '@b' : '@c'}
+        self.assertEqual(caMarkdown.recode.recodeTokens('@a @b $x', mapping), '@c $x')
+        self.assertEqual(caMarkdown.recode.recodeTokens('@a @c', mapping), '@c')
+        self.assertEqual(caMarkdown.recode.recodeTokens('$x $x @a', mapping), '$x $x @c')
+
+    def test_checkMapping(self):
+        for mapping in [{}, {'@a' : 'b'}, {'@a' : '@b', '@b' : '@c'}, {'@a' : '@a'}]:
+            with self.assertRaises(caMarkdown.caExceptions.RecodeException):
+                caMarkdown.recode.checkMapping(mapping)
+        caMarkdown.recode.checkMapping({'@a' : '@c', '@c' : '@c'})
+
+    def test_recodeCodebook(self):
+        codeTree = {'ContentCodes' : [{'a' : {'description' : 'A'}}, 'b', {'c' : None}], 'ContextCodes' : None, 'MetaCodes' : None, 'Files' : None}
+        self.assertTrue(caMarkdown.recode.recodeCodebook(codeTree, {'@a' : '@d', '@b' : '@d'}))
+        self.assertEqual(codeTree['ContentCodes'], [{'c' : None}, {'d' : {'description' : 'A'}}])
+        self.assertTrue(caMarkdown.recode.recodeCodebook(codeTree, {'@d' : '@c'}))
+        self.assertEqual(codeTree['ContentCodes'], [{'c' : None}])
+        self.assertFalse(caMarkdown.recode.recodeCodebook(codeTree, {'@x' : '@y'}))
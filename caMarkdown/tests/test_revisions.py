@@ -0,0 +1,89 @@
+import unittest
+import tempfile
+import pathlib
+import shutil
+
+import dulwich.porcelain
+
+import caMarkdown
+import caMarkdown.revisions
+import caMarkdown.blame
+import caMarkdown.plaintext
+
+def parsed(source):
+    plain = caMarkdown.plaintext.stripMarkup(source)
+    return caMarkdown.revisions.ParsedBlob(None, plain.text, plain.sections)
+
+class Test_revisions(unittest.TestCase):
+
+    def test_aligner(self):
+        align = caMarkdown.revisions.OffsetAligner("a\nbb\ncc\n", "new\na\ncc\n")
+        self.assertEqual([align(i) for i in [0, 1, 2, 5, 6, 8]], [4, 5, 6, 6, 7, 9])
+
+    def test_diffSections(self):
+        old = parsed("intro\n[one two](@a $x) three\n[four](@b) [five](^m)\n")
+        new = parsed("a new line\nintro\n[one two](@c $x) three\n[four five six](^m)\n[seven](@d)\n")
+        changes = caMarkdown.revisions.diffSections('doc.md', old, new)
+        self.assertEqual([(c.kind, c.oldTag, c.newTag, c.line) for c in changes], [
+            ('recoded', '@a', '@c', 3),
+            ('removed', '@b', None, 3),
+            ('resized', '^m', '^m', 4),
+            ('added', None, '@d', 5),
+        ])
+        counts = caMarkdown.revisions.changeCounts(changes)
+        self.assertEqual(counts['@a']['recodedFrom'], 1)
+        self.assertEqual(counts['@c']['recodedTo'], 1)
+        self.assertNotIn('$x', counts)
+        self.assertEqual(len(caMarkdown.revisions.diffSections('doc.md', None, new)), 4)
+
+class Test_history(unittest.TestCase):
+
+    def setUp(self):
+        self.tempDir = tempfile.mkdtemp()
+        self.P = caMarkdown.Project(self.tempDir)
+        self.P.initializeDir()
+
+    def commit(self, files, message, author = b'A <a@example.com>'):
+        for name, text in files.items():
+            with open(str(pathlib.Path(self.tempDir, name)), 'w') as f:
+                f.write(text)
+            if name.endswith('.md') and pathlib.Path(self.tempDir, name) not in self.P.readFilesList():
+                self.P.addFile(pathlib.Path(self.tempDir, name))
+        dulwich.porcelain.add(self.tempDir, paths = [str(p) for p in pathlib.Path(self.tempDir).iterdir() if p.name not in ('.git', '.camd')])
+        dulwich.porcelain.commit(self.tempDir, message = message.encode(), author = author, committer = author)
+
+    def test_history(self):
+        self.commit({'a.md' : "[one](@x) [two](@x $z)"}, 'first')
+        self.commit({'b.md' : "[three](@y)"}, 'second')
+        self.commit({'notes.txt' : "not a document"}, 'third')
+        self.commit({'a.md' : "one [two](@x)", 'b.md' : "[three](@y @x)"}, 'fourth')
+        points = list(self.P.history())
+        self.assertEqual([p.documents for p in points], [1, 2, 2, 2])
+        self.assertEqual([p.counts for p in points], [
+            {'@x' : 2, '$z' : 1},
+            {'@x' : 2, '$z' : 1, '@y' : 1},
+            {'@x' : 2, '$z' : 1, '@y' : 1},
+            {'@x' : 2, '@y' : 1},
+        ])
+        self.assertEqual([p.counts for p in self.P.history(tags = ['@y'])][0], {})
+        changes = self.P.diff(points[0].commit.id, 'HEAD')
+        self.assertEqual(sorted((c.kind, c.file, c.oldTag, c.newTag) for c in changes), [('added', 'b.md', None, '@x'), ('added', 'b.md', None, '@y'), ('removed', 'a.md', '$z', None), ('removed', 'a.md', '@x', None)])
+
+    def test_blame(self):
+        self.commit({'a.md' : "[one](@x)\n[two](@x $z)\nthree\n"}, 'first')
+        self.commit({'a.md' : "[one](@x)\n[two](@x $z)\n[three](@y)\n", 'b.md' : "[four\nfive](@y)"}, 'second', author = b'B <b@example.com>')
+        attributions = self.P.blame()
+        self.assertEqual([(a.file, a.tag, a.endLine, a.author) for a in attributions], [
+            ('a.md', '@x', 1, 'A <a@example.com>'),
+            ('a.md', '@x', 2, 'A <a@example.com>'),
+            ('a.md', '$z', 2, 'A <a@example.com>'),
+            ('a.md', '@y', 3, 'B <b@example.com>'),
+            ('b.md', '@y', 2, 'B <b@example.com>'),
+        ])
+        counts = caMarkdown.blame.authorCounts(attributions)
+        self.assertEqual(counts['B <b@example.com>'], {'@y' : 2})
+        #The second time it comes from the cache
+        self.assertEqual(self.P.blame(tags = ['@y']), [a for a in attributions if a.tag == '@y'])
+
+    def tearDown(self):
+        shutil.rmtree(self.tempDir)
@@ -0,0 +1,66 @@
+import unittest
+import os.path
+import random
+import shutil
+import collections
+
+import caMarkdown
+import caMarkdown.sectionTable
+
+from .helpers import makeTestDir
+
+testingFilesDir = os.path.join(os.path.dirname(__file__), 'womenInComp')
+
+tempDirName = 'tempSectionTableDir'
+
+@unittest.skipIf(caMarkdown.sectionTable.numpy is None, "numpy is not installed")
+class Test_SectionTable(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        random.seed(5)
+        makeTestDir(tempDirName, testingFilesDir, writeCodes = True)
+        cls.P = caMarkdown.Project(tempDirName)
+        cls.P.initializeDir()
+        cls.P.addDir(tempDirName, recursive = True)
+        cls.table = cls.P.sectionTable()
+        cls.sections = [sec for code in cls.P.parseTree().tags.values() for sec in code.sections]
+
+    def test_tags(self):
+        self.assertEqual(len(self.table), len(self.sections))
+        self.assertEqual(self.table.tagCounts(), dict(collections.Counter(sec.tag for sec in self.sections)))
+        lengths = collections.Counter()
+        for sec in self.sections:
+            lengths[sec.tag] += len(sec)
+        self.assertEqual(self.table.tagLengths(), dict(lengths))
+
+    def test_files(self):
+        counts = self.table.fileCounts()
+        for fname in counts:
+            self.assertIsInstance(fname, str)
+        self.assertEqual(counts, dict(collections.Counter(sec.file.as_posix() for sec in self.sections)))
+        matrix = self.table.fileTagCounts()
+        self.assertEqual(matrix.shape, (len(self.table.files), len(self.table.tags)))
+        fileTags = collections.Counter((sec.file.as_posix(), sec.tag) for sec in self.sections)
+        for i, fname in enumerate(self.table.files):
+            for j, tag in enumerate(self.table.tags):
+                self.assertEqual(matrix[i, j], fileTags[(fname, tag)])
+
+    def test_types(self):
+        stats = self.table.typeStats()
+        for typeChar in caMarkdown.sectionTable.codeTypeChars:
+            secs = [sec for sec in self.sections if sec.tag[0] == typeChar]
+            self.assertEqual(stats[typeChar]['count'], len(secs))
+            self.assertEqual(stats[typeChar]['length'], sum(len(sec) for sec in secs))
+            if len(secs) > 0:
+                self.assertAlmostEqual(stats[typeChar]['mean'], sum(len(sec) for sec in secs) / len(secs))
+
+    def test_dataFrame(self):
+        if caMarkdown.sectionTable.pandas is None:
+            self.skipTest("pandas is not installed")
+        frame = self.table.toDataFrame()
+        self.assertEqual(frame.groupby('file', observed = True).size().to_dict(), self.table.fileCounts())
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(tempDirName)
@@ -0,0 +1,55 @@
+import unittest
+import io
+import os.path
+import random
+
+import caMarkdown.codes
+import caMarkdown.summaries
+
+from .helpers import addCodes
+
+testingFilesDir = os.path.join(os.path.dirname(__file__), 'womenInComp')
+
+def summarize(targetStrings):
+    summary = caMarkdown.summaries.Summary()
+    for targetString in targetStrings:
+        summary.documents += 1
+        summary.add(caMarkdown.codes.iterSections(io.StringIO(targetString)))
+    return summary
+
+class Test_Summary(unittest.TestCase):
+
+    def setUp(self):
+        random.seed(1)
+        self.targetStrings = []
+        for fname in sorted(os.listdir(testingFilesDir))[:4]:
+            with open(os.path.join(testingFilesDir, fname)) as f:
+                self.targetStrings.append(addCodes(f.read()[:4000], 12, 4)[2])
+
+    def test_matchesTree(self):
+        summary = summarize(self.targetStrings)
+        tags = caMarkdown.codes.Corpus(caMarkdown.codes.parseTree(s) for s in self.targetStrings).tags
+        self.assertEqual(set(summary.tags), set(tags))
+        for tagString, tag in tags.items():
+            self.assertEqual(summary.counts[tagString], len(tag))
+            for tag2String in tags:
+                self.assertEqual(summary.overlap(tagString, tag2String), sum(len(s) for s in tag[tag2String]))
+
+    def test_merge(self):
+        whole = summarize(self.targetStrings)
+        parts = summarize(self.targetStrings[:1]) + summarize(self.targetStrings[1:3])
+        parts += caMarkdown.summaries.Summary.fromDict(summarize(self.targetStrings[3:]).toDict())
+        self.assertEqual(parts, whole)
+        self.assertEqual(parts.documents, 4)
+
+    def test_shards(self):
+        names = ['doc{}.md'.format(i) for i in range(40)]
+        for count in (1, 3, 7):
+            shards = [[n for n in names if caMarkdown.summaries.inShard(n, i, count)] for i in range(1, count + 1)]
+            self.assertEqual(sorted(sum(shards, [])), sorted(names))
+        partials = [caMarkdown.summaries.Partial(summarize([s]), (i + 1, 4), ['doc{}.md'.format(i)]) for i, s in enumerate(self.targetStrings)]
+        merged, missing = caMarkdown.summaries.mergePartials(partials[:3])
+        self.assertEqual(missing, [4])
+        self.assertEqual(merged, summarize(self.targetStrings[:3]))
+        with self.assertRaises(caMarkdown.caExceptions.SummaryException):
+            caMarkdown.summaries.mergePartials([partials[0], partials[0]])
@@ -0,0 +1,39 @@
+import unittest
+
+import caMarkdown.termstats
+import caMarkdown.plaintext
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+def tokenized(source):
+    plain = caMarkdown.plaintext.stripMarkup(source)
+    terms, starts, ends = caMarkdown.plaintext.tokenize(plain.text)
+    return terms, starts, [(sec.tag, sec.start, sec.end) for sec in plain.sections]
+
+@unittest.skipIf(numpy is None, "numpy is not installed")
+class Test_TermStats(unittest.TestCase):
+
+    def setUp(self):
+        docs = [
+            "The [cat sat on [the mat](^place)](@animal). [The dog](@animal) barked.",
+            "[A cat and a [cat](@animal)](@animal) ran [home](^place)",
+        ]
+        self.stats = caMarkdown.termstats.TermStats.fromDocuments(tokenized(d) for d in docs)
+
+    def test_counts(self):
+        counts = dict(zip(self.stats.terms, self.stats.tagCounts('@animal').tolist()))
+        self.assertEqual(counts['cat'], 3)
+        self.assertEqual(counts['the'], 2)
+        self.assertEqual(counts['barked'], 0)
+        placeCounts = dict(zip(self.stats.terms, self.stats.tagCounts('^place').tolist()))
+        self.assertEqual({t : c for t, c in placeCounts.items() if c > 0}, {'the' : 1, 'mat' : 1, 'home' : 1})
+        self.assertEqual(dict(zip(self.stats.terms, self.stats.termTotals.tolist()))['the'], 3)
+
+    def test_rankings(self):
+        self.assertEqual(self.stats.top('@animal', count = 1)[0][0], 'cat')
+        self.assertEqual(self.stats.top('@animal', count = 1, method = 'logodds')[0][0], 'cat')
+        with self.assertRaises(caMarkdown.caExceptions.TermStatsException):
+            self.stats.tagCounts('$missing')
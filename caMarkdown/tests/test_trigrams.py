@@ -0,0 +1,121 @@
+import unittest
+import os.path
+import random
+import re
+import json
+import time
+import shutil
+import pathlib
+
+import caMarkdown
+import caMarkdown.trigrams
+import caMarkdown.query
+
+from .helpers import addCodes
+
+testingFilesDir = os.path.join(os.path.dirname(__file__), 'womenInComp')
+
+tempDirName = 'tempTrigramsDir'
+
+class Test_trigrams(unittest.TestCase):
+
+    def test_literalRuns(self):
+        self.assertEqual(caMarkdown.trigrams.literalRuns('computer'), [('computer', True)])
+        self.assertEqual(caMarkdown.trigrams.literalRuns(r'\bwork(ed|ing) hard'), [('work', True), (' hard', False)])
+        self.assertEqual(caMarkdown.trigrams.literalRuns('a|b'), [])
+
+    def test_matchesRegex(self):
+        random.seed(3)
+        fname = sorted(os.listdir(testingFilesDir))[2]
+        with open(os.path.join(testingFilesDir, fname)) as f:
+            s = addCodes(f.read()[:5000], 15, 3)[2]
+        doc = caMarkdown.trigrams.IndexedDocument(fname, s)
+        for pattern in ['the', r'th\w+', r'\w+ing\b', 'and (the|a)', 'aaa']:
+            regex = re.compile(pattern)
+            literal, leading = caMarkdown.trigrams.indexedLiteral(pattern)
+            found = [(m.start, m.end) for m in doc.search(regex, literal, leading)]
+            self.assertEqual(found, [m.span() for m in regex.finditer(doc.text)])
+            for m in doc.search(regex, literal, leading):
+                self.assertEqual((s[m.rawStart], s[m.rawEnd - 1]), (m.text[0], m.text[-1]))
+        tag = doc.sections[0].tag
+        within = caMarkdown.query.parseQuery(tag)
+        sections = [sec for sec in doc.sections if sec.tag == tag]
+        for m in doc.search(re.compile(r'\w+'), within = within):
+            self.assertTrue(any(sec.start <= m.start and m.end <= sec.end for sec in sections))
+
+class Test_TrigramIndex(unittest.TestCase):
+
+    def setUp(self):
+        pathlib.Path(tempDirName).mkdir()
+        self.texts = {
+            'a.md' : "The [cat](@animal) sat on the mat\n",
+            'b.md' : "A dog and a [cat](@animal) and a [bird](@animal)\n",
+            'c.md' : "Nothing to see here\n",
+        }
+        for fname, text in self.texts.items():
+            with open(os.path.join(tempDirName, fname), 'w') as f:
+                f.write(text)
+        self.P = caMarkdown.Project(tempDirName)
+        self.P.initializeDir()
+        self.P.addDir(tempDirName)
+
+    def grep(self, index, pattern, **kwargs):
+        read = []
+        readDocument = index.readDocument
+        def countingRead(relativePath):
+            read.append(relativePath)
+            return readDocument(relativePath)
+        index.readDocument = countingRead
+        return [(m.file, m.text) for m in index.grep(pattern, **kwargs)], read
+
+    def test_grep(self):
+        index = self.P.trigramIndex()
+        self.assertEqual(len(index), 3)
+        found, read = self.grep(index, 'cat')
+        self.assertEqual(found, [('a.md', 'cat'), ('b.md', 'cat')])
+        self.assertEqual(read, ['a.md', 'b.md'])
+        found, read = self.grep(index, r'\bthe \w+', ignoreCase = True)
+        self.assertEqual(found, [('a.md', 'The cat'), ('a.md', 'the mat')])
+        self.assertEqual(read, ['a.md'])
+        found, read = self.grep(index, 'zebra')
+        self.assertEqual((found, read), ([], []))
+        #Without a literal every document is read
+        found, read = self.grep(index, r'b\w+', within = '@animal')
+        self.assertEqual((found, read), ([('b.md', 'bird')], ['a.md', 'b.md', 'c.md']))
+
+    def test_foldCase(self):
+        #'İ' lowercases to two characters, the rest of the document is still folded
+        self.assertEqual(caMarkdown.trigrams.foldCase("İstanbul: The Cat"), "İstanbul: the cat")
+        with open(os.path.join(tempDirName, 'd.md'), 'w') as f:
+            f.write("From İstanbul, The [Cat](@animal)\n")
+        self.P.addFile(os.path.join(tempDirName, 'd.md'))
+        index = self.P.trigramIndex()
+        self.assertEqual(index.candidateFiles('the cat'), ['a.md', 'd.md'])
+        found, read = self.grep(index, 'the cat', ignoreCase = True)
+        self.assertEqual(found, [('a.md', 'The cat'), ('d.md', 'The Cat')])
+        found, read = self.grep(index, 'İstanbul')
+        self.assertEqual((found, read), ([('d.md', 'İstanbul')], ['d.md']))
+
+    def test_update(self):
+        index = self.P.trigramIndex()
+        self.assertEqual(caMarkdown.trigrams.TrigramIndex(self.P).update(), 0)
+        #The stamp has the modification time in nanoseconds, so it changes even on filesystems with coarse times
+        time.sleep(0.01)
+        with open(os.path.join(tempDirName, 'c.md'), 'w') as f:
+            f.write("A [cat](@animal) here too\n")
+        files = self.P.getFiles()
+        self.P.getFiles = lambda: [fname for fname in files if fname.name != 'a.md']
+        index = caMarkdown.trigrams.TrigramIndex(self.P)
+        self.assertEqual(index.update(), 1)
+        self.assertEqual(len(index), 2)
+        found, read = self.grep(index, 'cat')
+        self.assertEqual(found, [('b.md', 'cat'), ('c.md', 'cat')])
+        self.assertEqual(found, [(m.file, m.text) for m in self.P.grep('cat')])
+        self.assertEqual(index.candidateFiles('the'), [])
+        #The index is stored as JSON
+        with open(str(index.manifestPath)) as f:
+            self.assertEqual(set(json.load(f)['documents']), {'b.md', 'c.md'})
+        self.assertEqual(sorted(p.suffix for p in index.indexDir.iterdir()), ['.json'] * 3)
+
+    def tearDown(self):
+        shutil.rmtree(tempDirName)
@@ -0,0 +1,94 @@
+import unittest
+import os
+import shutil
+import pathlib
+
+import caMarkdown
+import caMarkdown.workspace
+
+from ..defaultFiles.defaultGitignore import gitignoreName, cacheIgnoreRule
+
+tempDirName = 'tempWorkspaceDir'
+
+class Test_Workspace(unittest.TestCase):
+
+    def setUp(self):
+        self.texts = {
+            'first' : ["A [cat](@animal) and a [dog](@animal $pet)\n", "Only a [fish](@animal)\n"],
+            'second' : ["[Rain](@weather) and [sun](@weather)\n"],
+            'third' : ["A [dog](@animal) in the [rain](@weather)\n"],
+        }
+        self.roots = []
+        for name, texts in self.texts.items():
+            root = pathlib.Path(tempDirName, name)
+            root.mkdir(parents = True)
+            for i, text in enumerate(texts):
+                with open(str(pathlib.Path(root, 'doc{}.md'.format(i))), 'w') as f:
+                    f.write(text)
+            P = caMarkdown.Project(str(root))
+            P.initializeDir()
+            P.addDir(str(root))
+            self.roots.append(str(root))
+
+    def countSummaries(self):
+        """Replaces summarizeProject with one that records the projects it summarizes, only seen when the projects are summarized in this process"""
+        summarized = []
+        summarizeProject = caMarkdown.workspace.summarizeProject
+        def countingSummarize(root, readWorkers):
+            summarized.append(pathlib.Path(root).name)
+            return summarizeProject(root, readWorkers)
+        caMarkdown.workspace.summarizeProject = countingSummarize
+        self.addCleanup(setattr, caMarkdown.workspace, 'summarizeProject', summarizeProject)
+        return summarized
+
+    def test_summaries(self):
+        #In worker processes
+        W = caMarkdown.workspace.Workspace(self.roots, workers = 2)
+        summaries = W.summaries()
+        self.assertEqual(list(summaries.keys()), ['first', 'second', 'third'])
+        self.assertEqual([s.documents for s in summaries.values()], [2, 1, 1])
+        self.assertEqual(summaries['first'].counts, {'@animal' : 3, '$pet' : 1})
+        self.assertEqual(W.projectCounts(), {'@animal' : 2, '$pet' : 1, '@weather' : 2})
+        self.assertEqual(W.summary().counts, {'@animal' : 4, '$pet' : 1, '@weather' : 3})
+        #The same summaries in this process
+        self.assertEqual(caMarkdown.workspace.Workspace(self.roots, workers = 1).summaries(), summaries)
+
+    def test_cache(self):
+        summarized = self.countSummaries()
+        W = caMarkdown.workspace.Workspace(self.roots, workers = 1)
+        first = W.summaries()
+        self.assertEqual(summarized, ['first', 'second', 'third'])
+        for root in self.roots:
+            self.assertTrue(pathlib.Path(root, '.camd', caMarkdown.workspace.summaryCacheName).exists())
+        del summarized[:]
+        self.assertEqual(caMarkdown.workspace.Workspace(self.roots).summaries(), first)
+        self.assertEqual(summarized, [])
+        #Only the changed project is summarized again
+        with open(os.path.join(self.roots[1], 'doc0.md'), 'a') as f:
+            f.write("More [snow](@weather)\n")
+        W = caMarkdown.workspace.Workspace(self.roots)
+        self.assertEqual(W.summaries()['second'].counts, {'@weather' : 3})
+        self.assertEqual(summarized, ['second'])
+
+    def test_readingCache(self):
+        P = caMarkdown.Project(self.roots[0])
+        self.assertIsNone(caMarkdown.workspace.readCachedSummary(P, P.fingerprint()))
+        self.assertFalse(pathlib.Path(self.roots[0], '.camd').exists())
+
+    def test_gitignore(self):
+        #A project made before the cache directory was in the default .gitignore
+        gitignore = pathlib.Path(self.roots[0], gitignoreName)
+        with open(str(gitignore), 'w') as f:
+            f.write("*.tmp")
+        P = caMarkdown.Project(self.roots[0])
+        P.cachePath('anything', makeDir = True)
+        with open(str(gitignore)) as f:
+            self.assertEqual(f.read(), "*.tmp\n{}\n".format(cacheIgnoreRule))
+        self.assertFalse(P.ignoreCache())
+
+    def test_notProject(self):
+        with self.assertRaises(caMarkdown.caExceptions.WorkspaceException):
+            caMarkdown.workspace.Workspace(self.roots + [tempDirName])
+
+    def tearDown(self):
+        shutil.rmtree(tempDirName)
@@ -0,0 +1,249 @@
+import re
+import bisect
+import hashlib
+import pathlib
+import collections
+import json
+
+try:
+    import re._parser as sreParse
+except ImportError:
+    import sre_parse as sreParse
+
+from .plaintext import stripMarkup, OffsetMap
+from .documents import documentEncoding, writeAtomically, readText
+from .query import SectionIndex, parseQuery, inside
+
+trigramDirName = 'trigrams'
+manifestName = 'manifest.json'
+#Changed when the format of the index's files does, so an older index is rebuilt
+indexVersion = 4
+
+GrepMatch = collections.namedtuple('GrepMatch', ['file', 'start', 'end', 'line', 'rawStart', 'rawEnd', 'text'])
+GrepMatch.__doc__ = """A match of `TrigramIndex.grep()`, start and end are offsets in the document's text without markup, rawStart and rawEnd in the document itself"""
+
+CleanSection = collections.namedtuple('CleanSection', ['tag', 'file', 'start', 'end', 'line', 'endLine'])
+
+def foldCase(text):
+    """Lowercases each character of text whose lowercase is one character, others, like 'İ', are left as they are, so offsets in the result are offsets in text"""
+    lowered = text.lower()
+    if len(lowered) == len(text):
+        return lowered
+    return ''.join(c if len(c.lower()) != 1 else c.lower() for c in text)
+
+def textTrigrams(text):
+    """The set of the trigrams in text"""
+    return set(text[i:i + 3] for i in range(len(text) - 2))
+
+def matchAt(regex, text, positions):
+    """Yields the matches of regex starting at any of positions, sorted, skipping those that overlap the one before as `re.finditer()` would"""
+    end = 0
+    for pos in positions:
+        if pos >= end:
+            match = regex.match(text, pos)
+            if match is not None:
+                end = max(match.end(), pos + 1)
+                yield match
+
+def literalRuns(pattern):
+    """Finds the runs of literal characters every match of pattern must contain. Returns a list of (literal, leading), leading is True if the run starts every match. If the pattern cannot be analysed the list is empty."""
+    try:
+        parsed = sreParse.parse(pattern)
+    except Exception:
+        return []
+    runs = []
+    current = []
+    leading = True
+    for op, value in parsed:
+        if op == sreParse.LITERAL:
+            current.append(chr(value))
+        elif op == sreParse.AT:
+            #Zero width so does not break a run
+            continue
+        else:
+            if len(current) > 0:
+                runs.append((''.join(current), leading and len(runs) == 0))
+            current = []
+            leading = False
+    if len(current) > 0:
+        runs.append((''.join(current), leading and len(runs) == 0))
+    return runs
+
+def indexedLiteral(pattern):
+    """The longest of the `literalRuns()` of pattern that the index can look up, one of at least three characters, and if it is leading. Returns (None, False) if there is none."""
+    runs = [run for run in literalRuns(pattern) if len(run[0]) >= 3]
+    if len(runs) < 1:
+        return None, False
+    return max(runs, key = lambda r: len(r[0]))
+
+class IndexedDocument(object):
+    """The clean text of a document, its sections in clean coordinates and its `OffsetMap`"""
+    def __init__(self, fname, source):
+        plain = stripMarkup(source, fname)
+        self.file = fname
+        self.text = plain.text
+        self.offsets = plain.offsets
+        self.sections = [CleanSection(sec.tag, fname, sec.start, sec.end, sec.line, sec.endLine) for sec in plain.sections]
+        self._folded = None
+        self._lineStarts = None
+
+    def toDict(self):
+        return {'file' : self.file, 'text' : self.text, 'offsets' : self.offsets.toDict(), 'sections' : [list(sec[2:]) + [sec.tag] for sec in self.sections]}
+
+    @classmethod
+    def fromDict(cls, data):
+        doc = cls.__new__(cls)
+        doc.file = data['file']
+        doc.text = data['text']
+        doc.offsets = OffsetMap.fromDict(data['offsets'])
+        doc.sections = [CleanSection(tag, doc.file, start, end, line, endLine) for start, end, line, endLine, tag in data['sections']]
+        doc._folded = None
+        doc._lineStarts = None
+        return doc
+
+    @property
+    def folded(self):
+        if self._folded is None:
+            self._folded = foldCase(self.text)
+        return self._folded
+
+    def trigrams(self):
+        """The trigrams of the case folded text"""
+        return textTrigrams(self.folded)
+
+    def candidates(self, literal):
+        """The positions literal starts at in the case folded text"""
+        literal = foldCase(literal)
+        ret = []
+        pos = self.folded.find(literal)
+        while pos >= 0:
+            ret.append(pos)
+            pos = self.folded.find(literal, pos + 1)
+        return ret
+
+    def search(self, regex, literal = None, leading = False, within = None):
+        """Yields a `GrepMatch` for each match of regex, a compiled pattern, in the text. literal is a run of characters in every match, only the positions it is at are checked if leading, i.e. if it starts every match. within is a parsed query the matches must be inside."""
+        if literal is None:
+            found = regex.finditer(self.text)
+        else:
+            candidates = self.candidates(literal)
+            if len(candidates) < 1:
+                return
+            elif leading:
+                found = matchAt(regex, self.text, candidates)
+            else:
+                found = regex.finditer(self.text)
+        #Intervals as the query functions take them, the line numbers are not needed
+        intervals = [(m.start(), m.end(), 0, 0) for m in found if m.end() > m.start()]
+        if within is not None and len(intervals) > 0:
+            intervals = inside(intervals, within.evaluate(SectionIndex(self.sections), self.file))
+        for start, end, _, _ in intervals:
+            yield GrepMatch(self.file, start, end, self.line(start), self.offsets.toRaw(start), self.offsets.toRaw(end - 1) + 1, self.text[start:end])
+
+    def line(self, offset):
+        if self._lineStarts is None:
+            self._lineStarts = [0] + [m.end() for m in re.finditer('\n', self.text)]
+        return bisect.bisect_right(self._lineStarts, offset)
+
+class TrigramIndex(object):
+    """A trigram index of the text, without markup, of the documents of a Project, kept in its cache directory. The manifest has the stamp and id of each document and, for each trigram, the ids of the documents with it, so a search only reads the documents that have all the trigrams of its pattern's literal part. Each document is stored on its own, as JSON, so `update()` only redoes the documents that have changed."""
+    def __init__(self, P):
+        self.project = P
+        self.indexDir = P.cachePath(trigramDirName, makeDir = True)
+        self.indexDir.mkdir(exist_ok = True)
+        self.manifestPath = pathlib.Path(self.indexDir, manifestName)
+        try:
+            with open(str(self.manifestPath), encoding = documentEncoding) as f:
+                manifest = json.load(f)
+            if manifest['version'] != indexVersion:
+                raise ValueError("The index is of another version")
+            self.documentIds = manifest['documents']
+            self.nextId = manifest['nextId']
+            self.trigramDocuments = manifest['trigrams']
+        except (OSError, ValueError, KeyError, TypeError):
+            self.documentIds = {}
+            self.nextId = 0
+            self.trigramDocuments = {}
+            #Anything left is from an older index
+            for oldPath in self.indexDir.iterdir():
+                if oldPath != self.manifestPath:
+                    oldPath.unlink()
+
+    def __len__(self):
+        return len(self.documentIds)
+
+    def __repr__(self):
+        return "< TrigramIndex [{} documents, {} trigrams] >".format(len(self), len(self.trigramDocuments))
+
+    def documentPath(self, relativePath):
+        return pathlib.Path(self.indexDir, hashlib.sha1(relativePath.encode(documentEncoding)).hexdigest() + '.json')
+
+    def update(self):
+        """Indexes the documents that are new or have changed and drops the ones that are gone, returns the number indexed"""
+        documentIds = {}
+        newTrigrams = {}
+        count = 0
+        for fname in self.project.getFiles():
+            relativePath = fname.relative_to(self.project.path).as_posix()
+            stat = fname.stat()
+            stamp = [stat.st_mtime_ns, stat.st_size]
+            entry = self.documentIds.get(relativePath)
+            if entry is None or entry['stamp'] != stamp or not self.documentPath(relativePath).exists():
+                doc = IndexedDocument(relativePath, readText(fname))
+                writeAtomically(self.documentPath(relativePath), json.dumps(doc.toDict()))
+                entry = {'stamp' : stamp, 'id' : self.nextId}
+                newTrigrams[self.nextId] = doc.trigrams()
+                self.nextId += 1
+                count += 1
+            documentIds[relativePath] = entry
+        for relativePath in set(self.documentIds) - set(documentIds):
+            try:
+                self.documentPath(relativePath).unlink()
+            except FileNotFoundError:
+                pass
+        if count < 1 and len(documentIds) == len(self.documentIds):
+            return 0
+        keptIds = set(entry['id'] for entry in documentIds.values())
+        trigramDocuments = {}
+        for trigram, ids in self.trigramDocuments.items():
+            ids = [i for i in ids if i in keptIds]
+            if len(ids) > 0:
+                trigramDocuments[trigram] = ids
+        for docId, trigrams in newTrigrams.items():
+            for trigram in trigrams:
+                trigramDocuments.setdefault(trigram, []).append(docId)
+        self.documentIds = documentIds
+        self.trigramDocuments = trigramDocuments
+        writeAtomically(self.manifestPath, json.dumps({'version' : indexVersion, 'documents' : self.documentIds, 'nextId' : self.nextId, 'trigrams' : self.trigramDocuments}))
+        return count
+
+    def readDocument(self, relativePath):
+        with open(str(self.documentPath(relativePath)), encoding = documentEncoding) as f:
+            return IndexedDocument.fromDict(json.load(f))
+
+    def candidateFiles(self, literal = None):
+        """The documents that have every trigram of literal, all of them if literal is None, sorted"""
+        if literal is None:
+            return sorted(self.documentIds)
+        ids = None
+        for trigram in textTrigrams(foldCase(literal)):
+            trigramIds = set(self.trigramDocuments.get(trigram, []))
+            ids = trigramIds if ids is None else ids & trigramIds
+            if len(ids) < 1:
+                return []
+        return sorted(relativePath for relativePath, entry in self.documentIds.items() if entry['id'] in ids)
+
+    def documents(self, literal = None):
+        """Yields the `IndexedDocument`s of `candidateFiles()`"""
+        for relativePath in self.candidateFiles(literal):
+            yield self.readDocument(relativePath)
+
+    def grep(self, pattern, within = None, ignoreCase = False):
+        """Yields a `GrepMatch` for each match of the regex pattern in the text of the documents. If within, a query as `parseQuery()` takes, e.g. a tag, is given only the matches entirely within the text it selects are given. The index narrows the documents to read to those with the trigrams of the pattern's literal parts, then the regex is run on them."""
+        regex = re.compile(pattern, re.IGNORECASE if ignoreCase else 0)
+        if within is not None:
+            within = parseQuery(within)
+        literal, leading = indexedLiteral(pattern)
+        for doc in self.documents(literal):
+            for match in doc.search(regex, literal, leading, within):
+                yield match
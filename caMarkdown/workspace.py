@@ -0,0 +1,93 @@
+import collections
+import concurrent.futures
+import json
+
+from .project import Project
+from .summaries import Summary
+from .documents import defaultReadWorkers
+from .caExceptions import WorkspaceException, SummaryException
+
+summaryCacheName = 'summary.json'
+
+def readCachedSummary(P, key):
+    """The Summary cached in P's cache directory if it was made when P's fingerprint was key, otherwise None"""
+    try:
+        with open(str(P.cachePath(summaryCacheName))) as f:
+            cached = json.load(f)
+        if cached['key'] == key:
+            return Summary.fromDict(cached['summary'])
+    except (OSError, ValueError, KeyError, SummaryException):
+        pass
+    return None
+
+def writeCachedSummary(P, key, summary):
+    with open(str(P.cachePath(summaryCacheName, makeDir = True)), 'w') as f:
+        json.dump({'key' : key, 'summary' : summary.toDict()}, f)
+
+def summarizeProject(root, readWorkers = defaultReadWorkers):
+    """Summarizes the project at root and caches the result, returns the `Summary` as a dict so it can be sent between processes"""
+    P = Project(root, readWorkers = readWorkers)
+    key = P.fingerprint()
+    summary = P.summarize()
+    writeCachedSummary(P, key, summary)
+    return summary.toDict()
+
+class Workspace(object):
+    """Many caMarkdown projects, one per root, analysed together. The projects are summarized in parallel worker processes and each `Summary` is cached in its project, so unchanged projects are not read again.
+    """
+    def __init__(self, roots, workers = None, readWorkers = defaultReadWorkers):
+        self.projects = collections.OrderedDict()
+        for root in roots:
+            P = Project(root, readWorkers = readWorkers)
+            if P.bad:
+                raise WorkspaceException("'{}' is not a caMarkdown project: {}".format(root, P.error))
+            name = P.path.name
+            if name in self.projects:
+                name = str(P.path)
+            self.projects[name] = P
+        self.workers = workers
+        self.readWorkers = readWorkers
+        self._summaries = None
+
+    def __len__(self):
+        return len(self.projects)
+
+    def __repr__(self):
+        return "< Workspace [{}] >".format(', '.join(self.projects.keys()))
+
+    def summaries(self):
+        """Returns an OrderedDict of the `Summary` of each project, keyed by name"""
+        if self._summaries is None:
+            summaries = collections.OrderedDict()
+            stale = []
+            for name, P in self.projects.items():
+                summaries[name] = readCachedSummary(P, P.fingerprint())
+                if summaries[name] is None:
+                    stale.append(name)
+            if len(stale) == 1 or self.workers == 1:
+                for name in stale:
+                    summaries[name] = Summary.fromDict(summarizeProject(self.projects[name].path, self.readWorkers))
+            elif len(stale) > 1:
+                with concurrent.futures.ProcessPoolExecutor(max_workers = self.workers) as executor:
+                    futures = {name : executor.submit(summarizeProject, self.projects[name].path, self.readWorkers) for name in stale}
+                    for name, future in futures.items():
+                        summaries[name] = Summary.fromDict(future.result())
+            self._summaries = summaries
+        return self._summaries
+
+    def summary(self):
+        """The `Summary` of all the projects merged together"""
+        ret = Summary()
+        for summary in self.summaries().values():
+            ret += summary
+        return ret
+
+    def projectCounts(self):
+        """The number of projects using each code"""
+        counts = collections.Counter()
+        for summary in self.summaries().values():
+            counts.update(summary.counts.keys())
+        return dict(counts)
+
+    def clearCache(self):
+        self._summaries = None
@@ -7,6 +7,7 @@ setup(name='caMarkdown',
     author="Reid McIlroy-Young, John McLevey",
     author_email = "rmcilroy@uwaterloo.ca, john.mclevey@uwaterloo.ca",
     install_requires= ['dulwich', 'pyyaml'],
+    extras_require = {'arrow' : ['pyarrow'], 'analysis' : ['numpy', 'pandas']},
     packages=['caMarkdown'],
     test_suite='caMarkdown.tests',
     entry_points={'console_scripts': [